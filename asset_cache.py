@@ -0,0 +1,245 @@
+import email.utils
+import hashlib
+import json
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_DIR = os.path.join(HERE, '.asset_cache')
+STATIC_TYPES = frozenset({'script', 'stylesheet', 'image', 'font'})
+# Headers that describe the original transfer, not the stored body.
+DROP_HEADERS = frozenset({'content-encoding', 'content-length', 'transfer-encoding', 'connection',
+                          'set-cookie', 'date', 'age'})
+
+# One row per URL and validator pair, so a changed asset is a new entry
+# rather than a new body under the old one's key. Missing validators are ''
+# (NULLs would never collide in the primary key).
+SCHEMA_VERSION = 2
+SCHEMA = """CREATE TABLE IF NOT EXISTS entries (
+    url TEXT NOT NULL,
+    etag TEXT NOT NULL,
+    last_modified TEXT NOT NULL,
+    blob TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    expires REAL NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (url, etag, last_modified)
+)"""
+
+
+def _freshness(headers, now):
+    """Seconds the response may be served without revalidation, per its caching headers."""
+    cache_control = headers.get('cache-control', '').lower()
+    if 'no-cache' in cache_control or 'must-revalidate' in cache_control:
+        return 0
+    m = re.search(r'max-age=(\d+)', cache_control)
+    if m:
+        return int(m.group(1))
+    expires = headers.get('expires')
+    if expires:
+        try:
+            return max(0, email.utils.parsedate_to_datetime(expires).timestamp() - now)
+        except (TypeError, ValueError):
+            return 0
+    last_modified = headers.get('last-modified')
+    if last_modified:
+        try:
+            # The usual heuristic: 10% of the time since it last changed.
+            return max(0, (now - email.utils.parsedate_to_datetime(last_modified).timestamp()) / 10)
+        except (TypeError, ValueError):
+            return 0
+    return 0
+
+
+def _storable(headers):
+    cache_control = headers.get('cache-control', '').lower()
+    return 'no-store' not in cache_control and 'private' not in cache_control
+
+
+class AssetCache:
+    """Content-addressed on-disk cache for static assets, shared by every context.
+
+    Sits in the Playwright routing chain: GET scripts, stylesheets, images
+    and fonts are answered from disk while fresh, revalidated with their
+    ETag/Last-Modified once stale, and fetched (then stored) on a miss.
+    Bodies live under blobs/ by SHA-256, so identical files on different
+    URLs are stored once. The index is SQLite, which makes the cache safe to
+    share between threads, worker processes and later runs. Least recently
+    used entries are evicted once the blobs exceed max_mb.
+    """
+
+    def __init__(self, root: str = None, max_mb: int = None):
+        self.root = root or os.getenv('EMT_ASSET_CACHE_DIR', DEFAULT_CACHE_DIR)
+        self.max_bytes = (max_mb or int(os.getenv('EMT_ASSET_CACHE_MB', '200'))) * 1024 * 1024
+        os.makedirs(os.path.join(self.root, 'blobs'), exist_ok=True)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = self.revalidated = self.misses = self.bytes_served = 0
+        with self._db() as db:
+            if db.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+                # Older indexes were keyed on URL alone; start over rather than migrate a cache.
+                db.execute('DROP TABLE IF EXISTS entries')
+                shutil.rmtree(os.path.join(self.root, 'blobs'), ignore_errors=True)
+                os.makedirs(os.path.join(self.root, 'blobs'), exist_ok=True)
+                db.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            db.execute(SCHEMA)
+
+    def _db(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(os.path.join(self.root, 'index.sqlite'), timeout=30)
+            db.execute('PRAGMA journal_mode=WAL')
+            self._local.db = db
+        return db
+
+    def _blob_path(self, digest):
+        return os.path.join(self.root, 'blobs', digest[:2], digest)
+
+    def _count(self, name, body=b''):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+            self.bytes_served += len(body) if name != 'misses' else 0
+
+    # ----- storage -----
+
+    def lookup(self, url):
+        """The most recently used stored version of url."""
+        row = self._db().execute(
+            'SELECT blob, status, headers, etag, last_modified, expires FROM entries WHERE url = ? '
+            'ORDER BY last_used DESC LIMIT 1', (url,)).fetchone()
+        if row is None:
+            return None
+        try:
+            with open(self._blob_path(row[0]), 'rb') as f:
+                body = f.read()
+        except OSError:
+            return None
+        return {'url': url, 'blob': row[0], 'status': row[1], 'headers': json.loads(row[2]), 'etag': row[3],
+                'last_modified': row[4], 'expires': row[5], 'body': body}
+
+    def _drop_blob_if_unused(self, db, digest):
+        if not db.execute('SELECT 1 FROM entries WHERE blob = ? LIMIT 1', (digest,)).fetchone():
+            try:
+                os.remove(self._blob_path(digest))
+            except OSError:
+                pass
+            return True
+        return False
+
+    def store(self, url, status, headers, body):
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(tmp, 'wb') as f:
+                f.write(body)
+            os.replace(tmp, path)
+        now = time.time()
+        kept = {k: v for k, v in headers.items() if k.lower() not in DROP_HEADERS}
+        key = (url, headers.get('etag') or '', headers.get('last-modified') or '')
+        with self._db() as db:
+            # Same key, new body (e.g. a server without validators): the old blob goes unless shared.
+            previous = db.execute('SELECT blob FROM entries WHERE url = ? AND etag = ? AND last_modified = ?',
+                                  key).fetchone()
+            db.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                       key + (digest, status, json.dumps(kept), now + _freshness(headers, now), len(body), now))
+            if previous and previous[0] != digest:
+                self._drop_blob_if_unused(db, previous[0])
+        self.evict()
+
+    def touch(self, entry, expires=None):
+        """Mark a lookup() result as used, optionally with a new expiry after revalidation."""
+        key = (entry['url'], entry['etag'], entry['last_modified'])
+        with self._db() as db:
+            if expires is None:
+                db.execute('UPDATE entries SET last_used = ? WHERE url = ? AND etag = ? AND last_modified = ?',
+                           (time.time(),) + key)
+            else:
+                db.execute('UPDATE entries SET last_used = ?, expires = ? '
+                           'WHERE url = ? AND etag = ? AND last_modified = ?', (time.time(), expires) + key)
+
+    def evict(self):
+        """Drop least recently used entries (and unreferenced blobs) until under the size cap."""
+        db = self._db()
+        # Blobs are shared, so count each one once.
+        total = db.execute('SELECT COALESCE(SUM(size), 0) FROM (SELECT blob, MAX(size) AS size FROM entries GROUP BY blob)'
+                           ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        with db:
+            for rowid, digest, size in db.execute('SELECT rowid, blob, size FROM entries ORDER BY last_used'
+                                                  ).fetchall():
+                if total <= self.max_bytes:
+                    break
+                db.execute('DELETE FROM entries WHERE rowid = ?', (rowid,))
+                if self._drop_blob_if_unused(db, digest):
+                    total -= size
+
+    # ----- routing -----
+
+    def _handle(self, route):
+        request = route.request
+        if request.method != 'GET' or request.resource_type not in STATIC_TYPES:
+            return route.fallback()
+        url = request.url
+        cached = self.lookup(url)
+        now = time.time()
+        if cached and cached['expires'] > now:
+            self.touch(cached)
+            self._count('hits', cached['body'])
+            return route.fulfill(status=cached['status'], headers=cached['headers'], body=cached['body'])
+
+        headers = dict(request.headers)
+        if cached and cached['etag']:
+            headers['if-none-match'] = cached['etag']
+        if cached and cached['last_modified']:
+            headers['if-modified-since'] = cached['last_modified']
+        try:
+            response = route.fetch(headers=headers)
+        except Exception:
+            return route.fallback()
+        if response.status == 304 and cached:
+            self.touch(cached, now + _freshness(response.headers, now))
+            self._count('revalidated', cached['body'])
+            return route.fulfill(status=cached['status'], headers=cached['headers'], body=cached['body'])
+        body = response.body()
+        self._count('misses')
+        if response.status == 200 and _storable(response.headers):
+            try:
+                self.store(url, response.status, response.headers, body)
+            except (OSError, sqlite3.Error) as e:
+                print(f"   ⚠️ Asset cache write failed: {e}")
+        return route.fulfill(response=response, body=body)
+
+    def attach(self, context):
+        """Serve this context's static assets through the cache (usable as a BrowserPool context hook)."""
+        context.route('**/*', self._handle)
+
+    def report(self):
+        served = self.hits + self.revalidated
+        if not served and not self.misses:
+            return
+        print(f"🗄️ Asset cache: {self.hits} hits, {self.revalidated} revalidated, {self.misses} misses "
+              f"({self.bytes_served / 1024 / 1024:.1f} MB served from disk)")
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def get_asset_cache():
+    """The process-wide cache, or None when EMT_ASSET_CACHE=0."""
+    global _default
+    if os.getenv('EMT_ASSET_CACHE', '1').lower() in {'0', 'false', 'no', 'off'}:
+        return None
+    with _default_lock:
+        if _default is None:
+            _default = AssetCache()
+        return _default
@@ -0,0 +1,282 @@
+import argparse
+import asyncio
+import os
+import re
+import time
+from datetime import datetime, timedelta
+
+from playwright.async_api import async_playwright, Page
+
+from browser_server import ensure_server, server_endpoint
+from city_cache import get_city_cache
+from datepicker import DAY_SELECTOR, JUMP_SCRIPT
+from listing_extract import CARD_SELECTOR, EXTRACT_SCRIPT
+from listing_table import ListingTable
+from listing_verify import check
+from net_profiles import PROFILES, routing_profile
+from seat_map import SEAT_CANDIDATES, SELECTED_SCRIPT, SNAPSHOT_SCRIPT, UNAVAILABLE_WORDS, choose, mark_windows
+from standin_site import standin_router
+from wait_policy import SETTLE_ARM, SETTLE_DONE, SETTLE_INSTALL
+
+BUS_URL = 'https://www.easemytrip.com/bus/'
+RESULTS_URL = re.compile(r'.*easemytrip\.com/home/list.*')
+
+STAGES = ('search', 'filters', 'seat', 'passenger', 'payment')
+
+FILTER_SELECTORS = {
+    'ac': ['#disAc', 'input[type="checkbox"][value*="AC"]', 'label:has-text("AC")'],
+    'non_ac': ['#disNonAc', 'input[type="checkbox"][value*="Non AC"]', 'label:has-text("Non AC")'],
+    'sleeper': ['#disSleeper', 'input[type="checkbox"][value*="Sleeper"]', 'label:has-text("Sleeper")'],
+    'seater': ['#disSeater', 'input[type="checkbox"][value*="Seater"]', 'label:has-text("Seater")'],
+    'operator': ['input[name="checkbox_opt"]', '[class*="operator"] input[type="checkbox"]'],
+}
+# Filters whose check needs the option's name (check() rejects them without one).
+VALUE_FILTERS = {'operator'}
+RESET_SELECTORS = ['button:has-text("Reset")', 'a:has-text("Reset")', 'button:has-text("Clear")',
+                   '[class*="reset"]', '[id*="reset"]']
+SEAT_SELECTORS = [
+    '[class*="avail"]:not([class*="booked"]):not([class*="grey"]):not([class*="disabled"])',
+    '[ng-click*="SelectSeat"]:not([class*="booked"]):not([class*="grey"])',
+    '.seat.available, .available-seat',
+]
+CONTINUE_SELECTORS = ['button:has-text("Continue")', 'a:has-text("Continue")', 'input[value*="Continue"]',
+                      'button:has-text("Proceed")', 'button[type="submit"]']
+PASSENGER_FIELDS = {
+    'first_name': ['input[name*="firstName"], input[id*="firstName"]', 'input[placeholder*="First Name"]'],
+    'last_name': ['input[name*="lastName"], input[id*="lastName"]', 'input[placeholder*="Last Name"]'],
+    'age': ['input[name*="age"], input[id*="age"]', 'input[placeholder*="Age"]'],
+    'email': ['input[type="email"]', 'input[name*="email"]', 'input[id*="email"]'],
+    'mobile': ['input[maxlength="10"][type="tel"]', 'input[name*="mobile"]:not([maxlength="3"])'],
+}
+DEFAULT_PASSENGER = {'first_name': 'test', 'last_name': 'test', 'age': '25',
+                     'email': 'cs@gmail.com', 'mobile': '8445121366'}
+
+
+async def first_visible(page: Page, selectors, timeout=2000):
+    """Return the first visible locator among selectors, racing them all at once."""
+    async def probe(sel):
+        loc = page.locator(sel).first
+        await loc.wait_for(state='visible', timeout=timeout)
+        return loc
+
+    tasks = [asyncio.ensure_future(probe(sel)) for sel in selectors]
+    pending = set(tasks)
+    try:
+        while True:
+            # Respect priority order: a match only wins once every
+            # higher-priority candidate has failed.
+            for task in tasks:
+                if not task.done():
+                    break
+                if not task.exception():
+                    return task.result()
+            else:
+                return None
+            _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def settle(page: Page, action, results: str = CARD_SELECTOR, quiet_ms: int = 60, grace_ms: int = 300,
+                 timeout: int = 10000):
+    """Async WaitPolicy.settle(): run action, then wait until its XHRs finish and the results stop changing."""
+    await page.evaluate(SETTLE_INSTALL)
+    await page.evaluate(SETTLE_ARM, results)
+    await action()
+    await page.wait_for_function(SETTLE_DONE, arg=[quiet_ms, grace_ms], timeout=timeout)
+
+
+async def select_city(page: Page, input_selector: str, city_name: str):
+    city_input = page.locator(input_selector)
+    await city_input.click()
+    await city_input.fill(city_name)
+    await page.wait_for_selector('.auto-sugg-pre ul li', state='visible', timeout=10000)
+    await page.locator(f'.auto-sugg-pre ul li:has-text("{city_name}")').first.click()
+
+
+async def stage_search(page: Page, route):
+    await page.goto(BUS_URL, wait_until='domcontentloaded')
+    await select_city(page, '#txtSrcCity', route['source'])
+    await select_city(page, '#txtDesCity', route['destination'])
+    await page.locator('#datepicker').click()
+    await page.wait_for_selector('.ui-datepicker-calendar', state='visible', timeout=5000)
+    target = datetime.now() + timedelta(days=route.get('days_ahead', 5))
+    await page.evaluate(JUMP_SCRIPT, ['#datepicker', target.year, target.month])
+    await page.locator(DAY_SELECTOR.format(day=target.day)).first.click(force=True)
+    await page.locator('#srcbtn').click()
+    await page.wait_for_url(RESULTS_URL, timeout=60000)
+
+
+async def option_value(option):
+    """What a filter checkbox selects: its value attribute, else its label's text."""
+    value = await option.get_attribute('value')
+    if not value:
+        value = await option.evaluate("el => (el.closest('label') || el).textContent")
+    return (value or '').strip() or None
+
+
+async def stage_filters(page: Page, route):
+    for name in route.get('filters', ()):
+        option = await first_visible(page, FILTER_SELECTORS[name])
+        if option is None:
+            raise RuntimeError(f'{name} filter not found')
+        value = await option_value(option) if name in VALUE_FILTERS else None
+        if name in VALUE_FILTERS and value is None:
+            raise RuntimeError(f'could not tell which {name} the {name} filter selects')
+        await settle(page, lambda: option.click(force=True))
+        verdict = check(ListingTable.from_records(await page.evaluate(EXTRACT_SCRIPT, CARD_SELECTOR)), name, value)
+        if not verdict.ok:
+            raise RuntimeError(f'{name} filter left {len(verdict.violations)} of {verdict.total} buses that violate it')
+        reset = await first_visible(page, RESET_SELECTORS)
+        if reset is not None:
+            await settle(page, lambda: reset.click(force=True))
+
+
+async def stage_seat(page: Page, route):
+    await page.locator('button:has-text("Select Seat"), a:has-text("Select Seat")').first.click(timeout=20000)
+    await page.wait_for_selector(', '.join(SEAT_SELECTORS), timeout=10000)
+    seats = choose(mark_windows(await page.evaluate(SNAPSHOT_SCRIPT, [SEAT_CANDIDATES, list(UNAVAILABLE_WORDS)])),
+                   route.get('seat_policy') or os.getenv('EMT_SEAT_POLICY', 'first_free'))
+    if not seats:
+        raise RuntimeError('no available seat found')
+    seat = seats[0]
+    await page.locator(f'[data-emt-seat="{seat["index"]}"]').click(force=True)
+    await page.wait_for_function(SELECTED_SCRIPT, arg=[seat['index'], seat['classes']], timeout=5000)
+    labels = page.locator('label[ng-click]')
+    for i in range(min(await labels.count(), 2)):
+        await labels.nth(i).click(force=True)
+    button = await first_visible(page, CONTINUE_SELECTORS)
+    if button is None:
+        raise RuntimeError('seat continue button not found')
+    await button.click(force=True)
+    await page.wait_for_load_state('networkidle', timeout=30000)
+
+
+async def stage_passenger(page: Page, route):
+    passenger = dict(DEFAULT_PASSENGER, **route.get('passenger', {}))
+    title = await first_visible(page, ['select[name*="title"], select[id*="title"]', 'select.title'])
+    if title is not None:
+        await title.select_option(label='Mr')
+    for field, selectors in PASSENGER_FIELDS.items():
+        el = await first_visible(page, selectors)
+        if el is not None:
+            await el.fill(passenger[field])
+    insurance = await first_visible(page, ['input[value="yes"][type="radio"]', 'input[value="Yes"][type="radio"]'])
+    if insurance is not None:
+        await insurance.click(force=True)
+    button = await first_visible(page, CONTINUE_SELECTORS)
+    if button is None:
+        raise RuntimeError('passenger continue button not found')
+    url = page.url
+    await button.click(force=True)
+    await page.wait_for_function('url => location.href !== url', arg=url, timeout=30000)
+
+
+async def stage_payment(page: Page, route):
+    await page.wait_for_selector('text=Wallets', state='attached', timeout=15000)
+    await page.evaluate("""() => {
+        for (const el of document.querySelectorAll('li, a, button, div, span, label')) {
+            if ((el.textContent || '').trim() === 'Wallets') { el.click(); return; }
+        }
+    }""")
+    await page.locator('[id="rdoBajaj Pay"]').first.click(force=True)
+    pay = page.locator('a.pp_paybtn').first
+    await pay.wait_for(state='visible', timeout=5000)
+    await pay.click()
+
+
+STAGE_FUNCS = dict(zip(STAGES, (stage_search, stage_filters, stage_seat, stage_passenger, stage_payment)))
+
+
+async def book(browser, route, semaphore, until='payment', routing=None, standin=None, cities=None):
+    """Run one booking in its own context, stopping after the `until` stage."""
+    result = {'route': f"{route['source']} → {route['destination']}", 'stages': {}, 'status': 'passed'}
+    async with semaphore:
+        context, stage = None, 'setup'
+        try:
+            context = await browser.new_context()
+            if routing is not None:
+                await routing.attach_async(context)
+            if standin is not None:
+                await standin.attach_async(context)
+            if cities is not None:
+                await cities.attach_async(context)
+            page = await context.new_page()
+            page.set_default_timeout(30000)
+            for stage in STAGES[:STAGES.index(until) + 1]:
+                started = time.perf_counter()
+                await STAGE_FUNCS[stage](page, route)
+                result['stages'][stage] = round(time.perf_counter() - started, 3)
+        except Exception as e:
+            result['status'] = 'failed'
+            result['error'] = f'{stage}: {e}'
+        finally:
+            if context is not None:
+                await context.close()
+    return result
+
+
+async def run_bookings(routes, concurrency=4, until='payment', headless=True, net_profile=None):
+    """Drive many independent bookings from one event loop, at most `concurrency` at a time."""
+    semaphore = asyncio.Semaphore(concurrency)
+    routing = routing_profile(net_profile)
+    standin = standin_router()
+    cities = get_city_cache()
+    endpoint = server_endpoint()
+    async with async_playwright() as p:
+        if endpoint is not None and ensure_server(endpoint):
+            browser = await p.chromium.connect_over_cdp(endpoint)
+        else:
+            browser = await p.chromium.launch(headless=headless)
+        try:
+            return await asyncio.gather(*(book(browser, r, semaphore, until, routing, standin, cities)
+                                          for r in routes))
+        finally:
+            await browser.close()
+            routing.report()
+            if cities is not None:
+                cities.report()
+
+
+def parse_route(text):
+    """Parse 'Source:Destination[:filter,filter]' into a route dict."""
+    parts = text.split(':')
+    if len(parts) < 2 or not parts[0] or not parts[1]:
+        raise ValueError(f'expected Source:Destination[:filter,...], got {text!r}')
+    route = {'source': parts[0], 'destination': parts[1]}
+    if len(parts) > 2 and parts[2]:
+        route['filters'] = parts[2].split(',')
+        unknown = [f for f in route['filters'] if f not in FILTER_SELECTORS]
+        if unknown:
+            raise ValueError(f"unknown filter(s) {', '.join(unknown)} in {text!r}; "
+                             f"expected {', '.join(FILTER_SELECTORS)}")
+    return route
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run many booking flows concurrently with asyncio.')
+    parser.add_argument('routes', nargs='+', help='Source:Destination[:filter,...], e.g. Delhi:Jaipur:ac,sleeper')
+    parser.add_argument('--concurrency', type=int, default=int(os.getenv('EMT_CONCURRENCY', '4')))
+    parser.add_argument('--until', choices=STAGES, default='payment', help='last stage to run')
+    parser.add_argument('--headed', action='store_true')
+    parser.add_argument('--net-profile', choices=sorted(PROFILES), default=None,
+                        help='request-routing profile (default: EMT_NET_PROFILE or functional-minimal)')
+    args = parser.parse_args(argv)
+    try:
+        routes = [parse_route(r) for r in args.routes]
+    except ValueError as e:
+        parser.error(str(e))
+
+    results = asyncio.run(run_bookings(routes, args.concurrency,
+                                       args.until, headless=not args.headed, net_profile=args.net_profile))
+    for r in results:
+        status = '✅' if r['status'] == 'passed' else '❌'
+        stages = ', '.join(f'{k} {v:.1f}s' for k, v in r['stages'].items())
+        print(f"{status} {r['route']}: {stages}" + (f"  ({r['error']})" if 'error' in r else ''))
+    return 0 if all(r['status'] == 'passed' for r in results) else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
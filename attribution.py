@@ -0,0 +1,260 @@
+import argparse
+import functools
+import html
+import json
+import os
+import time
+from collections import defaultdict
+
+import spans
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_REPORT_PATH = os.path.join(HERE, 'attribution.html')
+DEFAULT_HISTORY_PATH = os.path.join(HERE, 'attribution_history.jsonl')
+
+BUCKETS = ('sleep', 'network', 'dom', 'python')
+COLORS = {'sleep': '#e4572e', 'network': '#4c8bf5', 'dom': '#29a36a', 'python': '#b8b8b8'}
+# WaitPolicy kinds -> bucket; anything not listed is DOM/actionability.
+WAIT_BUCKETS = {'network': 'network', 'url': 'network', 'load': 'network'}
+
+# Playwright calls worth attributing, by bucket. Actions count as DOM:
+# their time is Playwright waiting for the element to be actionable.
+# Fixed sleeps are page.wait_for_timeout(); time.sleep is left alone since
+# patching it would also catch other threads (e.g. the stand-in server's
+# latency sleeps).
+PROBES = {
+    'sleep': {'Page': ('wait_for_timeout',)},
+    'network': {'Page': ('goto', 'reload', 'go_back', 'wait_for_load_state', 'wait_for_url')},
+    'dom': {
+        'Page': ('wait_for_selector', 'wait_for_function', 'click', 'fill'),
+        'Locator': ('click', 'dblclick', 'fill', 'type', 'press', 'check', 'select_option',
+                    'wait_for', 'scroll_into_view_if_needed', 'hover'),
+    },
+}
+
+_installed = False
+
+
+def wait_bucket(kind: str):
+    return WAIT_BUCKETS.get(kind, 'dom')
+
+
+def _probe(func, name, bucket):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            spans.record(name, started, 'error', bucket=bucket)
+            raise
+        spans.record(name, started, bucket=bucket)
+        return result
+    return wrapper
+
+
+def instrument():
+    """Wrap the Playwright waits/actions in PROBES so they emit bucketed spans.
+
+    A no-op unless EMT_SPANS is on; safe to call more than once.
+    """
+    global _installed
+    if _installed or spans.spans_path() is None:
+        return
+    from playwright.sync_api import Locator, Page
+
+    classes = {'Page': Page, 'Locator': Locator}
+    for bucket, targets in PROBES.items():
+        for class_name, methods in targets.items():
+            cls = classes[class_name]
+            for method in methods:
+                setattr(cls, method, _probe(getattr(cls, method), f'{class_name.lower()}.{method}', bucket))
+    _installed = True
+
+
+# ----- analysis -----
+
+def load_spans(path: str, run: str = None):
+    """Spans of one run from a JSONL file (the last run in the file by default)."""
+    records = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    if not records:
+        return None, []
+    run = run or max(records, key=lambda r: r['end'])['run']
+    return run, [r for r in records if r['run'] == run]
+
+
+def _bucket_of(record):
+    return (record.get('attrs') or {}).get('bucket')
+
+
+def steps_of(records):
+    """The spans to break down: flow stages if any ran, else scenarios, else top-level spans."""
+    for pick in (lambda r: 'flow' in (r.get('attrs') or {}),
+                 lambda r: r['span'] == 'scenario',
+                 lambda r: r['parent'] is None and not _bucket_of(r)):
+        steps = [r for r in records if pick(r)]
+        if steps:
+            return sorted(steps, key=lambda r: r['start'])
+    return []
+
+
+def attribute(step, records):
+    """Seconds of step spent in each bucket.
+
+    Where bucketed spans nest or overlap, the outermost one wins: a
+    settle() wait classed as network stays network even though it polls
+    the DOM inside. Whatever no bucketed span covers is Python.
+    """
+    start, end = step['start'], step['end']
+    intervals = sorted(((max(r['start'], start), min(r['end'], end), _bucket_of(r)) for r in records
+                        if _bucket_of(r) and r['scenario'] == step['scenario']
+                        and r['end'] > start and r['start'] < end),
+                       key=lambda i: (i[0], -i[1]))
+    totals = dict.fromkeys(BUCKETS, 0.0)
+    covered_until = start
+    for s, e, bucket in intervals:
+        if e <= covered_until:
+            continue  # inside an interval already counted
+        totals[bucket] += e - max(s, covered_until)
+        covered_until = e
+    totals['python'] = max(0.0, (end - start) - sum(totals.values()))
+    return totals
+
+
+def breakdown(records):
+    steps = steps_of(records)
+    rows = [{'step': s['span'], 'scenario': s['scenario'], 'start': s['start'], 'end': s['end'],
+             'seconds': s['end'] - s['start'], 'buckets': attribute(s, records)} for s in steps]
+    totals = defaultdict(float)
+    for row in rows:
+        for bucket, seconds in row['buckets'].items():
+            totals[bucket] += seconds
+    return rows, dict(totals)
+
+
+# ----- rendering -----
+
+CSS = """
+body { font: 13px/1.4 system-ui, sans-serif; margin: 24px; color: #222; }
+h1 { font-size: 18px; } h2 { font-size: 15px; margin-top: 28px; }
+.legend span { display: inline-block; margin-right: 14px; }
+.legend i, td i { display: inline-block; width: 10px; height: 10px; margin-right: 4px; }
+.bar { display: flex; height: 16px; width: 100%; background: #f2f2f2; }
+.bar div { height: 100%; }
+.track { position: relative; height: 14px; background: #fafafa; border-bottom: 1px solid #eee; }
+.track div { position: absolute; top: 2px; height: 10px; min-width: 1px; opacity: .85; }
+table { border-collapse: collapse; width: 100%; }
+td, th { padding: 3px 6px; text-align: left; vertical-align: middle; }
+th { border-bottom: 1px solid #ccc; }
+td.n { text-align: right; white-space: nowrap; }
+.name { width: 220px; white-space: nowrap; overflow: hidden; text-overflow: ellipsis; }
+"""
+
+
+def _stacked(buckets, total):
+    total = total or 1
+    return '<div class="bar">' + ''.join(
+        f'<div style="width:{buckets[b] / total * 100:.3f}%;background:{COLORS[b]}" '
+        f'title="{b} {buckets[b]:.2f}s"></div>' for b in BUCKETS) + '</div>'
+
+
+def _waterfall(step, records, limit=400):
+    start, span_s = step['start'], max(step['end'] - step['start'], 1e-9)
+    children = sorted((r for r in records if _bucket_of(r) and r['scenario'] == step['scenario']
+                       and r['end'] > start and r['start'] < step['end']), key=lambda r: r['start'])[:limit]
+    lanes = []  # greedy lane packing so overlapping spans don't hide each other
+    out = []
+    for r in children:
+        lane = next((i for i, free_at in enumerate(lanes) if free_at <= r['start']), None)
+        if lane is None:
+            lanes.append(0)
+            lane = len(lanes) - 1
+        lanes[lane] = r['end']
+        left = (max(r['start'], start) - start) / span_s * 100
+        width = (min(r['end'], step['end']) - max(r['start'], start)) / span_s * 100
+        out.append((lane, f'<div style="left:{left:.3f}%;width:{width:.3f}%;background:{COLORS[_bucket_of(r)]}" '
+                          f'title="{html.escape(r["span"])} {r["ms"]:.0f} ms ({_bucket_of(r)})"></div>'))
+    return ''.join('<div class="track">' + ''.join(d for l, d in out if l == lane) + '</div>'
+                   for lane in range(len(lanes)))
+
+
+def render(run, records, rows, totals, history=()):
+    wall = sum(totals.values())
+    pct = {b: (totals.get(b, 0) / wall * 100 if wall else 0) for b in BUCKETS}
+    parts = [f'<!doctype html><html><head><meta charset="utf-8"><title>Wall-clock attribution {html.escape(run)}</title>'
+             f'<style>{CSS}</style></head><body>',
+             f'<h1>Wall-clock attribution — run {html.escape(run)}</h1>',
+             '<p class="legend">' + ''.join(f'<span><i style="background:{COLORS[b]}"></i>{b} '
+                                            f'{totals.get(b, 0):.1f}s ({pct[b]:.0f}%)</span>' for b in BUCKETS)
+             + f' &nbsp; total {wall:.1f}s</p>',
+             _stacked({b: totals.get(b, 0) for b in BUCKETS}, wall)]
+    if history:
+        parts.append('<h2>Trend</h2><table><tr><th>run</th><th>when</th><th class="n">wall s</th>'
+                     + ''.join(f'<th class="n">{b} %</th>' for b in BUCKETS) + '</tr>')
+        for h in list(history)[-20:]:
+            parts.append(f'<tr><td>{html.escape(h["run"])}</td>'
+                         f'<td>{time.strftime("%Y-%m-%d %H:%M", time.localtime(h["at"]))}</td>'
+                         f'<td class="n">{h["wall"]:.1f}</td>'
+                         + ''.join(f'<td class="n">{h["percent"].get(b, 0):.0f}</td>' for b in BUCKETS) + '</tr>')
+        parts.append('</table>')
+    parts.append('<h2>Steps</h2><table><tr><th>step</th><th class="n">s</th>'
+                 + ''.join(f'<th class="n"><i style="background:{COLORS[b]}"></i>{b}</th>' for b in BUCKETS)
+                 + '<th style="width:45%">breakdown / waterfall</th></tr>')
+    for row, step in zip(rows, steps_of(records)):
+        label = row['step'] if row['step'] != 'scenario' else row['scenario']
+        parts.append(f'<tr><td class="name" title="{html.escape(label)}">{html.escape(label)}</td>'
+                     f'<td class="n">{row["seconds"]:.1f}</td>'
+                     + ''.join(f'<td class="n">{row["buckets"][b]:.1f}</td>' for b in BUCKETS)
+                     + f'<td>{_stacked(row["buckets"], row["seconds"])}{_waterfall(step, records)}</td></tr>')
+    parts.append('</table></body></html>')
+    return ''.join(parts)
+
+
+def _history(path, run, totals):
+    history = []
+    try:
+        with open(path, encoding='utf-8') as f:
+            history = [json.loads(line) for line in f if line.strip()]
+    except (OSError, ValueError):
+        pass
+    wall = sum(totals.values())
+    entry = {'run': run, 'at': time.time(), 'wall': round(wall, 3),
+             'percent': {b: round(totals.get(b, 0) / wall * 100, 2) if wall else 0 for b in BUCKETS}}
+    history = [h for h in history if h['run'] != run] + [entry]
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(json.dumps(h) + '\n' for h in history)
+    return history
+
+
+def write_report(spans_file: str = None, run: str = None, out: str = None, history_path: str = None):
+    """Break a run's spans down into sleep/network/DOM/Python and write the HTML report; returns the totals."""
+    spans.flush()
+    spans_file = spans_file or spans.spans_path() or spans.DEFAULT_SPANS_PATH
+    run, records = load_spans(spans_file, run)
+    if not records:
+        print(f"⚠️ No spans in {spans_file}; run with EMT_SPANS=1 first")
+        return None
+    rows, totals = breakdown(records)
+    history = _history(history_path or os.getenv('EMT_ATTRIBUTION_HISTORY', DEFAULT_HISTORY_PATH), run, totals)
+    out = out or os.getenv('EMT_ATTRIBUTION_HTML', DEFAULT_REPORT_PATH)
+    with open(out, 'w', encoding='utf-8') as f:
+        f.write(render(run, records, rows, totals, history))
+    wall = sum(totals.values()) or 1
+    print(f"🧭 Wall-clock attribution ({out}): "
+          + ', '.join(f'{b} {totals.get(b, 0) / wall * 100:.0f}%' for b in BUCKETS))
+    return totals
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Attribute a run\'s wall-clock to sleep, network, DOM and Python.')
+    parser.add_argument('spans', nargs='?', help='spans JSONL (default: EMT_SPANS or spans.jsonl)')
+    parser.add_argument('--run', help='run id (default: the latest run in the file)')
+    parser.add_argument('--out', help='HTML file to write (default: attribution.html)')
+    args = parser.parse_args()
+    write_report(args.spans, args.run, args.out)
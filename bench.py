@@ -0,0 +1,252 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+from collections import defaultdict
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BENCH_DIR = os.path.join(HERE, '.bench')
+DEFAULT_HISTORY_PATH = os.path.join(BENCH_DIR, 'history.jsonl')
+
+# Every scenario here has its pages served by the stand-in site.
+SCENARIOS = (
+    'bench.booking_flow',
+    'bus_type_filter.automate_easemytrip',
+    'bus_operator_filter.automate_easemytrip',
+    'boarding_dropping_filter.automate_easemytrip',
+    'gps_filter.automate_easemytrip',
+    'image_filter.automate_easemytrip',
+    'recent_search.automate_easemytrip',
+    'offer_page.automate_offer_page',
+    'popular_bus_route.automate_popular_bus_route',
+    'buslogin.automate_easemytrip',
+)
+PERCENTILES = {'p50': 50, 'p95': 95, 'p99': 99}
+# Per-call probe spans from attribution.instrument(); too fine-grained to track.
+PROBE_PREFIXES = ('page.', 'locator.')
+
+
+def booking_flow():
+    """test_tc_005_click_search_button on a pooled page, the way the pytest fixture would set it up."""
+    from browser_pool import pooled_page
+    from bus_booking_flow import test_tc_005_click_search_button
+
+    with pooled_page() as page:
+        page.goto('https://www.easemytrip.com/bus/', wait_until='domcontentloaded')
+        page.wait_for_selector('#txtSrcCity', state='visible')
+        test_tc_005_click_search_button(page)
+
+
+def _git_rev():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _stats(values, failed=0):
+    from spans import percentile
+
+    stats = {name: round(percentile(values, p), 1) if values else None for name, p in PERCENTILES.items()}
+    stats.update(n=len(values), failed=failed)
+    return stats
+
+
+def summarize(records, results):
+    """Percentiles per scenario (from runner results) and per scenario step (from spans).
+
+    Failed runs and spans are counted but left out of the percentiles, so
+    a scenario that errors out early doesn't look faster.
+    """
+    by_scenario = defaultdict(list)
+    failed = defaultdict(int)
+    for r in results:
+        values = by_scenario[r['scenario']]
+        if r['status'] == 'passed':
+            values.append(r['seconds'] * 1000)
+        else:
+            failed[r['scenario']] += 1
+    steps = defaultdict(list)
+    step_failed = defaultdict(int)
+    for r in records:
+        if r['span'] == 'scenario' or r['span'].startswith(PROBE_PREFIXES):
+            continue
+        key = f"{r['scenario']}|{r['span']}"
+        values = steps[key]
+        if r['outcome'] == 'ok':
+            values.append(r['ms'])
+        else:
+            step_failed[key] += 1
+    return ({name: _stats(v, failed[name]) for name, v in sorted(by_scenario.items())},
+            {key: _stats(v, step_failed[key]) for key, v in sorted(steps.items())})
+
+
+def run_benchmark(names, runs, latency_ms=0.0, buses=40):
+    """Run each scenario runs times against the stand-in (or HAR replay) and return a history entry."""
+    # Everything below reads these at call time, so set them before the imports.
+    run_id = f'bench-{uuid.uuid4().hex[:8]}'
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    spans_file = os.path.join(BENCH_DIR, f'{run_id}.jsonl')
+    # buslogin saves its session; keep stand-in logins out of the real .auth/state.json.
+    os.environ.update(EMT_SPANS=spans_file, EMT_RUN_ID=run_id, EMT_RESUME='off', EMT_HEADLESS='1',
+                      EMT_AUTH_STATE=os.path.join(BENCH_DIR, 'auth', 'state.json'))
+    os.environ.pop('EMT_PAUSE_AT_END', None)
+
+    import spans
+    from attribution import load_spans
+    from browser_pool import close_pool
+    from har_replay import har_mode
+    from scenario_runner import run_scenario
+    from standin_site import StandinSite
+
+    spans.RUN_ID = run_id
+    site = None
+    if har_mode() == 'replay':
+        target = 'har-replay'
+    else:
+        if not os.getenv('EMT_STANDIN_URL'):
+            site = StandinSite(buses=buses, latency_ms=latency_ms).start()
+            os.environ['EMT_STANDIN_URL'] = site.base_url
+        target = os.environ['EMT_STANDIN_URL']
+    print(f"⏱️ Benchmarking {len(names)} scenarios x {runs} runs against {target}\n")
+    results = []
+    started = time.perf_counter()
+    try:
+        for name in names:
+            for i in range(runs):
+                result = run_scenario(name)
+                results.append(result)
+                status = '✅' if result['status'] == 'passed' else '❌'
+                print(f"   {status} {name} #{i + 1}: {result['seconds'] * 1000:.0f} ms")
+    finally:
+        close_pool()
+        spans.flush()
+        if site is not None:
+            site.stop()
+            os.environ.pop('EMT_STANDIN_URL', None)
+    _, records = load_spans(spans_file, run_id)
+    scenarios, steps = summarize(records, results)
+    return {'run': run_id, 'at': time.time(), 'rev': _git_rev(), 'target': target, 'runs': runs,
+            'wall_seconds': round(time.perf_counter() - started, 2), 'scenarios': scenarios, 'steps': steps}
+
+
+def load_history(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except (OSError, ValueError):
+        return []
+
+
+def append_history(path, entry):
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(entry) + '\n')
+
+
+def regressions(entry, baseline, track=('p50', 'p95'), threshold=0.15, min_delta_ms=50.0):
+    """What regressed vs baseline.
+
+    A tracked percentile regresses when it is slower by more than
+    threshold and min_delta_ms; a scenario or step regresses when it
+    failed more often than in the baseline.
+    """
+    found = []
+    for section in ('scenarios', 'steps'):
+        for key, stats in entry[section].items():
+            before = baseline.get(section, {}).get(key)
+            if not before:
+                continue
+            if stats.get('failed', 0) > before.get('failed', 0):
+                found.append((section, key, 'failed', before.get('failed', 0), stats['failed']))
+            for p in track:
+                old, new = before.get(p), stats.get(p)
+                if old is None or new is None:
+                    continue
+                if new - old > min_delta_ms and new > old * (1 + threshold):
+                    found.append((section, key, p, old, new))
+    return found
+
+
+def _ms(value):
+    return f'{value:>8.0f}' if value is not None else f"{'-':>8}"
+
+
+def print_summary(entry):
+    print(f"\n📊 === BENCHMARK {entry['run']} ({entry['runs']} runs, rev {entry['rev'] or '?'}) ===\n")
+    print(f"   {'scenario':<48} {'p50':>8} {'p95':>8} {'p99':>8} {'failed':>7}")
+    for name, s in entry['scenarios'].items():
+        print(f"   {name:<48} {_ms(s['p50'])} {_ms(s['p95'])} {_ms(s['p99'])} {s['failed']:>7}")
+    slowest = sorted(entry['steps'].items(), key=lambda kv: -(kv[1]['p95'] or 0))[:15]
+    print(f"\n   {'slowest steps (p95 ms)':<48} {'p50':>8} {'p95':>8} {'p99':>8} {'n':>7}")
+    for key, s in slowest:
+        print(f"   {key.split('|', 1)[1][:48]:<48} {_ms(s['p50'])} {_ms(s['p95'])} {_ms(s['p99'])} {s['n']:>7}")
+    print('')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the scenarios against the stand-in site or HAR replay.')
+    parser.add_argument('scenarios', nargs='*', help='module.function names (default: the tracked set)')
+    parser.add_argument('--runs', type=int, default=int(os.getenv('EMT_BENCH_RUNS', '5')))
+    parser.add_argument('--latency-ms', type=float, default=0, help='added to every stand-in response')
+    parser.add_argument('--history', default=os.getenv('EMT_BENCH_HISTORY', DEFAULT_HISTORY_PATH))
+    parser.add_argument('--baseline', default='last',
+                        help="run id to compare against, 'last' (the last run that passed) or 'none' "
+                             "(no gate; use it to accept an intended slowdown as the new baseline)")
+    parser.add_argument('--track', default=os.getenv('EMT_BENCH_TRACK', 'p50,p95'),
+                        help='comma-separated percentiles the gate checks')
+    parser.add_argument('--threshold', type=float, default=float(os.getenv('EMT_BENCH_THRESHOLD', '0.15')),
+                        help='allowed slowdown as a fraction, e.g. 0.15 for 15%%')
+    parser.add_argument('--min-delta-ms', type=float, default=float(os.getenv('EMT_BENCH_MIN_DELTA_MS', '50')),
+                        help='ignore slowdowns smaller than this')
+    parser.add_argument('--no-save', action='store_true',
+                        help="don't append this run to the history (runs that fail the gate never are)")
+    args = parser.parse_args(argv)
+
+    track = [p.strip() for p in args.track.split(',') if p.strip()]
+    unknown = set(track) - set(PERCENTILES)
+    if unknown:
+        parser.error(f"unknown percentile(s): {', '.join(sorted(unknown))}")
+
+    history = load_history(args.history)
+    if args.baseline not in ('last', 'none') and not any(h['run'] == args.baseline for h in history):
+        print(f"❌ Baseline {args.baseline} not found in {args.history}")
+        return 2
+    entry = run_benchmark(args.scenarios or list(SCENARIOS), args.runs, args.latency_ms)
+    print_summary(entry)
+
+    baseline = None
+    if args.baseline == 'last':
+        baseline = history[-1] if history else None
+    elif args.baseline != 'none':
+        baseline = next(h for h in history if h['run'] == args.baseline)
+    found = regressions(entry, baseline, track, args.threshold, args.min_delta_ms) if baseline else []
+    # Only runs that pass the gate go into the history; otherwise the next
+    # 'last' comparison would be against the regressed numbers and pass.
+    if not args.no_save and not found:
+        os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+        append_history(args.history, entry)
+
+    if args.baseline == 'none':
+        return 0
+    if baseline is None:
+        print("ℹ️ No baseline to compare against yet; this run becomes the first one.")
+        return 0
+    if not found:
+        print(f"✅ No regressions vs {baseline['run']} (tracking {', '.join(track)}, "
+              f"threshold {args.threshold:.0%})")
+        return 0
+    print(f"❌ {len(found)} regression(s) vs {baseline['run']} (run not added to {args.history}):")
+    for section, key, p, old, new in found:
+        if p == 'failed':
+            print(f"   {key.replace('|', ' › ')} failed: {old} → {new}")
+            continue
+        change = f'+{(new / old - 1) * 100:.0f}%' if old else 'new'
+        print(f"   {key.replace('|', ' › ')} {p}: {old:.0f} → {new:.0f} ms ({change})")
+    return 1
+
+if __name__ == '__main__':
+    sys.exit(main())
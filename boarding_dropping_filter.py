@@ -1,90 +1,45 @@
-from playwright.sync_api import sync_playwright
-import time
+import os
 from datetime import datetime, timedelta
-import re
+
+from browser_pool import pooled_page
+from datepicker import select_date
+from wait_policy import WaitPolicy
 
 def automate_easemytrip():
-    with sync_playwright() as p:
-        # Launch browser
-        browser = p.chromium.launch(headless=False)
-        page = browser.new_page()
+    with pooled_page() as page:
         
         # Set longer timeout
         page.set_default_timeout(60000)  # 60 seconds
+        waits = WaitPolicy(page)
         
         # Navigate to EaseMyTrip bus page
         print("Opening EaseMyTrip Bus page...")
         page.goto("https://www.easemytrip.com/bus/", wait_until="domcontentloaded")
         
-        # Wait for page to load
-        time.sleep(3)
+        # Wait for the search form rather than a fixed 3 s
+        waits.selector('page.load', '#txtSrcCity', sleep_ms=3000)
         print("Page loaded successfully!")
         
         # Select Source City - Delhi
         print("Selecting source city: Delhi...")
         page.fill("#txtSrcCity", "Delhi")
-        time.sleep(2)
-        page.wait_for_selector('.auto-sugg-pre ul li', state='visible', timeout=10000)
+        waits.selector('search.src_suggest', '.auto-sugg-pre ul li', sleep_ms=2000, timeout_ms=10000)
         page.locator('.auto-sugg-pre ul li:has-text("Delhi")').first.click()
-        time.sleep(1)
+        waits.selector('search.src_select', '.auto-sugg-pre ul li', state='hidden', sleep_ms=1000, timeout_ms=1000)
         print("Delhi selected!")
         
         # Select Destination City - Shimla
         print("Selecting destination city: Shimla...")
         page.fill("#txtDesCity", "Shimla")
-        time.sleep(2)
-        page.wait_for_selector('.auto-sugg-pre ul li', state='visible', timeout=10000)
+        waits.selector('search.dest_suggest', '.auto-sugg-pre ul li', sleep_ms=2000, timeout_ms=10000)
         page.locator('.auto-sugg-pre ul li:has-text("Shimla")').first.click()
-        time.sleep(1)
+        waits.selector('search.dest_select', '.auto-sugg-pre ul li', state='hidden', sleep_ms=1000, timeout_ms=1000)
         print("Shimla selected!")
         
         # Select Date (5 days from today)
         print("Selecting date (5 days from today)...")
-        page.click("#datepicker")
-        time.sleep(2)
-        
-        # Calculate 5 days from today
         target_date = datetime.now() + timedelta(days=5)
-        target_day = str(target_date.day)
-        target_month = target_date.month
-        target_year = target_date.year
-        
-        # Navigate calendar to the correct month/year
-        for _ in range(12):  # max 12 forward navigations
-            # Read current month and year from calendar header
-            try:
-                month_text = page.locator('.ui-datepicker-month').inner_text(timeout=3000)
-                year_text = page.locator('.ui-datepicker-year').inner_text(timeout=3000)
-            except:
-                month_text = page.locator('.ui-datepicker-title').inner_text(timeout=3000)
-                year_text = ""
-            
-            month_map = {
-                "January": 1, "February": 2, "March": 3, "April": 4,
-                "May": 5, "June": 6, "July": 7, "August": 8,
-                "September": 9, "October": 10, "November": 11, "December": 12
-            }
-            
-            cal_month = None
-            for name, num in month_map.items():
-                if name.lower() in month_text.lower():
-                    cal_month = num
-                    break
-            
-            cal_year = int(year_text.strip()) if year_text.strip().isdigit() else target_year
-            
-            print(f"   Calendar showing: {month_text} {cal_year}, Target: month={target_month} year={target_year}")
-            
-            if cal_month == target_month and cal_year == target_year:
-                break
-            
-            # Click next month button
-            page.locator('.ui-datepicker-next').click()
-            time.sleep(1)
-        
-        # Now click the correct day
-        page.locator(f'td[data-handler="selectDay"] a.ui-state-default:text-is("{target_day}")').first.click(force=True)
-        time.sleep(1)
+        select_date(page, target_date, waits)
         print(f"✅ Date selected: {target_date.strftime('%d %B %Y')}")
         
         # Click Search button and wait for results page
@@ -93,24 +48,20 @@ def automate_easemytrip():
         print("Waiting for bus list to load...")
         
         # Wait for URL to change to results page
-        try:
-            page.wait_for_url(re.compile(r'.*easemytrip\.com/home/list.*'), timeout=60000)
-        except:
+        if not waits.url('search.results_url', r'.*easemytrip\.com/home/list.*', timeout_ms=60000):
             print("URL didn't change, but continuing...")
         
-        time.sleep(5)
+        waits.selector('search.results', '.gen-cards', sleep_ms=5000, timeout_ms=5000)
         print("✅ Bus list loaded!")
         
         # ===== BOARDING POINT SELECT & DESELECT =====
         print("\n📍 Selecting Boarding Point...")
         try:
             boarding = page.locator('input[name="checkbox_brd"]').first
-            boarding.click(force=True)
+            waits.settle('filters.boarding.apply', lambda: boarding.click(force=True), sleep_ms=3000)
             print("   ✅ Boarding Point selected!")
-            time.sleep(3)
-            boarding.click(force=True)
+            waits.settle('filters.boarding.remove', lambda: boarding.click(force=True), sleep_ms=3000)
             print("   ✅ Boarding Point deselected!")
-            time.sleep(3)
         except Exception as e:
             print(f"   ⚠️ Error: {e}")
         
@@ -118,14 +69,12 @@ def automate_easemytrip():
         print("\n📍 Selecting Dropping Point...")
         try:
             dropping = page.locator('input[name="checkbox_drp"]').first
-            dropping.click(force=True)
+            waits.settle('filters.dropping.apply', lambda: dropping.click(force=True), sleep_ms=3000)
             print("   ✅ Dropping Point selected!")
-            time.sleep(3)
         except Exception as e:
             print(f"   ⚠️ Error: {e}")
         
         print("\n✅ Done!\n")
-        time.sleep(3)
         
         # ===== CLICK BOARDING & DROPPING TAB ON BUS LISTING =====
         print("\n📍 Clicking 'Boarding & Dropping Point' on bus listing...")
@@ -133,18 +82,17 @@ def automate_easemytrip():
             bd_tab = page.locator('li[id^="showboard"]').first
             bd_tab.click(force=True)
             print("   ✅ Boarding & Dropping Point tab clicked!")
-            time.sleep(3)
+            waits.stable('listing.boarding_tab', bd_tab, sleep_ms=3000, timeout_ms=3000)
         except Exception as e:
             print(f"   ⚠️ Error: {e}")
         
         print("\n✅ All Done!\n")
-        time.sleep(5)
-        
-        # Keep browser open to see final results
-        print("Keeping browser open for 10 seconds...")
-        time.sleep(10)
-        
-        browser.close()
+        waits.report()
+
+        # Keep the browser open to look at the results when debugging.
+        if os.getenv('EMT_PAUSE_AT_END', '').lower() in {'1', 'true', 'yes'}:
+            print("Keeping browser open for 10 seconds...")
+            page.wait_for_timeout(10_000)
         print("Automation completed successfully!")
 
 if __name__ == "__main__":
@@ -0,0 +1,293 @@
+import atexit
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+from playwright.sync_api import sync_playwright
+
+from asset_cache import get_asset_cache
+from attribution import instrument
+from browser_server import ensure_server, server_endpoint
+from city_cache import get_city_cache
+from har_replay import har_mode, har_session, record_options
+from net_profiles import routing_profile
+from session_state import get_session, logged_in_default
+from standin_site import standin_router
+
+try:
+    import psutil
+except ImportError:  # memory-based recycling is skipped without psutil
+    psutil = None
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+class _PooledBrowser:
+    """One Chromium process plus the warm contexts parked on it.
+
+    pid is the browser's main process when the pool launched it itself and
+    could tell it apart; None for CDP-attached browsers.
+    """
+
+    def __init__(self, browser, pid=None):
+        self.browser = browser
+        self.pid = pid
+        self.uses = 0
+        self.warm = deque()
+
+
+class BrowserPool:
+    """Keep N Chromium processes alive and hand out fresh, pre-warmed contexts.
+
+    Every lease gets its own BrowserContext (no shared cookies/storage).
+    A browser process is relaunched after max_uses leases or once its own
+    process tree (browser, renderers, GPU) uses more than max_rss_mb of
+    memory; the latter needs psutil and is skipped for attached browsers.
+
+    Every context also gets the net_profile request-routing profile
+    (EMT_NET_PROFILE, default functional-minimal; see net_profiles.py), the
+    shared on-disk asset cache (EMT_ASSET_CACHE=0 to disable), the city
+    autosuggest cache (EMT_CITY_CACHE=0 to disable) and, when
+    EMT_STANDIN_URL is set, is pointed at that local stand-in site.
+
+    With EMT_BROWSER_SERVER set (see browser_server.py) the pool attaches
+    to that long-lived Chromium over CDP instead of launching its own, so
+    short scripts skip browser startup; it falls back to launching if the
+    server can't be reached. Launch options don't apply to an attached
+    browser (except slow_mo).
+
+    Playwright's sync API is bound to the thread that started it, so a pool
+    must only be used from the thread that created it (see get_pool()).
+    """
+
+    def __init__(self, size=None, max_uses=None, max_rss_mb=None, warm_per_browser=1,
+                 headless=None, context_options=None, net_profile=None, **launch_options):
+        self.size = size or _env_int('EMT_POOL_SIZE', 1)
+        self.max_uses = max_uses or _env_int('EMT_POOL_MAX_USES', 20)
+        self.max_rss_mb = max_rss_mb or _env_int('EMT_POOL_MAX_RSS_MB', 1500)
+        self.warm_per_browser = warm_per_browser
+        if headless is None:
+            headless = os.getenv('EMT_HEADLESS', '').lower() in {'1', 'true', 'yes'}
+        self.launch_options = dict(launch_options, headless=headless)
+        self.context_options = context_options or {}
+        self.context_hooks = []
+        # Route handlers run newest first: the city cache, the stand-in, then
+        # the routing profile, then the asset cache for whatever the profile
+        # lets through.
+        self.asset_cache = get_asset_cache()
+        if self.asset_cache is not None:
+            self.add_context_hook(self.asset_cache.attach)
+        self.routing = routing_profile(net_profile)
+        self.add_context_hook(self.routing.attach)
+        standin = standin_router()
+        if standin is not None:
+            self.add_context_hook(standin.attach)
+        self.city_cache = get_city_cache()
+        if self.city_cache is not None:
+            self.add_context_hook(self.city_cache.attach)
+        self._playwright = None
+        self._browsers = []
+        self._next = 0
+
+    def start(self):
+        if self._playwright is None:
+            self._playwright = sync_playwright().start()
+            self._browsers = [self._launch() for _ in range(self.size)]
+        return self
+
+    def close(self):
+        if self._browsers:
+            self.routing.report()
+            if self.asset_cache is not None:
+                self.asset_cache.report()
+            if self.city_cache is not None:
+                self.city_cache.report()
+        for slot in self._browsers:
+            try:
+                slot.browser.close()
+            except Exception:
+                pass
+        self._browsers = []
+        if self._playwright is not None:
+            try:
+                self._playwright.stop()
+            except Exception:
+                pass
+            self._playwright = None
+
+    def add_context_hook(self, hook):
+        """Register hook(context) to run on every new context before it is handed out."""
+        self.context_hooks.append(hook)
+
+    def _connect(self):
+        endpoint = server_endpoint()
+        if endpoint is None or not ensure_server(endpoint):
+            return None
+        try:
+            return self._playwright.chromium.connect_over_cdp(endpoint, slow_mo=self.launch_options.get('slow_mo'))
+        except Exception as e:
+            print(f"⚠️ Could not attach to the browser server at {endpoint}, launching instead: {e}")
+            return None
+
+    def _launch(self):
+        browser = self._connect()
+        if browser is not None:
+            slot = _PooledBrowser(browser)
+        else:
+            # Pools on other threads launch too; one launch at a time keeps the
+            # before/after diff down to this browser's own process.
+            with _launch_lock:
+                before = _browser_pids()
+                browser = self._playwright.chromium.launch(**self.launch_options)
+                new = _browser_pids() - before
+            slot = _PooledBrowser(browser, pid=new.pop() if len(new) == 1 else None)
+            if psutil is not None and slot.pid is None:
+                print(f"⚠️ Could not identify the launched browser's process ({len(new)} candidates); "
+                      f"memory-based recycling is off for it")
+        for _ in range(self.warm_per_browser):
+            slot.warm.append(self._new_context(slot.browser))
+        return slot
+
+    def _new_context(self, browser, options=None):
+        context = browser.new_context(**{**self.context_options, **(options or {})})
+        for hook in self.context_hooks:
+            hook(context)
+        # Opening the first page spins up the renderer, which is the slow part.
+        page = context.new_page()
+        return context, page
+
+    def _memory_mb(self, slot):
+        """RSS of slot's browser process and its children; 0 if it can't be measured."""
+        if psutil is None or slot.pid is None:
+            return 0
+        try:
+            root = psutil.Process(slot.pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return 0
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                continue
+        return total / (1024 * 1024)
+
+    def _recycle_if_needed(self, index):
+        slot = self._browsers[index]
+        if slot.uses < self.max_uses:
+            memory_mb = self._memory_mb(slot)
+            if memory_mb < self.max_rss_mb:
+                return slot
+            reason = f'{memory_mb:.0f} MB RSS'
+        else:
+            reason = f'{slot.uses} uses'
+        print(f'♻️ Recycling pooled browser #{index} after {reason}')
+        try:
+            slot.browser.close()
+        except Exception:
+            pass
+        self._browsers[index] = self._launch()
+        return self._browsers[index]
+
+    def acquire(self, context_options=None):
+        """Return a (context, page) pair from the next browser in round-robin order.
+
+        context_options are layered over the pool's own context_options.
+        """
+        self.start()
+        index = self._next % len(self._browsers)
+        self._next += 1
+        slot = self._recycle_if_needed(index)
+        slot.uses += 1
+        if context_options is None and slot.warm:
+            return slot.warm.popleft()
+        return self._new_context(slot.browser, context_options)
+
+    def release(self, context):
+        """Close a leased context and top the warm queues back up for the next caller."""
+        try:
+            context.close()
+        except Exception:
+            pass
+        for slot in self._browsers:
+            while len(slot.warm) < self.warm_per_browser:
+                slot.warm.append(self._new_context(slot.browser))
+
+    @contextmanager
+    def page(self, context_options=None):
+        """Lease an isolated context and yield its page; the context is closed on exit."""
+        context, page = self.acquire(context_options)
+        try:
+            yield page
+        finally:
+            self.release(context)
+
+
+_launch_lock = threading.Lock()
+
+
+def _browser_pids():
+    """Main Chromium processes Playwright has launched under this process."""
+    if psutil is None:
+        return set()
+    pids = set()
+    for child in psutil.Process().children(recursive=True):
+        try:
+            args = child.cmdline()
+        except psutil.Error:
+            continue
+        # Renderer/GPU/utility processes carry --type=; the browser itself doesn't.
+        if '--remote-debugging-pipe' in args and not any(a.startswith('--type=') for a in args):
+            pids.add(child.pid)
+    return pids
+
+
+_local = threading.local()
+
+
+def get_pool(**options):
+    """Return this thread's shared pool, creating it with options on first use."""
+    pool = getattr(_local, 'pool', None)
+    if pool is None:
+        instrument()
+        pool = BrowserPool(**options)
+        _local.pool = pool
+        atexit.register(pool.close)
+    return pool
+
+
+def close_pool():
+    """Close this thread's shared pool, if one was started."""
+    pool = getattr(_local, 'pool', None)
+    if pool is not None:
+        pool.close()
+        _local.pool = None
+
+
+@contextmanager
+def pooled_page(context_options=None, logged_in=None):
+    """Shortcut used by the scripts: a fresh page from this thread's shared pool.
+
+    Honours EMT_HAR_MODE: 'record' writes the session to the scenario's HAR
+    archive, 'replay' serves it back from disk (see har_replay.py).
+    logged_in (default EMT_LOGGED_IN) starts the page signed in with the
+    shared session from session_state.py, logging in first only if needed.
+    """
+    if logged_in is None:
+        logged_in = logged_in_default()
+    # Fetched before leasing: a refresh logs in on a page of its own.
+    state = get_session().state() if logged_in else None
+    if har_mode() == 'record':
+        context_options = record_options(context_options)
+    with get_pool().page(context_options) as page:
+        if state is not None:
+            get_session().apply(page.context, state)
+        with har_session(page.context):
+            yield page
@@ -0,0 +1,187 @@
+import argparse
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PORT = 9333
+CHROMIUM_ARGS = [
+    '--no-first-run', '--no-default-browser-check', '--disable-background-networking',
+    '--disable-component-update', '--disable-sync', '--metrics-recording-only',
+    '--disable-dev-shm-usage',
+]
+
+
+def server_endpoint():
+    """CDP endpoint the scripts should attach to: EMT_BROWSER_SERVER, with 'auto'/'1' meaning the default port."""
+    value = os.getenv('EMT_BROWSER_SERVER', '')
+    if value.lower() in ('', '0', 'off', 'false', 'no'):
+        return None
+    if value.lower() in ('1', 'auto', 'true', 'yes'):
+        return f'http://127.0.0.1:{DEFAULT_PORT}'
+    return value.rstrip('/')
+
+
+def healthy(endpoint: str, timeout: float = 2.0):
+    """True if a browser answers on endpoint's /json/version."""
+    try:
+        with urllib.request.urlopen(f'{endpoint}/json/version', timeout=timeout) as response:
+            return 'webSocketDebuggerUrl' in json.loads(response.read())
+    except (OSError, ValueError):
+        return False
+
+
+def chromium_executable():
+    """Playwright's own Chromium, so the server runs the build the scripts were tested with."""
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as p:
+        return p.chromium.executable_path
+
+
+class BrowserServer:
+    """One long-lived Chromium that scripts attach to over CDP instead of launching their own.
+
+    A supervisor thread polls /json/version every check_s seconds and
+    relaunches the browser if the process died or stopped answering
+    `failures` checks in a row. Each launch gets a fresh profile directory.
+    """
+
+    def __init__(self, port: int = DEFAULT_PORT, headless: bool = True, check_s: float = 5, failures: int = 3,
+                 executable: str = None, extra_args=()):
+        self.port = port
+        self.headless = headless
+        self.check_s = check_s
+        self.failures = failures
+        self.executable = executable or os.getenv('EMT_CHROMIUM_PATH') or chromium_executable()
+        self.extra_args = list(extra_args)
+        self.endpoint = f'http://127.0.0.1:{port}'
+        self.restarts = 0
+        self._proc = None
+        self._profile = None
+        self._stop = threading.Event()
+        self._supervisor = None
+
+    def _launch(self):
+        self._profile = tempfile.mkdtemp(prefix='emt-browser-')
+        args = [self.executable, f'--remote-debugging-port={self.port}', '--remote-debugging-address=127.0.0.1',
+                f'--user-data-dir={self._profile}', *CHROMIUM_ARGS, *self.extra_args]
+        if self.headless:
+            args.append('--headless=new')
+        args.append('about:blank')
+        self._proc = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.time() + 30
+        while time.time() < deadline:
+            if self._proc.poll() is not None:
+                raise RuntimeError(f'Chromium exited with code {self._proc.returncode} on startup')
+            if healthy(self.endpoint, timeout=0.5):
+                return
+            time.sleep(0.1)
+        raise RuntimeError(f'Chromium did not open {self.endpoint} within 30 s')
+
+    def _kill(self):
+        if self._proc is not None and self._proc.poll() is None:
+            self._proc.terminate()
+            try:
+                self._proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+        self._proc = None
+        if self._profile:
+            shutil.rmtree(self._profile, ignore_errors=True)
+            self._profile = None
+
+    def restart(self, reason: str):
+        print(f"♻️ Restarting browser server ({reason})")
+        self._kill()
+        self._launch()
+        self.restarts += 1
+
+    def _supervise(self):
+        misses = 0
+        while not self._stop.wait(self.check_s):
+            if self._proc is None or self._proc.poll() is not None:
+                reason = 'process exited'
+            elif healthy(self.endpoint):
+                misses = 0
+                continue
+            else:
+                misses += 1
+                if misses < self.failures:
+                    continue
+                reason = f'{misses} failed health checks'
+            misses = 0
+            try:
+                self.restart(reason)
+            except Exception as e:
+                print(f"   ⚠️ Restart failed: {e}")
+
+    def start(self):
+        if healthy(self.endpoint, timeout=0.5):
+            raise RuntimeError(f'Something is already serving {self.endpoint}')
+        self._launch()
+        self._supervisor = threading.Thread(target=self._supervise, name='browser-server-supervisor', daemon=True)
+        self._supervisor.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._supervisor is not None:
+            self._supervisor.join(timeout=self.check_s + 1)
+        self._kill()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def ensure_server(endpoint: str, timeout: float = 30):
+    """Start a detached browser server for a local endpoint if nothing answers there yet."""
+    if healthy(endpoint, timeout=0.5):
+        return True
+    port = endpoint.rsplit(':', 1)[-1]
+    if not endpoint.startswith(('http://127.0.0.1:', 'http://localhost:')) or not port.isdigit():
+        return False
+    print(f"🖥️ Starting browser server on {endpoint}...")
+    subprocess.Popen([sys.executable, os.path.join(HERE, 'browser_server.py'), '--port', port],
+                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, stdin=subprocess.DEVNULL,
+                     start_new_session=True)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if healthy(endpoint, timeout=0.5):
+            return True
+        time.sleep(0.2)
+    return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Keep one Chromium running for the scripts to attach to.')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--headed', action='store_true')
+    parser.add_argument('--check-s', type=float, default=5, help='seconds between health checks')
+    args = parser.parse_args(argv)
+
+    server = BrowserServer(args.port, headless=not args.headed, check_s=args.check_s).start()
+    print(f"🖥️ Browser server on {server.endpoint}  (EMT_BROWSER_SERVER={server.endpoint})")
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+    try:
+        stopped.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(f"🛑 Browser server stopped after {server.restarts} restarts")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,59 +1,91 @@
 import os
 import pytest
-from playwright.sync_api import Page, expect, sync_playwright
+from playwright.sync_api import Page, expect
 from datetime import datetime, timedelta
-import time
 import re
 
+from attribution import instrument, write_report
+from browser_pool import get_pool
+from checkpoint import run_stages
+from city_cache import get_city_cache
+from datepicker import select_date
+from har_replay import har_mode, har_session, record_options
+from listing_extract import extract_table
+from listing_verify import check
+from net_profiles import routing_profile
+from seat_map import select_seat
+from selector_cache import get_resolver
+import spans
+from standin_site import standin_router
+from wait_policy import WaitPolicy
+
+
+@pytest.fixture(scope="session")
+def browser_context_args(browser_context_args):
+    """Record this flow's traffic to har/bus_booking_flow.har when EMT_HAR_MODE=record."""
+    if har_mode() == 'record':
+        return record_options(browser_context_args, 'bus_booking_flow')
+    return browser_context_args
+
 
 @pytest.fixture(scope="function")
 def setup(page: Page):
     """Setup fixture that navigates to the bus booking page"""
-    page.goto('https://www.easemytrip.com/bus/', wait_until='domcontentloaded')
-    expect(page).to_have_url(re.compile(r'.*easemytrip\.com/bus/.*'))
-    page.wait_for_timeout(500)
-    yield page
+    instrument()
+    routing = routing_profile()
+    routing.attach(page.context)
+    standin = standin_router()
+    if standin is not None:
+        standin.attach(page.context)
+    cities = get_city_cache()
+    if cities is not None:
+        cities.attach(page.context)  # registered last so it answers before the stand-in
+    with har_session(page.context, 'bus_booking_flow'):
+        page.goto('https://www.easemytrip.com/bus/', wait_until='domcontentloaded')
+        expect(page).to_have_url(re.compile(r'.*easemytrip\.com/bus/.*'))
+        page.wait_for_selector('#txtSrcCity', state='visible')
+        yield page
+    routing.report()
+    if cities is not None:
+        cities.report()
 
 
 def select_city(page: Page, input_selector: str, city_name: str):
     """Helper: fast city input and selection."""
-    city_input = page.locator(input_selector)
-    city_input.click()
-    city_input.fill(city_name)
-    page.wait_for_selector('.auto-sugg-pre ul li', state='visible', timeout=10000)
-    page.locator(f'.auto-sugg-pre ul li:has-text("{city_name}")').first.click()
+    with spans.span('search.select_city', city=city_name, field=input_selector):
+        city_input = page.locator(input_selector)
+        city_input.click()
+        city_input.fill(city_name)
+        page.wait_for_selector('.auto-sugg-pre ul li', state='visible', timeout=10000)
+        page.locator(f'.auto-sugg-pre ul li:has-text("{city_name}")').first.click()
 
 
 def click_reset(page: Page):
     """Click reset filter button."""
     try:
-        for sel in ['button:has-text("Reset")', 'a:has-text("Reset")', '[class*="reset"]']:
-            btn = page.locator(sel).first
-            if btn.count() > 0 and btn.is_visible(timeout=1000):
-                btn.click(force=True)
-                return
+        btn = get_resolver().resolve(page, 'filters.reset',
+                                     ['button:has-text("Reset")', 'a:has-text("Reset")', '[class*="reset"]'],
+                                     timeout=1000)
+        if btn:
+            btn.click(force=True)
     except:
         pass
 
 
-def apply_filter(page: Page, selectors: list):
+def apply_filter(page: Page, selectors: list, name: str = 'filters.option'):
     """Click first matching visible filter checkbox/label."""
-    for sel in selectors:
+    el = get_resolver().resolve(page, name, selectors, timeout=1500)
+    if el:
         try:
-            el = page.locator(sel).first
-            if el.count() > 0 and el.is_visible(timeout=1500):
-                el.click(force=True)
-                return True
+            el.click(force=True)
+            return True
         except:
-            continue
+            pass
     return False
 
 
-def test_tc_005_click_search_button(setup):
-    page = setup
-
-    print('\n🚌 === BUS BOOKING AUTOMATION STARTING ===\n')
-
+def stage_search(page: Page, waits: WaitPolicy, resolver):
+    """Steps 1-4: cities, date and search, ending on the bus list."""
     # STEP 1: Source city
     print('📍 Selecting Delhi...')
     select_city(page, '#txtSrcCity', 'Delhi')
@@ -62,21 +94,16 @@ def test_tc_005_click_search_button(setup):
     # STEP 2: Destination city
     print('📍 Selecting Jaipur...')
     select_city(page, '#txtDesCity', 'Jaipur')
-    page.wait_for_timeout(300)
+    waits.selector('search.dest_select', '.auto-sugg-pre ul li', state='hidden', sleep_ms=300, timeout_ms=1000)
     print('✅ Jaipur selected\n')
     
     # STEP 3: Date
     print('📍 Selecting date...')
     date_picker = page.locator('#datepicker')
     expect(date_picker).to_be_visible()
-    date_picker.click()
-    page.wait_for_timeout(200)
-    
     future_date = datetime.now() + timedelta(days=5)
-    day = future_date.day
-    page.locator(f'.ui-state-default:has-text("{day}")').first.click()
-    page.wait_for_timeout(300)
-    print(f'✅ Date selected: {day}\n')
+    select_date(page, future_date, waits)
+    print(f'✅ Date selected: {future_date.day}\n')
     
     # STEP 4: Search
     print('📍 Searching buses...')
@@ -84,17 +111,18 @@ def test_tc_005_click_search_button(setup):
     expect(search_button).to_be_visible()
     search_button.click()
     page.wait_for_url(re.compile(r'.*easemytrip\.com/home/list.*'), timeout=60000)
-    page.wait_for_timeout(300)
+    waits.selector('search.results', '.gen-cards', sleep_ms=300, timeout_ms=5000)
     print('✅ Bus list loaded\n')
-    
+
+
+def stage_filters(page: Page, waits: WaitPolicy, resolver):
+    """Apply, verify and reset each listing filter in turn."""
     # ===== FILTERS SECTION =====
     print('\n🔍 === APPLYING FILTERS ===\n')
     
     # FILTER: AC Bus Type Only
     print('📍 Applying AC Bus filter...')
     try:
-        page.wait_for_timeout(300)
-        
         # Try to find and click AC bus filter
         ac_selectors = [
             'input[type="checkbox"][value*="AC"], input[type="checkbox"][id*="ac"]',
@@ -103,63 +131,31 @@ def test_tc_005_click_search_button(setup):
             '[class*="filter"] input:has-text("AC")'
         ]
         
-        for selector in ac_selectors:
-            try:
-                ac_option = page.locator(selector).first
-                if ac_option.is_visible(timeout=2000):
-                    ac_option.click(force=True)
-                    print('✅ AC Bus filter applied')
-                    page.wait_for_timeout(300)
-                    break
-            except:
-                continue
-                
+        ac_option = resolver.resolve(page, 'filters.ac', ac_selectors)
+        if ac_option:
+            waits.settle('filters.ac.apply', lambda: ac_option.click(force=True), sleep_ms=1100)
+            print('✅ AC Bus filter applied')
+
         print('')
     except Exception as e:
         print(f'⚠️ AC Bus filter error: {e}\n')
     
     # Wait for filtered results to load
     print('📍 Waiting for filtered results...')
-    page.wait_for_timeout(200)
     print('✅ Filter applied successfully!\n')
     
     # VERIFY AC FILTER: Check if all buses in listing have AC/A/C
     print('📍 Verifying AC buses in listing...')
     try:
-        page.wait_for_timeout(300)
+        # One evaluation for the whole listing, one pass over it to verify
+        listing = extract_table(page)
         
-        # Find all bus listings
-        bus_listings = page.locator('[class*="bus"], [class*="list-item"], .result-item, div[ng-repeat]').all()
-        
-        if len(bus_listings) > 0:
-            ac_count = 0
-            non_ac_count = 0
-            
-            # Check first 5 bus listings
-            for i, bus in enumerate(bus_listings[:5]):
-                try:
-                    bus_text = bus.text_content() or ''
-                    bus_text_upper = bus_text.upper()
-                    
-                    # FIRST check if it's Non-AC (exclude these)
-                    if 'NON AC' in bus_text_upper or 'NON-AC' in bus_text_upper or 'NONAC' in bus_text_upper or 'NON A/C' in bus_text_upper:
-                        non_ac_count += 1
-                        print(f'   Bus {i+1}: Non-AC ❌')
-                    # THEN check if it's AC
-                    elif 'AC' in bus_text_upper or 'A/C' in bus_text_upper or 'A.C' in bus_text_upper:
-                        ac_count += 1
-                        print(f'   Bus {i+1}: AC ✅')
-                    else:
-                        # No AC/Non-AC label found
-                        print(f'   Bus {i+1}: Unknown ⚠️')
-                except:
-                    continue
-            
-            print(f'\n✅ AC Buses found: {ac_count}')
-            if non_ac_count > 0:
-                print(f'❌ Non-AC Buses found: {non_ac_count}')
+        if len(listing) > 0:
+            verdict = check(listing, 'ac')
+            verdict.report()
+            if not verdict.ok:
                 print('\n⚠️ TEST FAILED: Non-AC buses found after applying AC filter!\n')
-                assert False, f"AC Filter Failed: Found {non_ac_count} Non-AC buses in listing"
+                assert False, f"AC Filter Failed: Found {len(verdict.violations)} Non-AC buses in listing"
             else:
                 print('✅ All buses are AC - Filter working correctly!')
             print('')
@@ -174,7 +170,6 @@ def test_tc_005_click_search_button(setup):
     # RESET FILTER AFTER AC
     print('📍 Clicking Reset Filter...')
     try:
-        page.wait_for_timeout(500)
         reset_selectors = [
             'button:has-text("Reset")',
             'a:has-text("Reset")',
@@ -182,74 +177,43 @@ def test_tc_005_click_search_button(setup):
             '[class*="reset"]',
             '[id*="reset"]'
         ]
-        for selector in reset_selectors:
-            try:
-                reset_btn = page.locator(selector).first
-                if reset_btn.is_visible(timeout=2000):
-                    reset_btn.click(force=True)
-                    print('✅ Reset Filter clicked!\n')
-                    page.wait_for_timeout(500)
-                    break
-            except:
-                continue
+        reset_btn = resolver.resolve(page, 'filters.reset', reset_selectors)
+        if reset_btn:
+            waits.settle('filters.ac.reset', lambda: reset_btn.click(force=True), sleep_ms=1000)
+            print('✅ Reset Filter clicked!\n')
     except Exception as e:
         print(f'⚠️ Reset error: {e}\n')
     
     # FILTER: Non-AC Bus Type
     print('📍 Applying Non-AC Bus filter...')
     try:
-        page.wait_for_timeout(300)
         non_ac_selectors = [
             'input[type="checkbox"][value*="Non AC"]',
             'label:has-text("Non AC")',
             'input[value*="Non A/C"][type="checkbox"]'
         ]
-        for selector in non_ac_selectors:
-            try:
-                non_ac_option = page.locator(selector).first
-                if non_ac_option.is_visible(timeout=2000):
-                    non_ac_option.click(force=True)
-                    print('✅ Non-AC Bus filter applied')
-                    page.wait_for_timeout(300)
-                    break
-            except:
-                continue
+        non_ac_option = resolver.resolve(page, 'filters.non_ac', non_ac_selectors)
+        if non_ac_option:
+            waits.settle('filters.non_ac.apply', lambda: non_ac_option.click(force=True), sleep_ms=1100)
+            print('✅ Non-AC Bus filter applied')
         print('')
     except Exception as e:
         print(f'⚠️ Non-AC filter error: {e}\n')
     
     # Wait for Non-AC filtered results
     print('📍 Waiting for Non-AC filtered results...')
-    page.wait_for_timeout(200)
     print('✅ Non-AC Filter applied!\n')
     
     # VERIFY Non-AC FILTER
     print('📍 Verifying Non-AC buses...')
     try:
-        page.wait_for_timeout(300)
-        bus_listings = page.locator('[class*="bus"], [class*="list-item"], .result-item, div[ng-repeat]').all()
-        if len(bus_listings) > 0:
-            ac_count = 0
-            non_ac_count = 0
-            for i, bus in enumerate(bus_listings[:5]):
-                try:
-                    bus_text = bus.text_content() or ''
-                    bus_text_upper = bus_text.upper()
-                    if 'NON AC' in bus_text_upper or 'NON-AC' in bus_text_upper or 'NONAC' in bus_text_upper or 'NON A/C' in bus_text_upper:
-                        non_ac_count += 1
-                        print(f'   Bus {i+1}: Non-AC ✅')
-                    elif 'AC' in bus_text_upper or 'A/C' in bus_text_upper or 'A.C' in bus_text_upper:
-                        ac_count += 1
-                        print(f'   Bus {i+1}: AC ❌')
-                    else:
-                        print(f'   Bus {i+1}: Unknown ⚠️')
-                except:
-                    continue
-            print(f'\n✅ Non-AC Buses found: {non_ac_count}')
-            if ac_count > 0:
-                print(f'❌ AC Buses found: {ac_count}')
+        listing = extract_table(page)
+        if len(listing) > 0:
+            verdict = check(listing, 'non_ac')
+            verdict.report()
+            if not verdict.ok:
                 print('\n⚠️ TEST FAILED: AC buses found after Non-AC filter!\n')
-                assert False, f"Non-AC Filter Failed: Found {ac_count} AC buses"
+                assert False, f"Non-AC Filter Failed: Found {len(verdict.violations)} AC buses"
             else:
                 print('✅ All buses are Non-AC - Filter working!')
             print('')
@@ -263,116 +227,118 @@ def test_tc_005_click_search_button(setup):
     # RESET FILTER AFTER Non-AC
     print('📍 Clicking Reset Filter (final)...')
     try:
-        page.wait_for_timeout(500)
-        for selector in reset_selectors:
-            try:
-                reset_btn = page.locator(selector).first
-                if reset_btn.is_visible(timeout=2000):
-                    reset_btn.click(force=True)
-                    print('✅ Reset Filter clicked (final)!\n')
-                    page.wait_for_timeout(500)
-                    break
-            except:
-                continue
+        reset_btn = resolver.resolve(page, 'filters.reset', reset_selectors)
+        if reset_btn:
+            waits.settle('filters.non_ac.reset', lambda: reset_btn.click(force=True), sleep_ms=1000)
+            print('✅ Reset Filter clicked (final)!\n')
     except Exception as e:
         print(f'⚠️ Reset error: {e}\n')
     
     # FILTER: Sleeper Bus Type
     print('📍 Applying Sleeper Bus filter...')
     try:
-        page.wait_for_timeout(300)
         sleeper_selectors = [
             'input[type="checkbox"][value*="Sleeper"]',
             'label:has-text("Sleeper")',
             'input[id*="sleeper"][type="checkbox"]',
             '[class*="filter"] input:has-text("Sleeper")'
         ]
-        for selector in sleeper_selectors:
-            try:
-                sleeper_option = page.locator(selector).first
-                if sleeper_option.is_visible(timeout=2000):
-                    sleeper_option.click(force=True)
-                    print('✅ Sleeper Bus filter applied')
-                    page.wait_for_timeout(300)
-                    break
-            except:
-                continue
+        sleeper_option = resolver.resolve(page, 'filters.sleeper', sleeper_selectors)
+        if sleeper_option:
+            waits.settle('filters.sleeper.apply', lambda: sleeper_option.click(force=True), sleep_ms=800)
+            print('✅ Sleeper Bus filter applied')
         print('')
     except Exception as e:
         print(f'⚠️ Sleeper filter error: {e}\n')
     
     # Wait for Sleeper filtered results
     print('📍 Waiting for Sleeper filtered results...')
-    page.wait_for_timeout(200)
     print('✅ Sleeper Filter applied!\n')
     
+    # VERIFY Sleeper FILTER
+    print('📍 Verifying Sleeper buses...')
+    try:
+        listing = extract_table(page)
+        if len(listing) > 0:
+            verdict = check(listing, 'sleeper')
+            verdict.report()
+            if not verdict.ok:
+                print('\n⚠️ TEST FAILED: non-Sleeper buses found after Sleeper filter!\n')
+                assert False, f"Sleeper Filter Failed: Found {len(verdict.violations)} non-Sleeper buses"
+            else:
+                print('✅ All buses are Sleeper - Filter working!')
+            print('')
+        else:
+            print('⚠️ No bus listings found\n')
+    except AssertionError:
+        raise
+    except Exception as e:
+        print(f'⚠️ Sleeper Verification error: {e}\n')
+    
     # RESET FILTER AFTER Sleeper
     print('📍 Clicking Reset Filter...')
     try:
-        page.wait_for_timeout(500)
-        for selector in reset_selectors:
-            try:
-                reset_btn = page.locator(selector).first
-                if reset_btn.is_visible(timeout=2000):
-                    reset_btn.click(force=True)
-                    print('✅ Reset Filter clicked!\n')
-                    page.wait_for_timeout(500)
-                    break
-            except:
-                continue
+        reset_btn = resolver.resolve(page, 'filters.reset', reset_selectors)
+        if reset_btn:
+            waits.settle('filters.sleeper.reset', lambda: reset_btn.click(force=True), sleep_ms=1000)
+            print('✅ Reset Filter clicked!\n')
     except Exception as e:
         print(f'⚠️ Reset error: {e}\n')
     
     # FILTER: Seater Bus Type
     print('📍 Applying Seater Bus filter...')
     try:
-        page.wait_for_timeout(300)
         seater_selectors = [
             'input[type="checkbox"][value*="Seater"]',
             'label:has-text("Seater")',
             'input[id*="seater"][type="checkbox"]',
             '[class*="filter"] input:has-text("Seater")'
         ]
-        for selector in seater_selectors:
-            try:
-                seater_option = page.locator(selector).first
-                if seater_option.is_visible(timeout=2000):
-                    seater_option.click(force=True)
-                    print('✅ Seater Bus filter applied')
-                    page.wait_for_timeout(300)
-                    break
-            except:
-                continue
+        seater_option = resolver.resolve(page, 'filters.seater', seater_selectors)
+        if seater_option:
+            waits.settle('filters.seater.apply', lambda: seater_option.click(force=True), sleep_ms=800)
+            print('✅ Seater Bus filter applied')
         print('')
     except Exception as e:
         print(f'⚠️ Seater filter error: {e}\n')
     
     # Wait for Seater filtered results
     print('📍 Waiting for Seater filtered results...')
-    page.wait_for_timeout(200)
     print('✅ Seater Filter applied!\n')
     
+    # VERIFY Seater FILTER
+    print('📍 Verifying Seater buses...')
+    try:
+        listing = extract_table(page)
+        if len(listing) > 0:
+            verdict = check(listing, 'seater')
+            verdict.report()
+            if not verdict.ok:
+                print('\n⚠️ TEST FAILED: non-Seater buses found after Seater filter!\n')
+                assert False, f"Seater Filter Failed: Found {len(verdict.violations)} non-Seater buses"
+            else:
+                print('✅ All buses are Seater - Filter working!')
+            print('')
+        else:
+            print('⚠️ No bus listings found\n')
+    except AssertionError:
+        raise
+    except Exception as e:
+        print(f'⚠️ Seater Verification error: {e}\n')
+    
     # RESET FILTER AFTER Seater
     print('📍 Clicking Reset Filter (final)...')
     try:
-        page.wait_for_timeout(500)
-        for selector in reset_selectors:
-            try:
-                reset_btn = page.locator(selector).first
-                if reset_btn.is_visible(timeout=2000):
-                    reset_btn.click(force=True)
-                    print('✅ Reset Filter clicked (final)!\n')
-                    page.wait_for_timeout(500)
-                    break
-            except:
-                continue
+        reset_btn = resolver.resolve(page, 'filters.reset', reset_selectors)
+        if reset_btn:
+            waits.settle('filters.seater.reset', lambda: reset_btn.click(force=True), sleep_ms=1000)
+            print('✅ Reset Filter clicked (final)!\n')
     except Exception as e:
         print(f'⚠️ Reset error: {e}\n')
     
     # FILTER: Bus Operator - Click First Operator
     print('📍 Applying Bus Operator filter (first operator)...')
     try:
-        page.wait_for_timeout(300)
         operator_selectors = [
             '[class*="operator"] input[type="checkbox"]',
             '[class*="travels"] input[type="checkbox"]',
@@ -380,22 +346,11 @@ def test_tc_005_click_search_button(setup):
             'label:has-text("Travels") input[type="checkbox"]',
             '[class*="filter"] input[type="checkbox"]:has-text("Travels")'
         ]
-        operator_clicked = False
-        for selector in operator_selectors:
-            try:
-                operators = page.locator(selector)
-                if operators.count() > 0:
-                    first_operator = operators.first
-                    if first_operator.is_visible(timeout=2000):
-                        first_operator.click(force=True)
-                        print('✅ First Bus Operator filter applied')
-                        page.wait_for_timeout(300)
-                        operator_clicked = True
-                        break
-            except:
-                continue
-        
-        if not operator_clicked:
+        first_operator = resolver.resolve(page, 'filters.operator', operator_selectors)
+        if first_operator:
+            waits.settle('filters.operator.apply', lambda: first_operator.click(force=True), sleep_ms=800)
+            print('✅ First Bus Operator filter applied')
+        else:
             print('⚠️ Bus Operator filter not found')
         print('')
     except Exception as e:
@@ -403,122 +358,48 @@ def test_tc_005_click_search_button(setup):
     
     # Wait for Bus Operator filtered results
     print('📍 Waiting for Bus Operator filtered results...')
-    page.wait_for_timeout(200)
     print('✅ Bus Operator Filter applied!\n')
     
     # RESET FILTER AFTER Bus Operator
     print('📍 Clicking Reset Filter (final)...')
     try:
-        page.wait_for_timeout(500)
-        for selector in reset_selectors:
-            try:
-                reset_btn = page.locator(selector).first
-                if reset_btn.is_visible(timeout=2000):
-                    reset_btn.click(force=True)
-                    print('✅ Reset Filter clicked (final)!\n')
-                    page.wait_for_timeout(500)
-                    break
-            except:
-                continue
+        reset_btn = resolver.resolve(page, 'filters.reset', reset_selectors)
+        if reset_btn:
+            waits.settle('filters.operator.reset', lambda: reset_btn.click(force=True), sleep_ms=1000)
+            print('✅ Reset Filter clicked (final)!\n')
     except Exception as e:
         print(f'⚠️ Reset error: {e}\n')
     
     print('🔍 === FILTERS COMPLETED ===\n')
-    
+
+
+def stage_seat(page: Page, waits: WaitPolicy, resolver):
+    """Steps 5-9: seat layout, one seat, boarding/dropping points, Continue."""
     # STEP 5: Select seat button
     print('📍 Opening seat layout...')
     select_seat_button = page.locator('button:has-text("Select Seat"), a:has-text("Select Seat")').first
     expect(select_seat_button).to_be_visible(timeout=20000)
     select_seat_button.click()
-    page.wait_for_timeout(2000)
+    waits.selector('seat.layout', '[class*="seat"]', sleep_ms=2000, timeout_ms=10000)
     print('✅ Seat layout opened\n')
     
     # STEP 6: Select any ONE available seat (DYNAMIC - avoid booked/grey seats)
     print('📍 Selecting any available seat...')
     
-    seat_clicked = False
-    
     # Wait for seat layout to fully load
-    page.wait_for_timeout(2000)
-    
-    # Try multiple strategies to find and select available seats only
-    strategies = [
-        # Strategy 1: Available class seats
-        {
-            'selector': '[class*="avail"]:not([class*="booked"]):not([class*="grey"]):not([class*="disabled"])',
-            'name': 'Available seats'
-        },
-        # Strategy 2: ng-click seats that are available
-        {
-            'selector': '[ng-click*="SelectSeat"]:not([class*="booked"]):not([class*="grey"])',
-            'name': 'Clickable available seats'
-        },
-        # Strategy 3: Seats with specific available status
-        {
-            'selector': '.seat.available, .available-seat',
-            'name': 'Available seat class'
-        },
-        # Strategy 4: Visible seats excluding booked ones
-        {
-            'selector': '[class*="seat"]:not([class*="booked"]):not([class*="grey"]):not([class*="blocked"])',
-            'name': 'Non-booked seats'
-        }
-    ]
-    
-    for strategy in strategies:
-        if seat_clicked:
-            break
-            
-        try:
-            page.wait_for_timeout(500)
-            seats = page.locator(strategy['selector'])
-            total = seats.count()
-            
-            if total > 0:
-                # Try first 10 visible seats
-                for i in range(min(total, 10)):
-                    try:
-                        seat = seats.nth(i)
-                        
-                        if seat.is_visible(timeout=1000):
-                            # Check if seat is really available (not grey/disabled)
-                            seat_classes = seat.get_attribute('class') or ''
-                            
-                            # Skip if seat has booked/grey/disabled in class
-                            if any(word in seat_classes.lower() for word in ['booked', 'grey', 'disabled', 'blocked', 'unavailable']):
-                                continue
-                            
-                            # Scroll into view first
-                            seat.scroll_into_view_if_needed()
-                            page.wait_for_timeout(500)
-                            
-                            # Click the seat
-                            seat.click(force=True)
-                            page.wait_for_timeout(1500)
-                            
-                            # Verify seat is selected - check if class changed or selected class added
-                            seat_classes_after = seat.get_attribute('class') or ''
-                            if 'select' in seat_classes_after.lower() or seat_classes_after != seat_classes:
-                                print('✅ ONE SEAT SELECTED\n')
-                                seat_clicked = True
-                                break
-                    except:
-                        continue
-                
-                if seat_clicked:
-                    break
-        except:
-            continue
+    waits.stable('seat.layout_ready', '[class*="seat"]', sleep_ms=2000, timeout_ms=5000)
     
-    if not seat_clicked:
+    # Snapshot the whole deck in one call, then click by policy (EMT_SEAT_POLICY)
+    seat = select_seat(page, waits)
+    if seat:
+        print(f"✅ ONE SEAT SELECTED ({seat['id']}, {seat['deck']} {seat['berth']})\n")
+    else:
         print('⚠️ No available seat selected\n')
     
     # STEP 7 & 8: Boarding and Dropping
     print('📍 Selecting BOARDING & DROPPING points...')
     
     try:
-        page.wait_for_timeout(300)
-        
         # Find all clickable labels with ng-click
         labels = page.locator('label[ng-click]')
         label_count = labels.count()
@@ -539,11 +420,9 @@ def test_tc_005_click_search_button(setup):
                     if not boarding_clicked:
                         print('✅ BOARDING POINT SELECTED!')
                         boarding_clicked = True
-                        page.wait_for_timeout(200)
                     elif not dropping_clicked:
                         print('✅ DROPPING POINT SELECTED!\n')
                         dropping_clicked = True
-                        page.wait_for_timeout(200)
                         break
             except:
                 continue
@@ -556,8 +435,6 @@ def test_tc_005_click_search_button(setup):
     # STEP 9: Continue
     print('📍 Clicking Continue...')
     try:
-        page.wait_for_timeout(300)
-        
         # Try multiple selectors for continue button
         continue_selectors = [
             'button:has-text("Continue")',
@@ -569,34 +446,29 @@ def test_tc_005_click_search_button(setup):
         ]
         
         continue_clicked = False
-        for selector in continue_selectors:
-            try:
-                btn = page.locator(selector).first
-                if btn.is_visible(timeout=2000):
-                    print(f'   Found continue button with selector: {selector}')
-                    btn.click(force=True)
-                    print('✅ Continue clicked!\n')
-                    continue_clicked = True
-                    page.wait_for_timeout(5000)
-                    
-                    # Wait for next page to load
-                    print('📍 Waiting for next page...')
-                    page.wait_for_load_state('networkidle', timeout=30000)
-                    print('✅ Next page loaded!\n')
-                    break
-            except:
-                continue
+        btn = resolver.resolve(page, 'seat.continue', continue_selectors)
+        if btn:
+            btn.click(force=True)
+            print('✅ Continue clicked!\n')
+            continue_clicked = True
+
+            # Wait for next page to load
+            print('📍 Waiting for next page...')
+            waits.load('seat.continue', 'networkidle', sleep_ms=5000, timeout_ms=30000)
+            print('✅ Next page loaded!\n')
         
         if not continue_clicked:
             print('⚠️ Continue button not found\n')
     except Exception as e:
         print(f'⚠️ Error: {e}\n')
-    
+    return {'seat': seat}
+
+
+def stage_passenger(page: Page, waits: WaitPolicy, resolver):
+    """Steps 10-15: passenger details, insurance, contact, Continue to payment."""
     # STEP 10: Fill passenger details
     print('📍 Filling passenger details...')
     try:
-        page.wait_for_timeout(300)
-        
         # Select title as "Mr"
         print('   Selecting title: Mr')
         title_selectors = [
@@ -606,17 +478,10 @@ def test_tc_005_click_search_button(setup):
             'select:near(:text("Title"))'
         ]
         
-        for selector in title_selectors:
-            try:
-                title_dropdown = page.locator(selector).first
-                if title_dropdown.is_visible(timeout=2000):
-                    title_dropdown.select_option(label='Mr')
-                    print('✅ Title "Mr" selected')
-                    break
-            except:
-                continue
-        
-        page.wait_for_timeout(300)
+        title_dropdown = resolver.resolve(page, 'passenger.title', title_selectors)
+        if title_dropdown:
+            title_dropdown.select_option(label='Mr')
+            print('✅ Title "Mr" selected')
         
         # Fill first name as "test"
         print('   Filling first name: test')
@@ -627,17 +492,10 @@ def test_tc_005_click_search_button(setup):
             'input[placeholder*="first name"]'
         ]
         
-        for selector in fname_selectors:
-            try:
-                fname_field = page.locator(selector).first
-                if fname_field.is_visible(timeout=2000):
-                    fname_field.fill('test')
-                    print('✅ First name filled: test')
-                    break
-            except:
-                continue
-        
-        page.wait_for_timeout(300)
+        fname_field = resolver.resolve(page, 'passenger.first_name', fname_selectors)
+        if fname_field:
+            fname_field.fill('test')
+            print('✅ First name filled: test')
         
         # Fill last name as "test"
         print('   Filling last name: test')
@@ -648,17 +506,10 @@ def test_tc_005_click_search_button(setup):
             'input[placeholder*="last name"]'
         ]
         
-        for selector in lname_selectors:
-            try:
-                lname_field = page.locator(selector).first
-                if lname_field.is_visible(timeout=2000):
-                    lname_field.fill('test')
-                    print('✅ Last name filled: test')
-                    break
-            except:
-                continue
-        
-        page.wait_for_timeout(300)
+        lname_field = resolver.resolve(page, 'passenger.last_name', lname_selectors)
+        if lname_field:
+            lname_field.fill('test')
+            print('✅ Last name filled: test')
         
         # Fill age as "25"
         print('   Filling age: 25')
@@ -669,21 +520,14 @@ def test_tc_005_click_search_button(setup):
             'select[name*="age"], select[id*="age"]'
         ]
         
-        for selector in age_selectors:
-            try:
-                age_field = page.locator(selector).first
-                if age_field.is_visible(timeout=2000):
-                    # Check if it's a select dropdown or input field
-                    if 'select' in selector:
-                        age_field.select_option('25')
-                    else:
-                        age_field.fill('25')
-                    print('✅ Age filled: 25\n')
-                    break
-            except:
-                continue
-        
-        page.wait_for_timeout(200)
+        age_field = resolver.resolve(page, 'passenger.age', age_selectors)
+        if age_field:
+            # Check if it's a select dropdown or input field
+            if age_field.evaluate('el => el.tagName') == 'SELECT':
+                age_field.select_option('25')
+            else:
+                age_field.fill('25')
+            print('✅ Age filled: 25\n')
         
     except Exception as e:
         print(f'⚠️ Error filling details: {e}\n')
@@ -691,8 +535,6 @@ def test_tc_005_click_search_button(setup):
     # STEP 11: Select insurance - Yes
     print('📍 Selecting insurance: Yes')
     try:
-        page.wait_for_timeout(200)
-        
         # Try multiple selectors for insurance Yes option
         insurance_selectors = [
             'input[value="yes"][type="radio"]',
@@ -702,17 +544,10 @@ def test_tc_005_click_search_button(setup):
             'input[name*="insurance"]'
         ]
         
-        for selector in insurance_selectors:
-            try:
-                insurance_option = page.locator(selector).first
-                if insurance_option.is_visible(timeout=2000):
-                    insurance_option.click(force=True)
-                    print('✅ Insurance "Yes" selected')
-                    break
-            except:
-                continue
-        
-        page.wait_for_timeout(200)
+        insurance_option = resolver.resolve(page, 'passenger.insurance', insurance_selectors)
+        if insurance_option:
+            insurance_option.click(force=True)
+            print('✅ Insurance "Yes" selected')
         
     except Exception as e:
         print(f'⚠️ Error selecting insurance: {e}\n')
@@ -720,8 +555,6 @@ def test_tc_005_click_search_button(setup):
     # STEP 12: Select insurance condition checkbox
     print('📍 Selecting insurance condition...')
     try:
-        page.wait_for_timeout(300)
-        
         # Try to find and click insurance condition checkbox
         condition_selectors = [
             'input[type="checkbox"][name*="insurance"]',
@@ -731,17 +564,10 @@ def test_tc_005_click_search_button(setup):
             'input[type="checkbox"].insurance'
         ]
         
-        for selector in condition_selectors:
-            try:
-                checkbox = page.locator(selector).first
-                if checkbox.is_visible(timeout=2000):
-                    checkbox.check(force=True)
-                    print('✅ Insurance condition accepted\n')
-                    break
-            except:
-                continue
-        
-        page.wait_for_timeout(200)
+        checkbox = resolver.resolve(page, 'passenger.insurance_accept', condition_selectors)
+        if checkbox:
+            checkbox.check(force=True)
+            print('✅ Insurance condition accepted\n')
         
     except Exception as e:
         print(f'⚠️ Error selecting insurance condition: {e}\n')
@@ -749,8 +575,6 @@ def test_tc_005_click_search_button(setup):
     # STEP 13: Fill email
     print('📍 Filling email: cs@gmail.com')
     try:
-        page.wait_for_timeout(300)
-        
         # Try multiple selectors for email field
         email_selectors = [
             'input[type="email"]',
@@ -760,17 +584,10 @@ def test_tc_005_click_search_button(setup):
             'input[placeholder*="Email"]'
         ]
         
-        for selector in email_selectors:
-            try:
-                email_field = page.locator(selector).first
-                if email_field.is_visible(timeout=2000):
-                    email_field.fill('cs@gmail.com')
-                    print('✅ Email filled: cs@gmail.com\n')
-                    break
-            except:
-                continue
-        
-        page.wait_for_timeout(200)
+        email_field = resolver.resolve(page, 'passenger.email', email_selectors)
+        if email_field:
+            email_field.fill('cs@gmail.com')
+            print('✅ Email filled: cs@gmail.com\n')
         
     except Exception as e:
         print(f'⚠️ Error filling email: {e}\n')
@@ -778,8 +595,6 @@ def test_tc_005_click_search_button(setup):
     # STEP 14: Fill mobile number
     print('📍 Filling mobile number: 8445121366')
     try:
-        page.wait_for_timeout(200)
-        
         # Try multiple selectors for mobile field (avoid country code dropdown)
         mobile_selectors = [
             'input[maxlength="10"][type="tel"]',
@@ -792,7 +607,7 @@ def test_tc_005_click_search_button(setup):
         ]
         
         mobile_filled = False
-        for selector in mobile_selectors:
+        for selector in resolver.ordered(page, 'passenger.mobile', mobile_selectors):
             try:
                 mobile_fields = page.locator(selector)
                 count = mobile_fields.count()
@@ -811,20 +626,18 @@ def test_tc_005_click_search_button(setup):
                             if field_type in ['tel', 'text', 'number']:
                                 # Focus on the field
                                 mobile_field.click()
-                                page.wait_for_timeout(300)
                                 
                                 # Clear field completely
                                 mobile_field.fill('')
-                                page.wait_for_timeout(200)
                                 
                                 # Type the number
                                 mobile_field.type('8445121366', delay=50)
-                                page.wait_for_timeout(300)
                                 
                                 # Verify it was entered
                                 value = mobile_field.input_value()
                                 if '8445121366' in value or '844512' in value:
                                     print(f'✅ Mobile number filled: 8445121366\n')
+                                    resolver.record(page, 'passenger.mobile', selector)
                                     mobile_filled = True
                                     break
                     except:
@@ -838,19 +651,14 @@ def test_tc_005_click_search_button(setup):
         if not mobile_filled:
             print('⚠️ Mobile field not found or not filled properly\n')
         
-        page.wait_for_timeout(200)
-        
     except Exception as e:
         print(f'⚠️ Error filling mobile: {e}\n')
     
     # STEP 15: Click Continue to go to next page
     print('📍 Clicking Continue to next page...')
     try:
-        page.wait_for_timeout(300)
-        
         # Scroll to bottom to ensure button is visible
         page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-        page.wait_for_timeout(300)
         
         # Try multiple selectors for continue button
         continue_selectors = [
@@ -868,7 +676,7 @@ def test_tc_005_click_search_button(setup):
         ]
         
         continue_clicked = False
-        for selector in continue_selectors:
+        for selector in resolver.ordered(page, 'passenger.continue', continue_selectors):
             try:
                 buttons = page.locator(selector)
                 count = buttons.count()
@@ -883,14 +691,15 @@ def test_tc_005_click_search_button(setup):
                                 btn_text = btn.text_content()
                                 print(f'   Found button with text: {btn_text}')
                                 btn.scroll_into_view_if_needed()
-                                page.wait_for_timeout(200)
+                                current_url = page.url
                                 btn.click(force=True)
                                 print('✅ Continue clicked!\n')
+                                resolver.record(page, 'passenger.continue', selector)
                                 continue_clicked = True
-                                page.wait_for_timeout(5000)
                                 
                                 # Wait for next page to load
                                 print('📍 Waiting for next page...')
+                                waits.dom('passenger.continue', 'url => location.href !== url', arg=current_url, sleep_ms=5000, timeout_ms=10000)
                                 page.wait_for_load_state('domcontentloaded', timeout=30000)
                                 print('✅ Next page opened!\n')
                                 break
@@ -906,205 +715,231 @@ def test_tc_005_click_search_button(setup):
         if not continue_clicked:
             print('⚠️ Continue button not found')
             
-        page.wait_for_timeout(300)
-        
     except Exception as e:
         print(f'⚠️ Error clicking continue: {e}\n')
-    
+
+
+def stage_payment(page: Page, waits: WaitPolicy, resolver):
+    """Steps 16-18: Wallets, Bajaj Pay, Make Payment."""
     # STEP 16: Click on Wallets payment option
     print('📍 Selecting Wallets payment option...')
-    try:
-        page.wait_for_timeout(5000)
-        
-        wallet_clicked = False
-        
-        # Silently check if More button needs to be clicked first
+    with spans.span('payment.wallets') as step:
         try:
-            more_btn = page.locator('li:has-text("More")').first
-            if more_btn.is_visible(timeout=1000):
-                more_btn.scroll_into_view_if_needed()
-                page.wait_for_timeout(500)
-                more_btn.click(force=True)
-                page.wait_for_timeout(2000)
-        except:
-            pass
+            waits.selector('payment.options', 'text=Wallets', state='attached', sleep_ms=5000, timeout_ms=10000)
         
-        # Now click on Wallets directly
-        element_types = ['span', 'div', 'li', 'label', 'a']
+            wallet_clicked = False
         
-        for elem_type in element_types:
+            # Silently check if More button needs to be clicked first
             try:
-                selector = f'{elem_type}:has-text("Wallets")'
-                elements = page.locator(selector).all()
+                more_btn = page.locator('li:has-text("More")').first
+                if more_btn.is_visible(timeout=1000):
+                    more_btn.scroll_into_view_if_needed()
+                    more_btn.click(force=True)
+                    waits.selector('payment.more', 'text=Wallets', sleep_ms=2000, timeout_ms=2000)
+            except:
+                pass
+        
+            # Now click on Wallets directly
+            element_types = ['span', 'div', 'li', 'label', 'a']
+        
+            for elem_type in element_types:
+                try:
+                    selector = f'{elem_type}:has-text("Wallets")'
+                    elements = page.locator(selector).all()
                 
-                for elem in elements:
-                    try:
-                        text = elem.text_content() or ''
-                        if len(text.strip()) < 30 and text.strip() == 'Wallets':
-                            elem.scroll_into_view_if_needed(timeout=2000)
-                            page.wait_for_timeout(500)
-                            elem.click(timeout=2000)
-                            wallet_clicked = True
-                            page.wait_for_timeout(1000)
-                            break
-                    except:
+                    for elem in elements:
                         try:
-                            elem.click(force=True, timeout=2000)
-                            wallet_clicked = True
-                            page.wait_for_timeout(1000)
-                            break
+                            text = elem.text_content() or ''
+                            if len(text.strip()) < 30 and text.strip() == 'Wallets':
+                                elem.scroll_into_view_if_needed(timeout=2000)
+                                elem.click(timeout=2000)
+                                wallet_clicked = True
+                                break
                         except:
-                            continue
+                            try:
+                                elem.click(force=True, timeout=2000)
+                                wallet_clicked = True
+                                break
+                            except:
+                                continue
                 
-                if wallet_clicked:
-                    break
+                    if wallet_clicked:
+                        break
                     
-            except:
-                continue
+                except:
+                    continue
         
-        # JavaScript fallback
-        if not wallet_clicked:
-            try:
-                result = page.evaluate("""
-                    () => {
-                        const allElements = document.querySelectorAll('li, a, button, div, span, label');
-                        for (let elem of allElements) {
-                            const text = elem.textContent || '';
-                            if (text.trim() === 'Wallets') {
-                                elem.scrollIntoView({behavior: 'smooth', block: 'center'});
-                                elem.click();
-                                return {success: true};
+            # JavaScript fallback
+            if not wallet_clicked:
+                try:
+                    result = page.evaluate("""
+                        () => {
+                            const allElements = document.querySelectorAll('li, a, button, div, span, label');
+                            for (let elem of allElements) {
+                                const text = elem.textContent || '';
+                                if (text.trim() === 'Wallets') {
+                                    elem.scrollIntoView({behavior: 'smooth', block: 'center'});
+                                    elem.click();
+                                    return {success: true};
+                                }
                             }
+                            return {success: false};
                         }
-                        return {success: false};
-                    }
-                """)
+                    """)
                 
-                if result.get('success'):
-                    wallet_clicked = True
-                    page.wait_for_timeout(1000)
-            except:
-                pass
+                    if result.get('success'):
+                        wallet_clicked = True
+                except:
+                    pass
         
-        if wallet_clicked:
-            print('✅ Wallets clicked\n')
-        else:
-            print('⚠️ Wallets not found\n')
+            if wallet_clicked:
+                print('✅ Wallets clicked\n')
+            else:
+                print('⚠️ Wallets not found\n')
         
-        page.wait_for_timeout(1000)
+            waits.selector('payment.wallet_panel', '[id="rdoBajaj Pay"]', state='attached', sleep_ms=3000, timeout_ms=5000)
+            if not wallet_clicked:
+                step.fail('missing')
         
-    except Exception as e:
-        print(f'⚠️ Error selecting Wallets: {e}\n')
+        except Exception as e:
+            print(f'⚠️ Error selecting Wallets: {e}\n')
+            step.fail('error').set(error=str(e))
     
     # STEP 17: Select Bajaj Pay
     print('📍 Selecting Bajaj Pay...')
-    try:
-        page.wait_for_timeout(1000)
-        bajaj_clicked = False
-
-        # Exact id from page inspection: id="rdoBajaj Pay"
+    with spans.span('payment.bajaj') as step:
         try:
-            radio = page.locator('[id="rdoBajaj Pay"]').first
-            if radio.count() > 0:
-                radio.click(force=True)
-                print('✅ Bajaj Pay radio button clicked\n')
-                bajaj_clicked = True
-        except:
-            pass
+            bajaj_clicked = False
 
-        # Fallback: JS click using exact id
-        if not bajaj_clicked:
+            # Exact id from page inspection: id="rdoBajaj Pay"
             try:
-                result = page.evaluate("""() => {
-                    const radio = document.getElementById('rdoBajaj Pay');
-                    if (radio) { radio.click(); return 'radio_clicked'; }
-                    const all = Array.from(document.querySelectorAll('input[type="radio"]'));
-                    for (const r of all) {
-                        if ((r.value || '').toLowerCase().includes('bajaj') ||
-                            (r.id || '').toLowerCase().includes('bajaj')) {
-                            r.click();
-                            return 'fallback_clicked';
-                        }
-                    }
-                    return 'not_found';
-                }""")
-                if result in ('radio_clicked', 'fallback_clicked'):
-                    print(f'✅ Bajaj Pay selected via JS ({result})\n')
+                radio = page.locator('[id="rdoBajaj Pay"]').first
+                if radio.count() > 0:
+                    radio.click(force=True)
+                    print('✅ Bajaj Pay radio button clicked\n')
                     bajaj_clicked = True
             except:
                 pass
 
-        if not bajaj_clicked:
-            print('⚠️ Bajaj Pay radio button not found\n')
+            # Fallback: JS click using exact id
+            if not bajaj_clicked:
+                try:
+                    result = page.evaluate("""() => {
+                        const radio = document.getElementById('rdoBajaj Pay');
+                        if (radio) { radio.click(); return 'radio_clicked'; }
+                        const all = Array.from(document.querySelectorAll('input[type="radio"]'));
+                        for (const r of all) {
+                            if ((r.value || '').toLowerCase().includes('bajaj') ||
+                                (r.id || '').toLowerCase().includes('bajaj')) {
+                                r.click();
+                                return 'fallback_clicked';
+                            }
+                        }
+                        return 'not_found';
+                    }""")
+                    if result in ('radio_clicked', 'fallback_clicked'):
+                        print(f'✅ Bajaj Pay selected via JS ({result})\n')
+                        bajaj_clicked = True
+                except:
+                    pass
 
-        page.wait_for_timeout(1500)
+            if not bajaj_clicked:
+                print('⚠️ Bajaj Pay radio button not found\n')
+            if not bajaj_clicked:
+                step.fail('missing')
 
-    except Exception as e:
-        print(f'⚠️ Error selecting Bajaj Pay: {e}\n')
+        except Exception as e:
+            print(f'⚠️ Error selecting Bajaj Pay: {e}\n')
+            step.fail('error').set(error=str(e))
     
     # STEP 18: Click Make Payment button
     print('📍 Clicking Make Payment button...')
-    try:
-        # Wait for pp_paybtn to become visible after Bajaj Pay section expands
+    with spans.span('payment.pay') as step:
         try:
-            page.wait_for_selector('a.pp_paybtn', state='visible', timeout=5000)
-            print('   pp_paybtn is now visible')
-        except:
-            page.wait_for_timeout(2000)
+            # Wait for pp_paybtn to become visible after Bajaj Pay section expands
+            if waits.selector('payment.paybtn', 'a.pp_paybtn', sleep_ms=3500, timeout_ms=5000):
+                print('   pp_paybtn is now visible')
 
-        payment_clicked = False
-
-        # Try visible pp_paybtn first (not force)
-        try:
-            btns = page.locator('a.pp_paybtn').all()
-            for btn in btns:
-                if btn.is_visible(timeout=1000):
-                    btn.scroll_into_view_if_needed()
-                    btn.click()
-                    print('✅ Make Payment button clicked! (visible pp_paybtn)\n')
-                    payment_clicked = True
-                    break
-        except:
-            pass
+            payment_clicked = False
 
-        # Force click pp_paybtn if not visible yet
-        if not payment_clicked:
+            # Try visible pp_paybtn first (not force)
             try:
-                page.locator('a.pp_paybtn').first.click(force=True)
-                print('✅ Make Payment button clicked! (force pp_paybtn)\n')
-                payment_clicked = True
+                btns = page.locator('a.pp_paybtn').all()
+                for btn in btns:
+                    if btn.is_visible(timeout=1000):
+                        btn.scroll_into_view_if_needed()
+                        btn.click()
+                        print('✅ Make Payment button clicked! (visible pp_paybtn)\n')
+                        payment_clicked = True
+                        break
             except:
                 pass
 
-        # JS: click visible Make Payment button
-        if not payment_clicked:
-            result = page.evaluate("""() => {
-                const btns = document.querySelectorAll('a.pp_paybtn');
-                for (const btn of btns) {
-                    if (btn.offsetParent !== null) {
-                        btn.scrollIntoView({block:'center'});
-                        btn.click();
-                        return 'visible_pp_paybtn';
+            # Force click pp_paybtn if not visible yet
+            if not payment_clicked:
+                try:
+                    page.locator('a.pp_paybtn').first.click(force=True)
+                    print('✅ Make Payment button clicked! (force pp_paybtn)\n')
+                    payment_clicked = True
+                except:
+                    pass
+
+            # JS: click visible Make Payment button
+            if not payment_clicked:
+                result = page.evaluate("""() => {
+                    const btns = document.querySelectorAll('a.pp_paybtn');
+                    for (const btn of btns) {
+                        if (btn.offsetParent !== null) {
+                            btn.scrollIntoView({block:'center'});
+                            btn.click();
+                            return 'visible_pp_paybtn';
+                        }
                     }
-                }
-                // fallback: click any pp_paybtn
-                const btn = document.querySelector('a.pp_paybtn');
-                if (btn) { btn.click(); return 'force_pp_paybtn'; }
-                return null;
-            }""")
-            if result:
-                print(f'✅ Make Payment clicked via JS ({result})\n')
-                payment_clicked = True
+                    // fallback: click any pp_paybtn
+                    const btn = document.querySelector('a.pp_paybtn');
+                    if (btn) { btn.click(); return 'force_pp_paybtn'; }
+                    return null;
+                }""")
+                if result:
+                    print(f'✅ Make Payment clicked via JS ({result})\n')
+                    payment_clicked = True
 
-        if not payment_clicked:
-            print('⚠️ Make Payment button not found\n')
+            if not payment_clicked:
+                print('⚠️ Make Payment button not found\n')
 
-        page.wait_for_timeout(3000)
+            waits.load('payment.gateway', sleep_ms=3000, timeout_ms=3000)
+            if not payment_clicked:
+                step.fail('missing')
+
+        except Exception as e:
+            print(f'⚠️ Error clicking Make Payment: {e}\n')
+            step.fail('error').set(error=str(e))
+
+
+BOOKING_STAGES = (
+    ('search', stage_search),
+    ('filters', stage_filters),
+    ('seat', stage_seat),
+    ('passenger', stage_passenger),
+    ('payment', stage_payment),
+)
 
-    except Exception as e:
-        print(f'⚠️ Error clicking Make Payment: {e}\n')
+
+def test_tc_005_click_search_button(setup):
+    page = setup
+    waits = WaitPolicy(page)
+    resolver = get_resolver()
+
+    print('\n🚌 === BUS BOOKING AUTOMATION STARTING ===\n')
+
+    # Each stage is checkpointed; EMT_RESUME=auto (or a stage name) picks up
+    # from the last good one instead of starting over (see checkpoint.py).
+    run_stages(page, 'bus_booking_flow', BOOKING_STAGES, waits, resolver)
 
     print('🎉 === BOOKING FLOW COMPLETED ===\n')
+    waits.report()
+    if spans.spans_path():
+        write_report()
 
     # Keep the browser open for manual inspection when debugging.
     if os.getenv('EMT_PAUSE_AT_END', '').lower() in {'1', 'true', 'yes'}:
@@ -1119,20 +954,18 @@ def run_visual_demo():
     """Run the complete booking flow in a visible browser (no pytest runner)."""
     slowmo = int(os.getenv("EMT_SLOWMO", "200"))
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(
-            headless=False, 
-            slow_mo=slowmo,
-            args=['--disable-blink-features=AutomationControlled']
-        )
-        context = browser.new_context(
-            viewport={"width": 1400, "height": 900},
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        )
-        page = context.new_page()
+    pool = get_pool(
+        slow_mo=slowmo,
+        net_profile=os.getenv('EMT_NET_PROFILE', 'visual'),
+        args=['--disable-blink-features=AutomationControlled'],
+        context_options={
+            'viewport': {"width": 1400, "height": 900},
+            'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+        }
+    )
 
+    with pool.page() as page:
         page.goto('https://www.easemytrip.com/bus/', wait_until='networkidle', timeout=60000)
-        page.wait_for_timeout(2000)
 
         print('\n🚌 === VISUAL COMPLETE FLOW STARTING ===\n')
 
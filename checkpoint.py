@@ -0,0 +1,186 @@
+import json
+import os
+import threading
+import time
+
+import spans
+from session_state import get_session
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CHECKPOINT_DIR = os.path.join(HERE, '.checkpoints')
+
+# Marks a tab whose sessionStorage has already been restored.
+RESTORED_FLAG = '__emt_checkpoint_restored'
+
+# Everything a later stage might read back from the page: form fields
+# (keyed by a selector that finds them again) and sessionStorage.
+CAPTURE_SCRIPT = """(flag) => {
+    const q = s => s.replace(/["\\\\]/g, '\\\\$&');
+    const form = {};
+    for (const el of document.querySelectorAll('input, select, textarea')) {
+        if (el.type === 'password' || el.type === 'file') continue;
+        let key = el.id ? `[id="${q(el.id)}"]` : el.name ? `${el.tagName.toLowerCase()}[name="${q(el.name)}"]` : null;
+        if (!key) continue;
+        if (el.type === 'radio' && !el.id) key += `[value="${q(el.value)}"]`;
+        form[key] = (el.type === 'checkbox' || el.type === 'radio') ? {checked: el.checked} : {value: el.value};
+    }
+    const session = {};
+    try {
+        for (let i = 0; i < sessionStorage.length; i++) {
+            const key = sessionStorage.key(i);
+            if (key !== flag) session[key] = sessionStorage.getItem(key);
+        }
+    } catch (e) {}
+    return {form, session, origin: location.origin};
+}"""
+
+# Put captured values back and let Angular/jQuery see them change.
+RESTORE_SCRIPT = """(form) => {
+    let restored = 0;
+    for (const [key, saved] of Object.entries(form)) {
+        const el = document.querySelector(key);
+        if (!el) continue;
+        if ('checked' in saved) {
+            if (el.checked === saved.checked) continue;
+            el.checked = saved.checked;
+        } else {
+            if (el.value === saved.value) continue;
+            el.value = saved.value;
+        }
+        el.dispatchEvent(new Event('input', {bubbles: true}));
+        el.dispatchEvent(new Event('change', {bubbles: true}));
+        restored++;
+    }
+    return restored;
+}"""
+
+# Runs as an init script, so before the app reads sessionStorage, but only on
+# the first document of the origin: later navigations keep what the app wrote.
+SESSION_STORAGE_SCRIPT = """(() => {
+    const saved = %s;
+    if (location.origin !== saved.origin) return;
+    try {
+        if (sessionStorage.getItem(saved.flag)) return;
+        for (const [k, v] of Object.entries(saved.items)) sessionStorage.setItem(k, v);
+        sessionStorage.setItem(saved.flag, '1');
+    } catch (e) {}
+})();"""
+
+
+def capture(page, stage: str, data: dict = None):
+    """Snapshot the page after stage: URL, storage state, form values, plus stage data (e.g. the seat)."""
+    snapshot = page.evaluate(CAPTURE_SCRIPT, RESTORED_FLAG)
+    return {
+        'stage': stage,
+        'url': page.url,
+        'storage_state': page.context.storage_state(),
+        'session_storage': {'origin': snapshot['origin'], 'items': snapshot['session']},
+        'form': snapshot['form'],
+        'data': data or {},
+        'saved_at': time.time(),
+    }
+
+
+def restore(page, checkpoint):
+    """Put a fresh page back where checkpoint was taken."""
+    get_session().apply(page.context, checkpoint['storage_state'])
+    if checkpoint['session_storage']['items']:
+        page.context.add_init_script(SESSION_STORAGE_SCRIPT % json.dumps(dict(checkpoint['session_storage'],
+                                                                              flag=RESTORED_FLAG)))
+    page.goto(checkpoint['url'], wait_until='domcontentloaded')
+    try:
+        page.wait_for_load_state('networkidle', timeout=10000)
+    except Exception:
+        pass
+    return page.evaluate(RESTORE_SCRIPT, checkpoint['form'])
+
+
+class CheckpointStore:
+    """The last good checkpoint of each stage of one flow, in .checkpoints/<flow>.json.
+
+    EMT_RESUME picks where the next run starts: 'off' (the default) runs
+    everything, 'auto' resumes after the last stage that completed (if its
+    checkpoint is under EMT_CHECKPOINT_MAX_AGE_MIN old), and a stage name
+    starts at that stage from the checkpoint of the one before it.
+    """
+
+    def __init__(self, flow: str, root: str = None, max_age_min: float = None):
+        self.flow = flow
+        self.path = os.path.join(root or os.getenv('EMT_CHECKPOINT_DIR', DEFAULT_CHECKPOINT_DIR), f'{flow}.json')
+        self.max_age = (max_age_min or float(os.getenv('EMT_CHECKPOINT_MAX_AGE_MIN', '30'))) * 60
+
+    def load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self, checkpoint):
+        checkpoints = self.load()
+        checkpoints[checkpoint['stage']] = checkpoint
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(checkpoints, f)
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def start_index(self, stages, resume: str = None):
+        """(index of the first stage to run, checkpoint to restore first or None)."""
+        resume = (resume or os.getenv('EMT_RESUME', 'off')).lower()
+        if resume in ('', 'off', '0', 'false', 'no'):
+            return 0, None
+        checkpoints = self.load()
+        if resume == 'auto':
+            for index in range(len(stages) - 1, -1, -1):
+                checkpoint = checkpoints.get(stages[index])
+                if checkpoint and time.time() - checkpoint['saved_at'] < self.max_age:
+                    return index + 1, checkpoint
+            return 0, None
+        if resume not in stages:
+            raise ValueError(f"EMT_RESUME={resume!r}: expected off, auto or one of {', '.join(stages)}")
+        index = stages.index(resume)
+        if index == 0:
+            return 0, None
+        checkpoint = checkpoints.get(stages[index - 1])
+        if checkpoint is None:
+            raise RuntimeError(f"No '{stages[index - 1]}' checkpoint in {self.path} to start '{resume}' from")
+        return index, checkpoint
+
+
+def run_stages(page, flow: str, stages, *args):
+    """Run (name, func) stages as func(page, *args), checkpointing after each and resuming per EMT_RESUME.
+
+    Returns the data each stage returned, keyed by stage name (restored
+    stages included). Checkpoints are cleared once the whole flow passes.
+    """
+    store = CheckpointStore(flow)
+    names = [name for name, _ in stages]
+    start, checkpoint = store.start_index(names)
+    results = {}
+    if checkpoint is not None:
+        restored = restore(page, checkpoint)
+        saved = store.load()
+        for name in names[:start]:
+            results[name] = saved.get(name, {}).get('data', {})
+        print(f"⏩ Resuming {flow} at '{names[start] if start < len(names) else 'end'}' "
+              f"from the '{checkpoint['stage']}' checkpoint ({restored} form fields restored)\n")
+    for name, func in stages[start:]:
+        try:
+            with spans.span(name, flow=flow):
+                results[name] = func(page, *args) or {}
+        except Exception:
+            print(f"💾 '{name}' failed; rerun with EMT_RESUME=auto to start from here")
+            raise
+        try:
+            store.save(capture(page, name, results[name]))
+        except Exception as e:
+            print(f"⚠️ Could not checkpoint '{name}': {e}")
+    store.clear()
+    return results
@@ -0,0 +1,176 @@
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from har_replay import request_key
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_PATH = os.path.join(HERE, '.city_cache.sqlite')
+# Autosuggest endpoints: the live site's auto-suggest service and the stand-in's /api/cities.
+DEFAULT_PATTERN = r'auto-?sugg|/api/cities'
+
+# Version 2 dropped the parsed `cities` column nothing read.
+SCHEMA_VERSION = 2
+SCHEMA = """CREATE TABLE IF NOT EXISTS suggestions (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    content_type TEXT NOT NULL,
+    body BLOB NOT NULL,
+    stored REAL NOT NULL
+)"""
+
+
+class CityCache:
+    """Persistent cache of city-autosuggest responses, keyed by the query URL.
+
+    Attached to a context it answers autosuggest requests it has already
+    seen from disk, so select_city() and the inline copies in the scripts
+    get their dropdown without a round trip; anything else falls through
+    to the rest of the routing chain. Responses are learnt from the
+    context's 'response' events, which fire whoever fulfilled the request
+    (network, stand-in or HAR replay). Entries expire after ttl_hours.
+    """
+
+    def __init__(self, path: str = None, ttl_hours: float = None, pattern: str = None):
+        self.path = path or os.getenv('EMT_CITY_CACHE_PATH', DEFAULT_CACHE_PATH)
+        self.ttl = (ttl_hours or float(os.getenv('EMT_CITY_CACHE_TTL_H', '168'))) * 3600
+        self.pattern = re.compile(pattern or os.getenv('EMT_AUTOSUGGEST_PATTERN', DEFAULT_PATTERN), re.I)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = self.learnt = 0
+        with self._db() as db:
+            if db.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+                # Cached suggestions are cheap to relearn; start over rather than migrate.
+                db.execute('DROP TABLE IF EXISTS suggestions')
+                db.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            db.execute(SCHEMA)
+
+    def _db(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute('PRAGMA journal_mode=WAL')
+            self._local.db = db
+        return db
+
+    def _key(self, request):
+        if request.resource_type not in ('xhr', 'fetch') or not self.pattern.search(request.url):
+            return None
+        return '|'.join(request_key(request.method, request.url, request.post_data_buffer))
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    # ----- storage -----
+
+    def lookup(self, key):
+        row = self._db().execute('SELECT content_type, body FROM suggestions WHERE key = ? AND stored > ?',
+                                 (key, time.time() - self.ttl)).fetchone()
+        if row is None:
+            return None
+        return {'content_type': row[0], 'body': row[1]}
+
+    def store(self, key, url, content_type, body):
+        try:
+            json.loads(body)  # don't cache error pages served with a 200
+        except ValueError:
+            return
+        with self._db() as db:
+            db.execute('INSERT OR REPLACE INTO suggestions VALUES (?, ?, ?, ?, ?)',
+                       (key, url, content_type, body, time.time()))
+        self._count('learnt')
+
+    def purge(self):
+        """Drop expired entries."""
+        with self._db() as db:
+            db.execute('DELETE FROM suggestions WHERE stored <= ?', (time.time() - self.ttl,))
+
+    # ----- routing -----
+
+    def _fulfill(self, route, cached):
+        self._count('hits')
+        return route.fulfill(status=200, content_type=cached['content_type'], body=cached['body'],
+                             headers={'access-control-allow-origin': '*'})
+
+    def _handle(self, route):
+        key = self._key(route.request)
+        cached = key and self.lookup(key)
+        if not cached:
+            return route.fallback()
+        return self._fulfill(route, cached)
+
+    # The async variants keep sqlite off the event loop.
+
+    async def _handle_async(self, route):
+        key = self._key(route.request)
+        cached = key and await asyncio.to_thread(self.lookup, key)
+        if not cached:
+            return await route.fallback()
+        return await self._fulfill(route, cached)
+
+    def _candidate(self, response):
+        key = self._key(response.request)
+        if key is None or response.status != 200:
+            return None
+        return key
+
+    def _wanted(self, response):
+        key = self._candidate(response)
+        if key is None or self.lookup(key) is not None:
+            return None
+        return key
+
+    def _learn(self, response):
+        key = self._wanted(response)
+        if key is None:
+            return
+        try:
+            body = response.body()
+        except Exception:
+            return
+        self.store(key, response.url, response.headers.get('content-type', 'application/json'), body)
+
+    async def _learn_async(self, response):
+        key = self._candidate(response)
+        if key is None or await asyncio.to_thread(self.lookup, key) is not None:
+            return
+        try:
+            body = await response.body()
+        except Exception:
+            return
+        await asyncio.to_thread(self.store, key, response.url,
+                                response.headers.get('content-type', 'application/json'), body)
+
+    def attach(self, context):
+        """Serve and learn this context's autosuggest calls (usable as a BrowserPool context hook)."""
+        context.route(self.pattern, self._handle)
+        context.on('response', self._learn)
+
+    async def attach_async(self, context):
+        await context.route(self.pattern, self._handle_async)
+        context.on('response', self._learn_async)
+
+    def report(self):
+        if not self.hits and not self.learnt:
+            return
+        print(f"🏙️ City cache: {self.hits} autosuggest calls served from cache, {self.learnt} learnt")
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def get_city_cache():
+    """The process-wide cache, or None when EMT_CITY_CACHE=0."""
+    global _default
+    if os.getenv('EMT_CITY_CACHE', '1').lower() in {'0', 'false', 'no', 'off'}:
+        return None
+    with _default_lock:
+        if _default is None:
+            _default = CityCache()
+        return _default
@@ -0,0 +1,54 @@
+from datetime import datetime
+
+from wait_policy import WaitPolicy
+
+# Runs in the page: work out how many months the open jQuery UI calendar is
+# away from the target and jump there in one go. Uses the widget's own
+# _adjustDate when jQuery is reachable, otherwise clicks "next" in-page,
+# which re-renders synchronously. Either way it is a single round trip.
+JUMP_SCRIPT = """([selector, year, month]) => {
+    const MONTHS = ['january', 'february', 'march', 'april', 'may', 'june', 'july',
+                    'august', 'september', 'october', 'november', 'december'];
+    const shown = () => {
+        const title = (document.querySelector('.ui-datepicker-title') || {}).textContent || '';
+        const m = MONTHS.findIndex(name => title.toLowerCase().includes(name)) + 1;
+        const y = parseInt((title.match(/\\d{4}/) || [year])[0], 10);
+        return m ? (y * 12 + m) - (year * 12 + month) : NaN;
+    };
+    const offset = -shown();
+    if (Number.isNaN(offset)) return {offset: 0, via: 'failed'};
+    if (offset === 0) return {offset, via: 'none'};
+    const $ = window.jQuery;
+    const input = document.querySelector(selector);
+    if ($ && $.datepicker && input && $.datepicker._adjustDate) {
+        $.datepicker._adjustDate(input, offset, 'M');
+        if (shown() === 0) return {offset, via: 'widget'};
+    }
+    const step = offset > 0 ? '.ui-datepicker-next' : '.ui-datepicker-prev';
+    for (let i = 0; i < 24 && shown() !== 0; i++) {
+        const btn = document.querySelector(step);
+        if (!btn || btn.classList.contains('ui-state-disabled')) break;
+        btn.click();
+    }
+    return {offset, via: shown() === 0 ? 'clicks' : 'failed'};
+}"""
+
+DAY_SELECTOR = 'td[data-handler="selectDay"] a.ui-state-default:text-is("{day}")'
+
+
+def select_date(page, target_date: datetime, waits: WaitPolicy = None, input_selector: str = '#datepicker'):
+    """Open the datepicker, jump straight to target_date's month and click the day.
+
+    Costs the same for tomorrow and for a date months ahead.
+    """
+    waits = waits or WaitPolicy(page)
+    page.click(input_selector)
+    waits.selector('search.datepicker', '.ui-datepicker-calendar', sleep_ms=2000, timeout_ms=5000)
+
+    jump = page.evaluate(JUMP_SCRIPT, [input_selector, target_date.year, target_date.month])
+    if jump['via'] == 'failed':
+        print(f"   ⚠️ Datepicker could not reach {target_date.strftime('%B %Y')}")
+
+    page.locator(DAY_SELECTOR.format(day=target_date.day)).first.click(force=True)
+    waits.selector('search.date_select', '.ui-datepicker-calendar', state='hidden', sleep_ms=1000, timeout_ms=1000)
+    return jump
@@ -0,0 +1,179 @@
+import base64
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_HAR_DIR = os.path.join(HERE, 'har')
+
+# Cache-busting query parameters that change on every load and would stop
+# a replayed request from matching its recording. Only names that are never
+# content: 'v'/'t' often pin an asset version, so app.js?v=1 and ?v=2 must
+# stay distinct.
+VOLATILE_PARAMS = frozenset({'_', 'cb', 'ts', 'timestamp', 'rnd', 'random', 'nocache'})
+# Headers that describe the original transfer, not the decoded body we serve.
+DROP_HEADERS = frozenset({'content-encoding', 'content-length', 'transfer-encoding'})
+
+_local = threading.local()
+
+
+def har_mode():
+    """EMT_HAR_MODE: 'record', 'replay' or 'off' (the default)."""
+    return os.getenv('EMT_HAR_MODE', 'off').lower()
+
+
+def current_scenario():
+    """Name archives are filed under: set by scenario(), else the running script's name."""
+    return getattr(_local, 'scenario', None) or os.path.splitext(os.path.basename(sys.argv[0]))[0] or 'session'
+
+
+@contextmanager
+def scenario(name: str):
+    """File this thread's recordings/replays under name while the block runs."""
+    previous = getattr(_local, 'scenario', None)
+    _local.scenario = name
+    try:
+        yield
+    finally:
+        _local.scenario = previous
+
+
+def har_path(name: str = None):
+    return os.path.join(os.getenv('EMT_HAR_DIR', DEFAULT_HAR_DIR), f'{name or current_scenario()}.har')
+
+
+def normalize_url(url: str):
+    """Lower-case host, no fragment, query sorted and stripped of cache busters."""
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if k.lower() not in VOLATILE_PARAMS)
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or '/', urlencode(query), ''))
+
+
+def body_hash(body):
+    """Stable hash of a request body; JSON bodies are canonicalised first."""
+    if not body:
+        return ''
+    if isinstance(body, bytes):
+        body = body.decode('utf-8', 'replace')
+    try:
+        body = json.dumps(json.loads(body), sort_keys=True, separators=(',', ':'))
+    except ValueError:
+        pass
+    return hashlib.sha1(body.encode()).hexdigest()
+
+
+def request_key(method: str, url: str, body=None):
+    return method.upper(), normalize_url(url), body_hash(body)
+
+
+class HarArchive:
+    """A HAR file indexed by (method, normalized URL, body hash).
+
+    Lookups are a single dict access however large the archive gets.
+    Requests recorded more than once are served in recorded order, then
+    the last response repeats, so replay is deterministic.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.index = defaultdict(list)
+        with open(path, encoding='utf-8') as f:
+            entries = json.load(f)['log']['entries']
+        for entry in entries:
+            request, response = entry['request'], entry['response']
+            if response.get('status', 0) <= 0:
+                continue  # aborted or failed while recording
+            key = request_key(request['method'], request['url'], (request.get('postData') or {}).get('text'))
+            self.index[key].append(self._response(response))
+
+    @staticmethod
+    def _response(response):
+        content = response.get('content') or {}
+        text = content.get('text') or ''
+        body = base64.b64decode(text) if content.get('encoding') == 'base64' else text.encode()
+        headers = {h['name']: h['value'] for h in response.get('headers', [])
+                   if h['name'].lower() not in DROP_HEADERS}
+        return {'status': response['status'], 'headers': headers, 'body': body}
+
+    def __len__(self):
+        return sum(len(v) for v in self.index.values())
+
+
+_archives = {}
+_archives_lock = threading.Lock()
+
+
+def load_archive(path: str):
+    """Parse and index an archive once per process (reloaded if the file changes)."""
+    try:
+        mtime = os.path.getmtime(path)
+    except FileNotFoundError:
+        name = os.path.splitext(os.path.basename(path))[0]
+        raise FileNotFoundError(f"No HAR archive for scenario {name!r} at {path}; "
+                                f"record it first with EMT_HAR_MODE=record") from None
+    with _archives_lock:
+        cached = _archives.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = _archives[path] = (mtime, HarArchive(path))
+        return cached[1]
+
+
+class HarReplayer:
+    """Serves one context's requests from a HarArchive; anything unrecorded is aborted."""
+
+    def __init__(self, archive: HarArchive):
+        self.archive = archive
+        self.served = defaultdict(int)
+        self.hits = 0
+        self.misses = []
+
+    def _handle(self, route):
+        request = route.request
+        key = request_key(request.method, request.url, request.post_data_buffer)
+        responses = self.archive.index.get(key)
+        if not responses:
+            self.misses.append(f'{request.method} {request.url}')
+            return route.abort('internetdisconnected')
+        n = self.served[key]
+        self.served[key] = n + 1
+        self.hits += 1
+        response = responses[min(n, len(responses) - 1)]
+        return route.fulfill(status=response['status'], headers=response['headers'], body=response['body'])
+
+    def attach(self, context):
+        # Registered after the pool's routing profile, so it gets first look at every request.
+        context.route('**/*', self._handle)
+
+    def report(self):
+        print(f"📼 Replayed {self.hits} requests from {os.path.basename(self.archive.path)}, "
+              f"{len(self.misses)} not in the archive")
+        for url in self.misses[:10]:
+            print(f"   ⚠️ {url}")
+
+
+def record_options(context_options=None, name: str = None):
+    """Context options that make Playwright write this scenario's traffic to its HAR on close."""
+    path = har_path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return dict(context_options or {}, record_har_path=path,
+                record_har_content='embed', record_har_mode='full')
+
+
+@contextmanager
+def har_session(context, name: str = None):
+    """Replay context from the scenario's archive while the block runs (no-op unless replaying)."""
+    if har_mode() != 'replay':
+        yield None
+        return
+    replayer = HarReplayer(load_archive(har_path(name)))
+    replayer.attach(context)
+    try:
+        yield replayer
+    finally:
+        replayer.report()
@@ -0,0 +1,79 @@
+from listing_table import ListingTable
+
+CARD_SELECTOR = '.gen-cards'
+
+# Runs in the page: turn every result card into a plain record in one pass.
+# The card markup is only loosely stable, so each field tries a few class
+# fragments and then falls back to parsing the card's text.
+EXTRACT_SCRIPT = """(cardSelector) => {
+    const norm = s => (s || '').replace(/\\s+/g, ' ').trim();
+    const pick = (card, fragments) => {
+        for (const fragment of fragments) {
+            const el = card.querySelector(fragment);
+            const text = el && norm(el.textContent);
+            if (text) return text;
+        }
+        return '';
+    };
+    const number = s => {
+        const m = (s || '').replace(/,/g, '').match(/\\d+(\\.\\d+)?/);
+        return m ? parseFloat(m[0]) : null;
+    };
+    const isNonAc = s => /non[\\s-]*a\\.?\\/?c/i.test(s);
+    const isAc = s => !isNonAc(s) && /\\ba\\.?\\/?c\\b/i.test(s);
+    return Array.from(document.querySelectorAll(cardSelector)).map((card, index) => {
+        const text = norm(card.textContent);
+        const busType = pick(card, ['[class*="bus-type"]', '[class*="bustype"]', '[class*="type"]']);
+        const typeText = busType || text;
+        const times = text.match(/\\b([01]?\\d|2[0-3]):[0-5]\\d\\b/g) || [];
+        const fares = (text.replace(/,/g, '').match(/(?:₹|Rs\\.?|INR)\\s*(\\d+(?:\\.\\d+)?)/gi) || [])
+            .map(number).filter(v => v !== null);
+        const seats = text.match(/(\\d+)\\s*(?:seats?|berths?)\\s*(?:left|available)?/i);
+        const badges = Array.from(card.querySelectorAll('[class*="ameniti"] [title], [class*="ameniti"] img[alt], [class*="ameniti"] li'))
+            .map(el => norm(el.getAttribute('title') || el.getAttribute('alt') || el.textContent))
+            .filter(Boolean);
+        return {
+            index,
+            operator: pick(card, ['[class*="trvls"]', '[class*="travels"]', '[class*="operator"]', 'h2', 'h3']),
+            bus_type: busType,
+            ac: isNonAc(typeText) ? false : (isAc(typeText) ? true : null),
+            sleeper: /sleeper/i.test(typeText),
+            seater: /seater/i.test(typeText),
+            seats_left: seats ? parseInt(seats[1], 10) : null,
+            fare: fares.length ? Math.min(...fares) : null,
+            departure: times[0] || null,
+            arrival: times[1] || null,
+            rating: number(pick(card, ['[class*="rating"]', '[class*="rate"]'])),
+            gps: /\\bgps\\b|track/i.test(text) || !!card.querySelector('[class*="gps"], [class*="track"]'),
+            amenities: Array.from(new Set(badges)),
+            boarding: pick(card, ['[class*="board"]', '[class*="bdpoint"]']),
+            dropping: pick(card, ['[class*="drop"]']),
+        };
+    });
+}"""
+
+
+def extract_listings(page, card_selector: str = CARD_SELECTOR):
+    """Every result card on /home/list as a record, in one page evaluation.
+
+    Each record has index, operator, bus_type, ac (True/False/None when the
+    card doesn't say), sleeper, seater, seats_left, fare, departure, arrival
+    ("HH:MM"), rating, gps, amenities, boarding and dropping.
+    """
+    try:
+        return page.evaluate(EXTRACT_SCRIPT, card_selector)
+    except Exception as e:
+        print(f"   ⚠️ Listing extraction failed: {e}")
+        return []
+
+
+def summarize(listings):
+    """One-line count of AC / Non-AC / unlabelled cards."""
+    ac = sum(1 for row in listings if row['ac'] is True)
+    non_ac = sum(1 for row in listings if row['ac'] is False)
+    return f"{len(listings)} buses: {ac} AC, {non_ac} Non-AC, {len(listings) - ac - non_ac} unlabelled"
+
+
+def extract_table(page, route: str = None, vocab=None, card_selector: str = CARD_SELECTOR):
+    """Like extract_listings(), but packed into a columnar ListingTable."""
+    return ListingTable.from_records(extract_listings(page, card_selector), route=route, vocab=vocab)
@@ -0,0 +1,228 @@
+from array import array
+from collections import Counter
+from itertools import compress
+
+# Bits in the flags column.
+AC = 1
+NON_AC = 2
+SLEEPER = 4
+SEATER = 8
+GPS = 16
+FLAG_NAMES = {'ac': AC, 'non_ac': NON_AC, 'sleeper': SLEEPER, 'seater': SEATER, 'gps': GPS}
+
+MISSING = -1
+NUMERIC = ('fare', 'departure', 'arrival', 'seats_left', 'rating')
+CATEGORICAL = ('route', 'operator', 'bus_type', 'boarding', 'dropping')
+
+
+def to_minutes(hhmm):
+    """'21:30' -> 1290, anything unparseable -> MISSING."""
+    try:
+        hours, minutes = hhmm.split(':')
+        return int(hours) * 60 + int(minutes)
+    except (AttributeError, ValueError):
+        return MISSING
+
+
+def is_missing(column, value):
+    # Float columns mark gaps with NaN, integer columns with MISSING.
+    return value != value if column in ('fare', 'rating') else value == MISSING
+
+
+def from_minutes(minutes):
+    return None if minutes == MISSING else f'{minutes // 60:02d}:{minutes % 60:02d}'
+
+
+class Vocabulary:
+    """Interns repeated strings (operators, bus types, stops) as small integer codes."""
+
+    __slots__ = ('values', 'codes')
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def code(self, value):
+        value = value or ''
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def __len__(self):
+        return len(self.values)
+
+
+class ListingTable:
+    """Extracted listings held column-wise in typed arrays.
+
+    Numbers live in array columns (fare and rating as floats, times as
+    minutes after midnight, seats as ints, MISSING or NaN where the card
+    didn't say), booleans in one flags byte, and strings as codes into a
+    shared Vocabulary. Amenities are stored CSR-style: amenity_codes plus
+    per-row offsets. A row costs tens of bytes instead of a dict of strings,
+    and every column supports the buffer protocol, so numpy.asarray(column)
+    works without copying when numpy is around.
+    """
+
+    __slots__ = ('vocab', 'fare', 'departure', 'arrival', 'seats_left', 'rating', 'flags',
+                 'route', 'operator', 'bus_type', 'boarding', 'dropping',
+                 'amenity_codes', 'amenity_offsets')
+
+    def __init__(self, vocab: Vocabulary = None):
+        self.vocab = vocab or Vocabulary()
+        self.fare = array('f')
+        self.departure = array('h')
+        self.arrival = array('h')
+        self.seats_left = array('h')
+        self.rating = array('f')
+        self.flags = array('B')
+        for name in CATEGORICAL:
+            setattr(self, name, array('I'))
+        self.amenity_codes = array('I')
+        self.amenity_offsets = array('I', [0])
+
+    @classmethod
+    def from_records(cls, records, route: str = None, vocab: Vocabulary = None):
+        table = cls(vocab)
+        table.extend(records, route)
+        return table
+
+    def append(self, record, route: str = None):
+        """Add one extract_listings() record."""
+        code = self.vocab.code
+        self.fare.append(record.get('fare') if record.get('fare') is not None else float('nan'))
+        self.departure.append(to_minutes(record.get('departure')))
+        self.arrival.append(to_minutes(record.get('arrival')))
+        seats = record.get('seats_left')
+        self.seats_left.append(MISSING if seats is None else seats)
+        rating = record.get('rating')
+        self.rating.append(float('nan') if rating is None else rating)
+        ac = record.get('ac')
+        self.flags.append((AC if ac is True else 0) | (NON_AC if ac is False else 0)
+                          | (SLEEPER if record.get('sleeper') else 0)
+                          | (SEATER if record.get('seater') else 0)
+                          | (GPS if record.get('gps') else 0))
+        self.route.append(code(route or record.get('route')))
+        for name in CATEGORICAL[1:]:
+            getattr(self, name).append(code(record.get(name)))
+        self.amenity_codes.extend(code(a) for a in record.get('amenities') or ())
+        self.amenity_offsets.append(len(self.amenity_codes))
+
+    def extend(self, records, route: str = None):
+        for record in records:
+            self.append(record, route)
+        return self
+
+    def __len__(self):
+        return len(self.flags)
+
+    def nbytes(self):
+        """Memory held by the column arrays (the shared vocabulary excluded)."""
+        columns = [getattr(self, name) for name in NUMERIC + CATEGORICAL]
+        columns += [self.flags, self.amenity_codes, self.amenity_offsets]
+        return sum(col.itemsize * len(col) for col in columns)
+
+    # ----- reading -----
+
+    def text(self, column: str, i: int):
+        return self.vocab.values[getattr(self, column)[i]]
+
+    def amenities(self, i: int):
+        start, end = self.amenity_offsets[i], self.amenity_offsets[i + 1]
+        return [self.vocab.values[c] for c in self.amenity_codes[start:end]]
+
+    def row(self, i: int):
+        """Row i back as an extract_listings()-shaped dict."""
+        flags = self.flags[i]
+        seats = self.seats_left[i]
+        fare, rating = self.fare[i], self.rating[i]
+        return {
+            'index': i,
+            'route': self.text('route', i),
+            'operator': self.text('operator', i),
+            'bus_type': self.text('bus_type', i),
+            'ac': True if flags & AC else (False if flags & NON_AC else None),
+            'sleeper': bool(flags & SLEEPER),
+            'seater': bool(flags & SEATER),
+            'seats_left': None if seats == MISSING else seats,
+            'fare': None if fare != fare else fare,
+            'departure': from_minutes(self.departure[i]),
+            'arrival': from_minutes(self.arrival[i]),
+            'rating': None if rating != rating else rating,
+            'gps': bool(flags & GPS),
+            'amenities': self.amenities(i),
+            'boarding': self.text('boarding', i),
+            'dropping': self.text('dropping', i),
+        }
+
+    def rows(self):
+        return (self.row(i) for i in range(len(self)))
+
+    # ----- masks -----
+
+    def has(self, flag):
+        """Byte mask of rows with flag set; flag is a bit or a name like 'sleeper'."""
+        bit = FLAG_NAMES[flag] if isinstance(flag, str) else flag
+        return bytes(1 if f & bit else 0 for f in self.flags)
+
+    def lacks(self, flag):
+        bit = FLAG_NAMES[flag] if isinstance(flag, str) else flag
+        return bytes(0 if f & bit else 1 for f in self.flags)
+
+    def equals(self, column: str, value: str):
+        """Byte mask of rows whose categorical column equals value."""
+        code = self.vocab.codes.get(value or '')
+        return bytes(1 if c == code else 0 for c in getattr(self, column))
+
+    def between(self, column: str, low=None, high=None):
+        """Byte mask of rows whose numeric column is within [low, high]; missing never matches."""
+        low = float('-inf') if low is None else low
+        high = float('inf') if high is None else high
+        return bytes(0 if is_missing(column, v) else int(low <= v <= high) for v in getattr(self, column))
+
+    # ----- selection -----
+
+    def take(self, indices):
+        """New table with just the given rows, sharing this table's vocabulary."""
+        out = ListingTable(self.vocab)
+        indices = list(indices)
+        for name in NUMERIC + CATEGORICAL + ('flags',):
+            src = getattr(self, name)
+            getattr(out, name).extend(src[i] for i in indices)
+        for i in indices:
+            out.amenity_codes.extend(self.amenity_codes[self.amenity_offsets[i]:self.amenity_offsets[i + 1]])
+            out.amenity_offsets.append(len(out.amenity_codes))
+        return out
+
+    def select(self, mask):
+        return self.take(compress(range(len(self)), mask))
+
+    def order_by(self, column: str, reverse: bool = False):
+        """Row indices sorted by a column; rows with missing values always go last."""
+        values = getattr(self, column)
+        if column in CATEGORICAL:
+            names = self.vocab.values
+            return sorted(range(len(self)), key=lambda i: names[values[i]], reverse=reverse)
+        present = [i for i in range(len(self)) if not is_missing(column, values[i])]
+        absent = [i for i in range(len(self)) if is_missing(column, values[i])]
+        return sorted(present, key=values.__getitem__, reverse=reverse) + absent
+
+    def sort_by(self, column: str, reverse: bool = False):
+        return self.take(self.order_by(column, reverse))
+
+    # ----- aggregation -----
+
+    def stats(self, column: str):
+        """min / max / mean / count over the non-missing values of a numeric column."""
+        values = [v for v in getattr(self, column) if not is_missing(column, v)]
+        if not values:
+            return {'count': 0, 'min': None, 'max': None, 'mean': None}
+        return {'count': len(values), 'min': min(values), 'max': max(values),
+                'mean': sum(values) / len(values)}
+
+    def counts(self, column: str):
+        """How many rows carry each value of a categorical column."""
+        names = self.vocab.values
+        return Counter({names[code]: n for code, n in Counter(getattr(self, column)).items()})
@@ -0,0 +1,122 @@
+import re
+from dataclasses import dataclass, field
+
+from listing_table import AC, GPS, NON_AC, SEATER, SLEEPER, ListingTable, is_missing
+
+TOP_RATED_MIN = 4.0
+LUXURY_PATTERN = re.compile(r'volvo|scania|mercedes|benz|multi[\s-]*axle|luxury|premium', re.I)
+
+
+def _codes(table: ListingTable, predicate):
+    """Vocabulary codes whose string satisfies predicate (checked once per distinct string)."""
+    return {code for code, value in enumerate(table.vocab.values) if value and predicate(value)}
+
+
+def _in(column, codes):
+    return bytes(1 if c in codes else 0 for c in column)
+
+
+def _known_text(table, column):
+    blank = table.vocab.codes.get('')
+    return bytes(0 if c == blank else 1 for c in getattr(table, column))
+
+
+def _flag_rule(required, known_column=None):
+    def rule(table, value):
+        ok = bytes(1 if f & required else 0 for f in table.flags)
+        known = _known_text(table, known_column) if known_column else bytes([1]) * len(table)
+        return ok, known
+    return rule
+
+
+def _ac(table, value):
+    # A card that says neither AC nor Non-AC can't be judged either way.
+    known = bytes(1 if f & (AC | NON_AC) else 0 for f in table.flags)
+    return bytes(0 if f & NON_AC else 1 for f in table.flags), known
+
+
+def _non_ac(table, value):
+    known = bytes(1 if f & (AC | NON_AC) else 0 for f in table.flags)
+    return bytes(0 if f & AC else 1 for f in table.flags), known
+
+
+def _text_rule(column, pattern=None):
+    def rule(table, value):
+        needle = (value or '').lower()
+        test = pattern.search if pattern else (lambda s: needle in s.lower())
+        return _in(getattr(table, column), _codes(table, test)), _known_text(table, column)
+    return rule
+
+
+def _top_rated(table, value):
+    threshold = TOP_RATED_MIN if value is None else float(value)
+    ok = bytes(0 if is_missing('rating', r) else int(r >= threshold) for r in table.rating)
+    known = bytes(0 if is_missing('rating', r) else 1 for r in table.rating)
+    return ok, known
+
+
+# filter name -> rule(table, value) returning (satisfied mask, known mask).
+RULES = {
+    'ac': _ac,
+    'non_ac': _non_ac,
+    'sleeper': _flag_rule(SLEEPER, known_column='bus_type'),
+    'seater': _flag_rule(SEATER, known_column='bus_type'),
+    'gps': _flag_rule(GPS),
+    'operator': _text_rule('operator'),
+    'top_rated': _top_rated,
+    'luxury': _text_rule('bus_type', LUXURY_PATTERN),
+    'boarding': _text_rule('boarding'),
+    'dropping': _text_rule('dropping'),
+}
+# Rules that match against a name and mean nothing without one.
+VALUE_RULES = frozenset({'operator', 'boarding', 'dropping'})
+
+
+@dataclass
+class Verdict:
+    filter: str
+    value: object
+    total: int
+    violations: list = field(default_factory=list)
+    unknown: list = field(default_factory=list)
+    table: ListingTable = None
+
+    @property
+    def ok(self):
+        return not self.violations
+
+    def report(self, limit: int = 20):
+        label = self.filter if self.value is None else f'{self.filter}={self.value}'
+        status = '✅' if self.ok else '❌'
+        print(f"   {status} {label}: {self.total - len(self.violations) - len(self.unknown)} match, "
+              f"{len(self.violations)} violate, {len(self.unknown)} can't tell (of {self.total})")
+        for i in self.violations[:limit]:
+            row = self.table.row(i)
+            fare = '-' if row['fare'] is None else f"{row['fare']:.0f}"
+            rating = '-' if row['rating'] is None else f"{row['rating']:.1f}"
+            print(f"      Bus {i+1}: {row['operator'] or 'unknown operator'} | {row['bus_type'] or '-'}"
+                  f" | ₹{fare} | rating {rating}")
+        if len(self.violations) > limit:
+            print(f"      ... and {len(self.violations) - limit} more")
+        return self.ok
+
+
+def check(table: ListingTable, name: str, value=None):
+    """Check every row of table against one filter's semantics in a single pass.
+
+    value is the operator name, boarding/dropping point or top-rated
+    threshold where the filter takes one; the name-based filters raise
+    ValueError without it. Rows whose card doesn't carry the needed field
+    are counted as unknown rather than violations.
+    """
+    if name in VALUE_RULES and not value:
+        raise ValueError(f"check({name!r}) needs the {name} to look for")
+    ok, known = RULES[name](table, value)
+    violations = [i for i, (o, k) in enumerate(zip(ok, known)) if k and not o]
+    unknown = [i for i, k in enumerate(known) if not k]
+    return Verdict(name, value, len(table), violations, unknown, table)
+
+
+def check_all(table: ListingTable, applied: dict):
+    """check() for every applied filter, e.g. {'ac': None, 'operator': 'Zingbus'}."""
+    return [check(table, name, value) for name, value in applied.items()]
@@ -0,0 +1,125 @@
+import os
+import threading
+from collections import Counter
+from urllib.parse import urlparse
+
+# Third-party hosts none of the scenarios need: analytics, ad tags,
+# attribution SDKs and chat widgets.
+TRACKER_DOMAINS = (
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'googlesyndication.com',
+    'googleadservices.com', 'adservice.google.com', 'facebook.net', 'connect.facebook.com',
+    'bat.bing.com', 'clarity.ms', 'hotjar.com', 'criteo.com', 'criteo.net', 'taboola.com',
+    'outbrain.com', 'amazon-adsystem.com', 'adnxs.com', 'moengage.com', 'webengage.com',
+    'clevertap-prod.com', 'wzrkt.com', 'branch.io', 'app.link', 'appsflyer.com', 'onesignal.com',
+    'freshchat.com', 'tawk.to', 'zopim.com', 'zdassets.com', 'haptik.ai', 'yellow.ai',
+    'newrelic.com', 'nr-data.net', 'sentry.io',
+)
+
+# Rough transfer sizes (bytes) used until real responses of that type have been seen.
+DEFAULT_SIZES = {
+    'image': 40_000, 'media': 400_000, 'font': 45_000, 'stylesheet': 30_000,
+    'script': 60_000, 'xhr': 3_000, 'fetch': 3_000, 'other': 5_000,
+}
+
+
+class RoutingProfile:
+    """Named request-routing policy applied to browser contexts.
+
+    Requests to tracker hosts are stubbed (scripts get an empty 200 body, so
+    page code waiting on them still runs) or aborted; resource types in
+    block_types are aborted everywhere. Counters accumulate across every
+    context the profile is attached to.
+    """
+
+    def __init__(self, name, block_types=(), block_trackers=False):
+        self.name = name
+        self.block_types = frozenset(block_types)
+        self.block_trackers = block_trackers
+        self._lock = threading.Lock()
+        self.seen = 0
+        self.blocked = Counter()
+        self.stubbed = 0
+        self.bytes_saved = 0
+        self._sizes = {}
+
+    @property
+    def active(self):
+        return bool(self.block_types or self.block_trackers)
+
+    def _is_tracker(self, url):
+        host = urlparse(url).hostname or ''
+        return any(host == d or host.endswith('.' + d) for d in TRACKER_DOMAINS)
+
+    def _size(self, resource_type):
+        total, count = self._sizes.get(resource_type, (0, 0))
+        return total // count if count else DEFAULT_SIZES.get(resource_type, DEFAULT_SIZES['other'])
+
+    def _learn(self, response):
+        try:
+            length = int(response.headers.get('content-length', ''))
+        except ValueError:
+            return
+        resource_type = response.request.resource_type
+        with self._lock:
+            total, count = self._sizes.get(resource_type, (0, 0))
+            self._sizes[resource_type] = (total + length, count + 1)
+
+    def _handle(self, route):
+        request = route.request
+        resource_type = request.resource_type
+        tracker = self.block_trackers and self._is_tracker(request.url)
+        with self._lock:
+            self.seen += 1
+            if tracker or resource_type in self.block_types:
+                self.blocked[resource_type] += 1
+                self.bytes_saved += self._size(resource_type)
+        if tracker and resource_type == 'script':
+            with self._lock:
+                self.stubbed += 1
+            return route.fulfill(status=200, content_type='application/javascript', body='')
+        if tracker or resource_type in self.block_types:
+            return route.abort()
+        # Let handlers registered before this one (e.g. the asset cache) have a go.
+        return route.fallback()
+
+    def attach(self, context):
+        """Install the profile on a BrowserContext (usable as a BrowserPool context hook)."""
+        if not self.active:
+            return
+        context.route('**/*', self._handle)
+        context.on('response', self._learn)
+
+    async def attach_async(self, context):
+        """attach() for async-API contexts; _handle's fulfil/abort coroutines are awaited by Playwright."""
+        if not self.active:
+            return
+        await context.route('**/*', self._handle)
+        context.on('response', self._learn)
+
+    def report(self):
+        blocked = sum(self.blocked.values())
+        if not self.seen:
+            return
+        kinds = ', '.join(f'{kind} {n}' for kind, n in self.blocked.most_common())
+        print(f"🚦 Routing profile '{self.name}': blocked {blocked}/{self.seen} requests "
+              f"(~{self.bytes_saved / 1024 / 1024:.1f} MB saved, {self.stubbed} scripts stubbed)"
+              + (f" [{kinds}]" if kinds else ''))
+
+
+PROFILES = {
+    # Just what the DOM checks need: no trackers, images, video or web fonts.
+    'functional-minimal': dict(block_types=('image', 'media', 'font'), block_trackers=True),
+    # Looks like the real page, minus third-party noise.
+    'visual': dict(block_trackers=True),
+    # Everything, exactly as a user's browser would load it.
+    'full-fidelity': dict(),
+}
+DEFAULT_PROFILE = 'functional-minimal'
+
+
+def routing_profile(name=None):
+    """A fresh RoutingProfile by name; defaults to EMT_NET_PROFILE, else functional-minimal."""
+    name = name or os.getenv('EMT_NET_PROFILE', DEFAULT_PROFILE)
+    if name not in PROFILES:
+        raise ValueError(f"Unknown routing profile {name!r}, expected one of {', '.join(PROFILES)}")
+    return RoutingProfile(name, **PROFILES[name])
@@ -1,29 +1,34 @@
-from playwright.sync_api import sync_playwright
-import time
+import os
+
+from browser_pool import pooled_page
+from wait_policy import WaitPolicy
 
 def automate_popular_bus_route():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)
-        page = browser.new_page()
+    with pooled_page() as page:
 
         page.set_default_timeout(60000)
+        waits = WaitPolicy(page)
 
         print("Opening EaseMyTrip Bus page...")
         page.goto("https://www.easemytrip.com/bus/", wait_until="domcontentloaded")
-        time.sleep(3)
+        waits.selector('page.load', '#txtSrcCity', sleep_ms=3000)
         print("✅ Bus page loaded!")
 
         # Click on Bengaluru to Hyderabad in Popular Bus Routes
         print("Clicking on Bengaluru to Hyderabad...")
         route = page.locator('a[href*="bengaluru-to-hyderabad-bus-tickets"]').first
         route.scroll_into_view_if_needed()
-        time.sleep(1)
+        waits.stable('route.scroll', route, sleep_ms=1000, timeout_ms=1000)
         route.click()
-        time.sleep(3)
+        waits.url('route.open', r'bengaluru-to-hyderabad', sleep_ms=3000, timeout_ms=3000)
         print("✅ Bengaluru to Hyderabad clicked!")
 
-        time.sleep(5)
-        browser.close()
+        waits.report()
+
+        # Keep the browser open to look at the results when debugging.
+        if os.getenv('EMT_PAUSE_AT_END', '').lower() in {'1', 'true', 'yes'}:
+            print("Keeping browser open for 5 seconds...")
+            page.wait_for_timeout(5_000)
         print("Automation completed successfully!")
 
 if __name__ == "__main__":
@@ -0,0 +1,176 @@
+import argparse
+import ast
+import importlib
+import json
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import traceback
+from collections import Counter
+
+import spans
+from attribution import write_report
+from browser_pool import close_pool
+from har_replay import scenario
+from session_state import get_session, logged_in_default
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def discover_scenarios(root=HERE):
+    """Find every top-level automate_* function in the scripts under root.
+
+    Files are parsed, not imported, so discovery never starts a browser.
+    """
+    scenarios = []
+    for filename in sorted(os.listdir(root)):
+        if not filename.endswith('.py') or filename.startswith(('test_', '_')):
+            continue
+        try:
+            with open(os.path.join(root, filename), encoding='utf-8') as f:
+                tree = ast.parse(f.read(), filename)
+        except SyntaxError:
+            continue
+        for node in tree.body:
+            if isinstance(node, ast.FunctionDef) and node.name.startswith('automate_'):
+                scenarios.append(f'{filename[:-3]}.{node.name}')
+    return scenarios
+
+
+def run_scenario(name):
+    """Import and run one 'module.function' scenario, returning a result dict."""
+    module_name, func_name = name.rsplit('.', 1)
+    started = time.perf_counter()
+    try:
+        with scenario(name), spans.span('scenario'):
+            getattr(importlib.import_module(module_name), func_name)()
+        status, error = 'passed', None
+    except (Exception, SystemExit) as e:
+        status, error = 'failed', ''.join(traceback.format_exception_only(type(e), e)).strip()
+    return {
+        'scenario': name,
+        'status': status,
+        'seconds': round(time.perf_counter() - started, 3),
+        'error': error,
+    }
+
+
+def _worker(tasks, results):
+    # Each worker keeps its own browser pool warm across scenarios and
+    # closes it once the queue is drained.
+    try:
+        while True:
+            try:
+                name = tasks.get(timeout=1)
+            except queue.Empty:
+                break
+            results.put(run_scenario(name))
+    finally:
+        close_pool()
+        spans.flush()
+
+
+def _collect(results, names, pool, poll_s=1.0):
+    """Gather one result per name, giving up on the rest once every worker has exited.
+
+    A process worker that crashes (or a thread killed by something other
+    than an exception) never reports its scenario; those come back as
+    failed instead of blocking the run forever.
+    """
+    collected = []
+    while len(collected) < len(names):
+        try:
+            collected.append(results.get(timeout=poll_s))
+            continue
+        except queue.Empty:
+            pass
+        if any(w.is_alive() for w in pool):
+            continue
+        # A last look: a worker's final put can land just after it exits.
+        try:
+            while len(collected) < len(names):
+                collected.append(results.get(timeout=poll_s))
+        except queue.Empty:
+            pass
+        missing = Counter(names) - Counter(r['scenario'] for r in collected)
+        collected += [{'scenario': name, 'status': 'failed', 'seconds': 0.0,
+                       'error': 'worker exited before reporting a result'} for name in missing.elements()]
+    return collected
+
+
+def run_all(names, workers=4, mode='thread'):
+    """Run scenarios concurrently on thread or process workers and return the report."""
+    if mode == 'process':
+        ctx = multiprocessing.get_context('spawn')
+        tasks, results, spawn = ctx.Queue(), ctx.Queue(), ctx.Process
+    else:
+        tasks, results, spawn = queue.Queue(), queue.Queue(), threading.Thread
+    for name in names:
+        tasks.put(name)
+
+    started = time.perf_counter()
+    if logged_in_default():
+        # Sign in (if the saved session is stale) before any worker starts,
+        # so they all just read the state file.
+        get_session().state()
+        close_pool()
+    pool = [spawn(target=_worker, args=(tasks, results), daemon=True)
+            for _ in range(max(1, min(workers, len(names))))]
+    for w in pool:
+        w.start()
+    collected = _collect(results, names, pool)
+    for w in pool:
+        w.join()
+
+    return {
+        'mode': mode,
+        'workers': len(pool),
+        'wall_seconds': round(time.perf_counter() - started, 3),
+        'sum_seconds': round(sum(r['seconds'] for r in collected), 3),
+        'passed': sum(r['status'] == 'passed' for r in collected),
+        'failed': sum(r['status'] == 'failed' for r in collected),
+        'scenarios': sorted(collected, key=lambda r: r['scenario']),
+    }
+
+
+def print_report(report):
+    print('\n📋 === SCENARIO REPORT ===\n')
+    for r in report['scenarios']:
+        status = '✅' if r['status'] == 'passed' else '❌'
+        print(f"   {status} {r['scenario']:<50} {r['seconds']:8.1f} s")
+        if r['error']:
+            print(f"      {r['error']}")
+    print(f"\n   {report['passed']} passed, {report['failed']} failed with {report['workers']} "
+          f"{report['mode']} workers")
+    print(f"   Wall clock: {report['wall_seconds']:.1f} s (sequential would be ~{report['sum_seconds']:.1f} s)\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run EaseMyTrip scenario scripts concurrently.')
+    parser.add_argument('scenarios', nargs='*', help='module.function names (default: all discovered)')
+    parser.add_argument('--workers', type=int, default=int(os.getenv('EMT_WORKERS', '4')))
+    parser.add_argument('--mode', choices=['thread', 'process'], default=os.getenv('EMT_RUN_MODE', 'thread'))
+    parser.add_argument('--report', default='scenario_report.json', help='where to write the JSON report')
+    parser.add_argument('--list', action='store_true', help='only list discovered scenarios')
+    args = parser.parse_args(argv)
+
+    names = args.scenarios or discover_scenarios()
+    if args.list:
+        print('\n'.join(names))
+        return 0
+
+    # Process workers log their spans under this process's run id.
+    os.environ['EMT_RUN_ID'] = spans.RUN_ID
+    report = run_all(names, workers=args.workers, mode=args.mode)
+    print_report(report)
+    if spans.spans_path():
+        write_report(run=spans.RUN_ID)
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    return 1 if report['failed'] else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,166 @@
+import http.client
+import json
+import os
+import queue
+import time
+from collections import Counter
+from datetime import datetime
+from urllib.parse import urlencode, urlsplit
+
+from listing_table import ListingTable
+
+DEFAULT_BASE_URL = 'https://bus.easemytrip.com'
+SEARCH_PATH = os.getenv('EMT_SEARCH_API_PATH', '/api/search')
+SEATS_PATH = os.getenv('EMT_SEATS_API_PATH', '/api/seats')
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+
+def record_from_api(bus: dict, index: int):
+    """Map one search-API bus onto the record shape extract_listings() produces."""
+    return {
+        'index': index,
+        'operator': bus.get('Travels') or '',
+        'bus_type': bus.get('BusType') or '',
+        'ac': bus.get('AC'),
+        'sleeper': bool(bus.get('Sleeper')),
+        'seater': bool(bus.get('Seater')),
+        'seats_left': bus.get('AvailableSeats'),
+        'fare': bus.get('Fare'),
+        'departure': bus.get('DepartureTime'),
+        'arrival': bus.get('ArrivalTime'),
+        'rating': bus.get('Rating'),
+        'gps': bool(bus.get('GPS')),
+        'amenities': list(bus.get('Amenities') or ()),
+        'boarding': ', '.join(bus.get('BoardingPoints') or ()),
+        'dropping': ', '.join(bus.get('DroppingPoints') or ()),
+    }
+
+
+class SearchClient:
+    """Fetches bus listings and seat maps over HTTP, without a browser.
+
+    The live site's listing XHR path is not known: SEARCH_PATH and
+    SEATS_PATH default to the stand-in's /api/search and /api/seats, so
+    set EMT_SEARCH_API_PATH (and EMT_SEATS_API_PATH) to the real
+    endpoints before pointing a client at the live host.
+
+    Connections are kept alive and pooled (pool_size per client), so a sweep
+    of searches pays for TCP/TLS setup once. Base URL defaults to
+    EMT_SEARCH_API_URL, then EMT_STANDIN_URL, then the live bus host.
+    Responses with 429/5xx are retried with backoff.
+    """
+
+    def __init__(self, base_url: str = None, timeout: float = 30, pool_size: int = 4, retries: int = 2):
+        self.base_url = (base_url or os.getenv('EMT_SEARCH_API_URL') or os.getenv('EMT_STANDIN_URL')
+                         or DEFAULT_BASE_URL).rstrip('/')
+        parts = urlsplit(self.base_url)
+        self._conn_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self._netloc = parts.netloc
+        self._prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        self.retries = retries
+        self._idle = queue.LifoQueue(maxsize=pool_size)
+        self.requests = 0
+
+    def _checkout(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._conn_class(self._netloc, timeout=self.timeout)
+
+    def _checkin(self, conn):
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get_json(self, path: str, params: dict = None):
+        url = f"{self._prefix}{path}?{urlencode(params or {})}"
+        for attempt in range(self.retries + 1):
+            conn = self._checkout()
+            try:
+                conn.request('GET', url, headers={'Accept': 'application/json', 'Connection': 'keep-alive'})
+                response = conn.getresponse()
+                body = response.read()
+            except (http.client.HTTPException, OSError):
+                # Stale keep-alive connection: drop it and retry on a fresh one.
+                conn.close()
+                if attempt == self.retries:
+                    raise
+                continue
+            self.requests += 1
+            if response.will_close:
+                conn.close()
+            else:
+                self._checkin(conn)
+            if response.status in RETRY_STATUSES and attempt < self.retries:
+                time.sleep(0.2 * 2 ** attempt)
+                continue
+            if response.status != 200:
+                raise RuntimeError(f'{path} returned HTTP {response.status}')
+            return json.loads(body)
+
+    def _query(self, source, destination, travel_date):
+        date = travel_date.strftime('%d-%m-%Y') if isinstance(travel_date, datetime) else travel_date
+        return {'org': source, 'des': destination, 'date': date, 'CCode': 'IN', 'AppCode': 'Emt'}
+
+    def search(self, source: str, destination: str, travel_date):
+        """All buses for a route and date as extract_listings()-shaped records."""
+        data = self.get_json(SEARCH_PATH, self._query(source, destination, travel_date))
+        return [record_from_api(bus, i) for i, bus in enumerate(data.get('Buses') or [])]
+
+    def search_table(self, source: str, destination: str, travel_date, vocab=None):
+        """search() packed into a ListingTable, tagged with the route."""
+        route = f'{source} → {destination}'
+        return ListingTable.from_records(self.search(source, destination, travel_date), route=route, vocab=vocab)
+
+    def seats(self, source: str, destination: str, travel_date, bus_id: str):
+        return self.get_json(SEATS_PATH, dict(self._query(source, destination, travel_date), id=bus_id))
+
+
+def _signature(record):
+    return (record['operator'], record['bus_type'], record['departure'], record['arrival'],
+            None if record['fare'] is None else round(record['fare']))
+
+
+def cross_check(ui_records, api_records):
+    """Compare a UI extraction with an API search; returns (only_in_ui, only_in_api) signatures."""
+    ui, api = Counter(map(_signature, ui_records)), Counter(map(_signature, api_records))
+    return sorted((ui - api).elements(), key=str), sorted((api - ui).elements(), key=str)
+
+
+if __name__ == "__main__":
+    import sys
+    from datetime import timedelta
+
+    from listing_verify import check
+    from standin_site import StandinSite
+
+    src, dst = (sys.argv[1:3] if len(sys.argv) > 2 else ('Delhi', 'Shimla'))
+    site = None
+    if not (os.getenv('EMT_SEARCH_API_URL') or os.getenv('EMT_STANDIN_URL')):
+        site = StandinSite(buses=300).start()
+        os.environ['EMT_STANDIN_URL'] = site.base_url
+    try:
+        with SearchClient() as client:
+            started = time.perf_counter()
+            table = client.search_table(src, dst, datetime.now() + timedelta(days=5))
+            print(f"✅ {len(table)} buses from {client.base_url} in {(time.perf_counter() - started) * 1000:.0f} ms")
+            ac_only = table.select(table.has('ac'))
+            check(ac_only, 'ac').report()
+    finally:
+        if site is not None:
+            site.stop()
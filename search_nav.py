@@ -0,0 +1,161 @@
+import json
+import os
+import threading
+from datetime import datetime
+from urllib.parse import urlencode, urlparse, parse_qs
+
+import spans
+from browser_pool import pooled_page
+from datepicker import select_date
+from wait_policy import WaitPolicy
+
+BUS_URL = 'https://www.easemytrip.com/bus/'
+LIST_URL = 'https://bus.easemytrip.com/home/list'
+RESULTS_URL_PATTERN = r'.*easemytrip\.com/home/list.*'
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Searchids learned from form-driven searches, kept next to the city cache so
+# later runs can deep-link straight away.
+DEFAULT_SEARCH_IDS_PATH = os.path.join(HERE, '.search_ids.json')
+# A deep link that works renders the listing within a couple of seconds;
+# don't spend long on one the site ignored before falling back to the form.
+DEEP_LINK_TIMEOUT_MS = int(os.getenv('EMT_DEEP_LINK_TIMEOUT_MS', '4000'))
+
+# "source|destination" -> searchid, loaded lazily from search_ids_path().
+_learned_search_ids = None
+_search_ids_lock = threading.Lock()
+
+
+def search_ids_path():
+    return os.getenv('EMT_SEARCH_IDS_PATH', DEFAULT_SEARCH_IDS_PATH)
+
+
+def _route_key(source, destination):
+    return f'{source.lower()}|{destination.lower()}'
+
+
+def _search_ids():
+    global _learned_search_ids
+    if _learned_search_ids is None:
+        try:
+            with open(search_ids_path(), encoding='utf-8') as f:
+                _learned_search_ids = json.load(f)
+        except (OSError, ValueError):
+            _learned_search_ids = {}
+    return _learned_search_ids
+
+
+def results_url(source: str, destination: str, travel_date: datetime, search_id: str = None):
+    """Build the /home/list URL the search form would navigate to."""
+    query = {'org': source, 'des': destination, 'date': travel_date.strftime('%d-%m-%Y')}
+    search_id = search_id or _search_ids().get(_route_key(source, destination))
+    if search_id:
+        query['searchid'] = search_id
+    query.update({'CCode': 'IN', 'AppCode': 'Emt'})
+    return f'{LIST_URL}?{urlencode(query)}'
+
+
+def _learn(source, destination, url):
+    search_id = parse_qs(urlparse(url).query).get('searchid')
+    if not search_id:
+        return
+    with _search_ids_lock:
+        learned = _search_ids()
+        if learned.get(_route_key(source, destination)) == search_id[0]:
+            return
+        learned[_route_key(source, destination)] = search_id[0]
+        path = search_ids_path()
+        tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(learned, f, indent=2, sort_keys=True)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"⚠️ Could not save the searchid for {source} → {destination}: {e}")
+
+
+def _select_city(page, waits, input_selector, city_name, key):
+    with spans.span('search.select_city', city=city_name, field=input_selector):
+        page.fill(input_selector, city_name)
+        waits.selector(f'search.{key}_suggest', '.auto-sugg-pre ul li', sleep_ms=2000, timeout_ms=10000)
+        page.locator(f'.auto-sugg-pre ul li:has-text("{city_name}")').first.click()
+        waits.selector(f'search.{key}_select', '.auto-sugg-pre ul li', state='hidden', sleep_ms=1000, timeout_ms=1000)
+
+
+def search_via_form(page, waits, source, destination, travel_date):
+    """Drive the home-page search form: cities, datepicker, then #srcbtn."""
+    if not page.locator('#txtSrcCity').count():
+        page.goto(BUS_URL, wait_until="domcontentloaded")
+        waits.selector('page.load', '#txtSrcCity', sleep_ms=3000)
+    _select_city(page, waits, '#txtSrcCity', source, 'src')
+    _select_city(page, waits, '#txtDesCity', destination, 'dest')
+    select_date(page, travel_date, waits)
+    page.click("#srcbtn")
+    met = waits.url('search.results_url', RESULTS_URL_PATTERN, timeout_ms=60000)
+    if met:
+        _learn(source, destination, page.url)
+    return met
+
+
+def search_via_deep_link(page, waits, source, destination, travel_date):
+    """Navigate straight to the results page; True once the listing has rendered."""
+    page.goto(results_url(source, destination, travel_date), wait_until="domcontentloaded")
+    return waits.selector('search.deep_link', '.gen-cards', sleep_ms=5000, timeout_ms=DEEP_LINK_TIMEOUT_MS)
+
+
+def open_results(page, waits: WaitPolicy, source: str, destination: str, travel_date: datetime, mode: str = None):
+    """Land on the /home/list results page for a route and date.
+
+    mode is 'deep' (build the URL and go), 'form' (the classic search form)
+    or 'auto' (try the deep link, fall back to the form). It defaults to
+    EMT_SEARCH_MODE, else 'auto'. Returns the mode that actually worked.
+    The deep link gets EMT_DEEP_LINK_TIMEOUT_MS (default 4 s) to render and
+    carries the searchid from the last form search of the route, if any.
+    """
+    mode = mode or os.getenv('EMT_SEARCH_MODE', 'auto')
+    if mode in ('deep', 'auto'):
+        if search_via_deep_link(page, waits, source, destination, travel_date):
+            return 'deep'
+        if mode == 'deep':
+            raise RuntimeError(f'Deep link for {source} → {destination} did not render a listing')
+        print("   Deep link didn't render a listing, falling back to the search form...")
+        page.goto(BUS_URL, wait_until="domcontentloaded")
+        waits.selector('page.load', '#txtSrcCity', sleep_ms=3000)
+    if not search_via_form(page, waits, source, destination, travel_date):
+        print("URL didn't change, but continuing...")
+    waits.selector('search.results', '.gen-cards', sleep_ms=5000, timeout_ms=5000)
+    return 'form'
+
+
+def listing_signature(page):
+    """Cheap fingerprint of a results page: card count and the operator filter list."""
+    return page.evaluate("""() => ({
+        cards: document.querySelectorAll('.gen-cards').length,
+        operators: Array.from(document.querySelectorAll('input[name="checkbox_opt"]'))
+            .map(el => (el.value || el.closest('label')?.textContent || '').trim()).sort(),
+    })""")
+
+
+def verify_deep_link(source: str, destination: str, travel_date: datetime):
+    """Open the same search both ways and check the listings match."""
+    signatures = {}
+    for mode in ('form', 'deep'):
+        with pooled_page() as page:
+            page.set_default_timeout(60000)
+            waits = WaitPolicy(page)
+            open_results(page, waits, source, destination, travel_date, mode=mode)
+            signatures[mode] = listing_signature(page)
+    same = signatures['form'] == signatures['deep']
+    status = '✅' if same else '❌'
+    print(f"{status} Deep link vs form for {source} → {destination}: "
+          f"{signatures['deep']['cards']} vs {signatures['form']['cards']} cards")
+    return same, signatures
+
+
+if __name__ == "__main__":
+    import sys
+    from datetime import timedelta
+
+    src, dst = (sys.argv[1:3] if len(sys.argv) > 2 else ('Delhi', 'Shimla'))
+    ok, _ = verify_deep_link(src, dst, datetime.now() + timedelta(days=5))
+    sys.exit(0 if ok else 1)
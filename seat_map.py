@@ -0,0 +1,123 @@
+import os
+
+import spans
+from wait_policy import WaitPolicy
+
+SEAT_CANDIDATES = '[class*="seat"], [class*="avail"]'
+UNAVAILABLE_WORDS = ('booked', 'grey', 'disabled', 'blocked', 'unavailable', 'sold')
+POLICIES = ('first_free', 'window', 'lower', 'cheapest')
+
+# Runs in the page: describe every seat on the open layout and tag each with
+# data-emt-seat so it can be clicked later without re-querying.
+SNAPSHOT_SCRIPT = """([candidates, unavailable]) => {
+    const norm = s => (s || '').replace(/\\s+/g, ' ').trim();
+    // Seats wired to SelectSeat are authoritative; otherwise keep the innermost
+    // class match, since wrappers like .seat-layout also match [class*="seat"].
+    const wired = Array.from(document.querySelectorAll('[ng-click*="SelectSeat"]'));
+    const all = wired.length ? wired : Array.from(document.querySelectorAll(candidates));
+    const seats = wired.length ? wired : all.filter(el => !all.some(other => other !== el && el.contains(other)));
+    return seats.map((el, index) => {
+        el.setAttribute('data-emt-seat', index);
+        const raw = el.getAttribute('class') || '';
+        const cls = raw.toLowerCase();
+        const info = [el.getAttribute('title'), el.getAttribute('data-original-title'),
+                      el.getAttribute('aria-label'), el.getAttribute('ng-click')].map(norm).join(' ');
+        const rect = el.getBoundingClientRect();
+        const deckEl = el.closest('[class*="upper"], [class*="lower"], [id*="upper"], [id*="lower"]');
+        const deckText = deckEl ? ((deckEl.getAttribute('class') || '') + ' ' + deckEl.id).toLowerCase() : '';
+        const price = (info.replace(/,/g, '').match(/(?:₹|Rs\\.?|fare\\W*)\\s*(\\d+(?:\\.\\d+)?)/i) || [])[1];
+        const style = getComputedStyle(el);
+        return {
+            index,
+            id: el.id || norm(el.textContent) || info.match(/seat\\s*(?:no)?\\W*(\\w+)/i)?.[1] || String(index),
+            x: Math.round(rect.left), y: Math.round(rect.top),
+            width: Math.round(rect.width), height: Math.round(rect.height),
+            deck: deckText.includes('upper') ? 'upper' : 'lower',
+            berth: /sleeper|berth/.test(cls) || rect.width > rect.height * 1.5 || rect.height > rect.width * 1.5
+                ? 'sleeper' : 'seater',
+            visible: rect.width > 0 && rect.height > 0 && style.visibility !== 'hidden',
+            available: !unavailable.some(word => cls.includes(word)),
+            selected: /selected/.test(cls),
+            ladies: /ladies|female|women/i.test(cls + ' ' + info),
+            price: price ? parseFloat(price) : null,
+            classes: raw,
+        };
+    });
+}"""
+
+# True once the tagged seat's class has changed or it reads as selected.
+SELECTED_SCRIPT = """([index, before]) => {
+    const el = document.querySelector(`[data-emt-seat="${index}"]`);
+    if (!el) return false;
+    const cls = el.getAttribute('class') || '';
+    return cls !== before || /selected/i.test(cls);
+}"""
+
+
+def mark_windows(seats):
+    # A seat is a window seat if it sits on the outermost column of its deck.
+    for deck in {s['deck'] for s in seats}:
+        xs = [s['x'] for s in seats if s['deck'] == deck and s['visible']]
+        if not xs:
+            continue
+        left, right = min(xs), max(xs)
+        for s in seats:
+            if s['deck'] == deck:
+                s['window'] = s['visible'] and s['x'] in (left, right)
+    for s in seats:
+        s.setdefault('window', False)
+    return seats
+
+
+def snapshot(page, candidates: str = SEAT_CANDIDATES):
+    """Every seat on the open layout as a dict, captured in one page evaluation.
+
+    Seats carry index, id, position/size, deck, berth ('sleeper'/'seater'),
+    visible, available, selected, ladies, price and window.
+    """
+    try:
+        return mark_windows(page.evaluate(SNAPSHOT_SCRIPT, [candidates, list(UNAVAILABLE_WORDS)]))
+    except Exception as e:
+        print(f"   ⚠️ Seat snapshot failed: {e}")
+        return []
+
+
+def choose(seats, policy: str = 'first_free', allow_ladies: bool = False):
+    """Free seats ordered by policy: first_free, window, lower or cheapest."""
+    free = [s for s in seats if s['visible'] and s['available'] and not s['selected']
+            and (allow_ladies or not s['ladies'])]
+    by_position = lambda s: (s['deck'] != 'lower', s['y'], s['x'])
+    if policy == 'window':
+        return sorted(free, key=lambda s: (not s['window'],) + by_position(s))
+    if policy == 'lower':
+        return sorted(free, key=lambda s: (s['deck'] != 'lower', s['berth'] != 'sleeper', s['y'], s['x']))
+    if policy == 'cheapest':
+        return sorted(free, key=lambda s: (s['price'] is None, s['price'] or 0) + by_position(s))
+    if policy != 'first_free':
+        raise ValueError(f"Unknown seat policy {policy!r}, expected one of {', '.join(POLICIES)}")
+    return sorted(free, key=by_position)
+
+
+def select_seat(page, waits: WaitPolicy = None, policy: str = None, attempts: int = 3):
+    """Snapshot the layout, click the best seat for policy and confirm it took.
+
+    Confirmation watches the seat's class change instead of sleeping; if a
+    seat doesn't react the next candidate is tried. policy defaults to
+    EMT_SEAT_POLICY, else 'first_free'. Returns the chosen seat or None.
+    """
+    waits = waits or WaitPolicy(page)
+    policy = policy or os.getenv('EMT_SEAT_POLICY', 'first_free')
+    with spans.span('seat.select', policy=policy) as s:
+        for seat in choose(snapshot(page), policy)[:attempts]:
+            s.attempt()
+            selector = f'[data-emt-seat="{seat["index"]}"]'
+            try:
+                page.locator(selector).click(force=True)
+            except Exception:
+                continue
+            if waits.dom('seat.confirm', SELECTED_SCRIPT, arg=[seat['index'], seat['classes']],
+                         sleep_ms=1500, timeout_ms=1500):
+                s.won(selector).set(seat=seat['id'], deck=seat['deck'], berth=seat['berth'])
+                return seat
+        s.fail('missing')
+    return None
@@ -0,0 +1,126 @@
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+import spans
+from selector_probe import first_match
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_PATH = os.path.join(HERE, 'selector_cache.json')
+
+
+def page_type(url: str):
+    """Collapse a URL to the kind of page it is, e.g. 'www/bus' or 'bus/home/list'."""
+    parsed = urlparse(url)
+    host = parsed.netloc.split('.')[0] or 'local'
+    path = parsed.path.strip('/').lower()
+    return f'{host}/{path}' if path else host
+
+
+class SelectorResolver:
+    """Remember which fallback selector actually matched, per page type and site version.
+
+    Entries live in a JSON file, so later runs try the last winner first and
+    only walk the rest of the list when it stops matching. The site version
+    is EMT_SITE_VERSION or, failing that, a hash of the page's script bundles,
+    so a deploy starts a fresh set of entries instead of trusting stale ones.
+    """
+
+    def __init__(self, path: str = None, site_version: str = None):
+        self.path = path or os.getenv('EMT_SELECTOR_CACHE', DEFAULT_CACHE_PATH)
+        self.site_version = site_version or os.getenv('EMT_SITE_VERSION')
+        self._lock = threading.RLock()  # record() saves while holding it
+        self._versions = {}
+        self.entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        with self._lock:
+            merged = self._load()
+            merged.update(self.entries)
+            tmp = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(merged, f, indent=2, sort_keys=True)
+            os.replace(tmp, self.path)
+            self.entries = merged
+
+    def _version(self, page):
+        if self.site_version:
+            return self.site_version
+        host = urlparse(page.url).netloc
+        if host not in self._versions:
+            try:
+                bundles = page.evaluate(
+                    "() => Array.from(document.scripts).map(s => s.src).filter(Boolean).sort().join('|')")
+            except Exception:
+                bundles = ''
+            self._versions[host] = hashlib.sha1(bundles.encode()).hexdigest()[:10]
+        return self._versions[host]
+
+    def key(self, page, name: str):
+        return f'{page_type(page.url)}|{self._version(page)}|{name}'
+
+    def ordered(self, page, name: str, candidates):
+        """Candidates with the cached winner (if it is still one of them) moved to the front."""
+        winner = self.entries.get(self.key(page, name), {}).get('selector')
+        if winner in candidates:
+            return [winner] + [c for c in candidates if c != winner]
+        return list(candidates)
+
+    def record(self, page, name: str, selector: str):
+        """Store selector as the winner for name on this page type."""
+        key = self.key(page, name)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry and entry['selector'] == selector:
+                entry['hits'] += 1
+                entry['last_used'] = int(time.time())
+                return
+            self.entries[key] = {'selector': selector, 'hits': 1, 'last_used': int(time.time())}
+            self.save()
+
+    def resolve(self, page, name: str, candidates, timeout: int = 0):
+        """Return the first visible locator for name, trying the cached winner first.
+
+        All candidates are probed in a single page evaluation. With a
+        timeout (ms), probing repeats until something is visible or it runs out.
+        """
+        started = time.perf_counter()
+        ordered = self.ordered(page, name, candidates)
+        deadline = time.monotonic() + timeout / 1000
+        probes = 0
+        while True:
+            selector = first_match(page, ordered)
+            probes += 1
+            if selector is not None:
+                self.record(page, name, selector)
+                spans.record(f'{name}.resolve', started, attempts=probes, selector=selector, bucket='dom')
+                return page.locator(selector).first
+            if time.monotonic() >= deadline:
+                spans.record(f'{name}.resolve', started, 'missing', attempts=probes, bucket='dom')
+                return None
+            time.sleep(0.1)
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def get_resolver():
+    """Process-wide resolver backed by the default cache file."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = SelectorResolver()
+            atexit.register(_default.save)
+        return _default
@@ -0,0 +1,144 @@
+import re
+
+# Playwright pseudo-classes we can evaluate in the page ourselves.
+_TEXT_PSEUDO = re.compile(r':(has-text|text-is)\((["\'])(.*?)\2\)')
+# Selector engines that only Playwright understands.
+_UNSUPPORTED = ('//', 'xpath=', 'text=', '>>', ':near(', ':has(', ':visible', ':nth-match(')
+
+PROBE_SCRIPT = """(plans) => {
+    const norm = s => (s || '').replace(/\\s+/g, ' ').trim();
+    const visible = el => {
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0 && getComputedStyle(el).visibility !== 'hidden';
+    };
+    const enabled = el => !el.disabled && !el.closest('fieldset[disabled]')
+        && el.getAttribute('aria-disabled') !== 'true';
+    const matchText = (el, kind, text) => kind === 'text-is'
+        ? norm(el.textContent) === text
+        : norm(el.textContent).toLowerCase().includes(text.toLowerCase());
+    const query = (alternatives) => {
+        const found = new Set();
+        for (const steps of alternatives) {
+            let scope = [document];
+            for (const step of steps) {
+                const next = [];
+                for (const root of scope) {
+                    const css = root === document ? step.css : ':scope ' + step.css;
+                    for (const el of root.querySelectorAll(css)) {
+                        if (!step.kind || matchText(el, step.kind, step.text)) next.push(el);
+                    }
+                }
+                scope = next;
+            }
+            scope.forEach(el => found.add(el));
+        }
+        // Document order, like Playwright's .first
+        return Array.from(found).sort((a, b) =>
+            a.compareDocumentPosition(b) & Node.DOCUMENT_POSITION_FOLLOWING ? -1 : 1);
+    };
+    return plans.map(plan => {
+        if (!plan) return null;
+        try {
+            const els = query(plan);
+            const first = els[0];
+            return {
+                count: els.length,
+                visible: !!first && visible(first),
+                enabled: !!first && enabled(first),
+            };
+        } catch (e) {
+            return null;
+        }
+    });
+}"""
+
+
+def _split_top_level(selector: str):
+    """Split a selector list on commas that are not inside quotes or brackets."""
+    parts, depth, quote, start = [], 0, None, 0
+    for i, ch in enumerate(selector):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in '"\'':
+            quote = ch
+        elif ch in '([':
+            depth += 1
+        elif ch in ')]':
+            depth -= 1
+        elif ch == ',' and depth == 0:
+            parts.append(selector[start:i].strip())
+            start = i + 1
+    parts.append(selector[start:].strip())
+    return parts
+
+
+def plan_selector(selector: str):
+    """Turn a Playwright selector into steps the in-page probe can run, or None."""
+    if any(token in selector for token in _UNSUPPORTED):
+        return None
+    alternatives = []
+    for part in _split_top_level(selector):
+        steps, pos = [], 0
+        for m in _TEXT_PSEUDO.finditer(part):
+            css = part[pos:m.start()].strip() or '*'
+            steps.append({'css': css, 'kind': m.group(1), 'text': m.group(3)})
+            pos = m.end()
+            # Anything after the pseudo must be a descendant combinator.
+            if pos < len(part) and not part[pos].isspace():
+                return None
+        rest = part[pos:].strip()
+        if rest:
+            steps.append({'css': rest, 'kind': None, 'text': None})
+        alternatives.append(steps)
+    return alternatives
+
+
+def _probe_in_page(page, candidates):
+    plans = [plan_selector(sel) for sel in candidates]
+    if not any(plans):
+        return [None] * len(plans)
+    try:
+        return page.evaluate(PROBE_SCRIPT, plans)
+    except Exception:
+        return [None] * len(plans)
+
+
+def _probe_locator(page, selector):
+    try:
+        loc = page.locator(selector)
+        count = loc.count()
+        first = loc.first
+        return {
+            'count': count,
+            'visible': count > 0 and first.is_visible(),
+            'enabled': count > 0 and first.is_enabled(),
+        }
+    except Exception:
+        return {'count': 0, 'visible': False, 'enabled': False}
+
+
+def probe(page, candidates):
+    """Check every candidate selector in one page evaluation.
+
+    Returns a list in priority order of dicts with selector, count, visible
+    and enabled (visibility/enabled describe the first match, as with
+    locator.first). Candidates the page cannot evaluate itself are probed
+    through Playwright locators instead.
+    """
+    results = _probe_in_page(page, candidates)
+    return [dict(result or _probe_locator(page, selector), selector=selector)
+            for selector, result in zip(candidates, results)]
+
+
+def first_match(page, candidates, require_enabled: bool = False):
+    """Return the highest-priority selector whose first match is visible (and enabled).
+
+    Locator fallbacks for selectors the page cannot evaluate only run when
+    every candidate ahead of them has already missed.
+    """
+    for selector, result in zip(candidates, _probe_in_page(page, candidates)):
+        result = result or _probe_locator(page, selector)
+        if result['visible'] and (result['enabled'] or not require_enabled):
+            return selector
+    return None
@@ -0,0 +1,208 @@
+import json
+import os
+import threading
+import time
+import uuid
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_STATE_PATH = os.path.join(HERE, '.auth', 'state.json')
+HOME_URL = 'https://bus.easemytrip.com/'
+AUTH_DOMAIN = 'easemytrip.com'
+# A lock file older than this belongs to a login that died; take it over.
+STALE_LOCK_S = 120
+
+# Replays the saved localStorage for whichever origin the page lands on,
+# once per origin: the flag (unique to each apply()) stops later navigations
+# from overwriting tokens the app has refreshed since.
+APPLIED_FLAG_PREFIX = '__emt_state_'
+LOCAL_STORAGE_SCRIPT = """(() => {
+    const [origins, flag] = %s;
+    const items = origins[location.origin];
+    if (!items) return;
+    try {
+        if (localStorage.getItem(flag)) return;
+        for (const {name, value} of items) localStorage.setItem(name, value);
+        localStorage.setItem(flag, '1');
+    } catch (e) {}
+})();"""
+
+
+def logged_in_default():
+    """EMT_LOGGED_IN=1 makes every pooled page start signed in."""
+    return os.getenv('EMT_LOGGED_IN', '').lower() in {'1', 'true', 'yes'}
+
+
+def perform_login(page, waits, email: str = None, password: str = None):
+    """Sign in through the bus home page's login panel (the steps buslogin.py checks)."""
+    email = email or os.getenv('EMT_LOGIN_EMAIL', 'chetan.sharma@easemytrip.com')
+    password = password or os.getenv('EMT_LOGIN_PASSWORD', 'Chetan@123')
+    page.goto(HOME_URL)
+    page.locator('#divSignInPnl ._btnclick').click()
+    waits.selector('login.panel', '#shwlogn', sleep_ms=1000, timeout_ms=5000)
+    page.locator('#shwlogn').click()
+    waits.selector('login.email_form', '#lgnBox', sleep_ms=1000, timeout_ms=5000)
+    email_field = page.locator('//*[@id="lgnBox"]/div[1]/div[2]/div/label')
+    email_field.click()
+    email_field.fill(email)
+    page.keyboard.press("Space")
+    page.keyboard.press("Enter")
+    waits.selector('login.email_submit', '#shwotp', sleep_ms=1500, timeout_ms=5000)
+    page.locator('//*[@id="shwotp"]').click()
+    waits.selector('login.password_form', '#emailgnBox', sleep_ms=1000, timeout_ms=5000)
+    password_field = page.locator('//*[@id="emailgnBox"]/div/div[2]/div/label')
+    password_field.click()
+    password_field.fill(password)
+    submit = page.locator('//*[@id="emailgnBox"]/div/div[5]/input')
+    waits.stable('login.password_fill', submit, sleep_ms=500, timeout_ms=2000)
+    submit.click()
+    if not waits.selector('login.success', '._crosslog._crosslogsuccess', state='attached',
+                          sleep_ms=2000, timeout_ms=10000):
+        raise RuntimeError('Login did not reach the success popup')
+    page.evaluate('document.querySelector("._crosslog._crosslogsuccess").click()')
+
+
+class SessionManager:
+    """Log in once and hand the signed-in cookies/localStorage to every context.
+
+    The storage state is saved to path (EMT_AUTH_STATE) and reused until it
+    is max_age_hours old (EMT_AUTH_MAX_AGE_H, from the saved_at it is written
+    with) or its easemytrip.com cookies have expired. Reading it is lock-free: the parsed state is kept in
+    memory and only re-read when the file changes, so any number of workers
+    can start at once. Only a refresh takes the lock file, and workers that
+    find it held wait for the new state instead of logging in themselves.
+    """
+
+    def __init__(self, path: str = None, max_age_hours: float = None):
+        self.path = path or os.getenv('EMT_AUTH_STATE', DEFAULT_STATE_PATH)
+        self.max_age = (max_age_hours or float(os.getenv('EMT_AUTH_MAX_AGE_H', '12'))) * 3600
+        self._lock_path = self.path + '.lock'
+        self._cached = None  # (mtime, state)
+        self._refresh_lock = threading.Lock()
+        self.logins = 0
+
+    def _load(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return None
+        cached = self._cached
+        if cached is None or cached[0] != mtime:
+            try:
+                with open(self.path, encoding='utf-8') as f:
+                    cached = self._cached = (mtime, json.load(f))
+            except (OSError, ValueError):
+                return None
+        return cached
+
+    def _fresh(self, loaded):
+        if loaded is None:
+            return False
+        mtime, state = loaded
+        now = time.time()
+        # saved_at survives copying the file around; mtime is for states saved before it existed.
+        if now - state.get('saved_at', mtime) > self.max_age:
+            return False
+        expiries = [c.get('expires', -1) for c in state.get('cookies', ())
+                    if c.get('domain', '').lstrip('.').endswith(AUTH_DOMAIN)]
+        # Session cookies (-1) last as long as the saved state does; so does a
+        # state with no easemytrip.com cookies at all (localStorage sign-in).
+        return all(e <= 0 or e > now for e in expiries)
+
+    def state(self, login=None):
+        """The current signed-in storage state, logging in via login(page, waits) if it is missing or stale."""
+        loaded = self._load()
+        if self._fresh(loaded):
+            return loaded[1]
+        with self._refresh_lock:
+            return self._refresh(login or perform_login)
+
+    def _refresh(self, login):
+        deadline = time.time() + STALE_LOCK_S
+        while True:
+            loaded = self._load()
+            if self._fresh(loaded):
+                return loaded[1]
+            if self._try_lock():
+                break
+            if time.time() > deadline:
+                raise RuntimeError(f'Timed out waiting for another worker to refresh {self.path}')
+            time.sleep(0.5)
+        try:
+            loaded = self._load()  # another worker may have finished between our check and the lock
+            if self._fresh(loaded):
+                return loaded[1]
+            return self._login(login)
+        finally:
+            try:
+                os.remove(self._lock_path)
+            except OSError:
+                pass
+
+    def _try_lock(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        try:
+            os.close(os.open(self._lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(self._lock_path) > STALE_LOCK_S:
+                    os.remove(self._lock_path)
+            except OSError:
+                pass
+            return False
+
+    def _login(self, login):
+        # Imported here: browser_pool imports this module.
+        from browser_pool import get_pool
+        from wait_policy import WaitPolicy
+
+        print("🔐 Signing in once to refresh the shared session...")
+        started = time.perf_counter()
+        with get_pool().page() as page:
+            login(page, WaitPolicy(page))
+            state = page.context.storage_state()
+        self.save(state)
+        self.logins += 1
+        print(f"✅ Session saved to {self.path} in {time.perf_counter() - started:.1f}s")
+        return state
+
+    def save(self, state):
+        """Write a storage state atomically, so readers never see half a file."""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(dict(state, saved_at=time.time()), f)
+        os.replace(tmp, self.path)
+
+    def invalidate(self):
+        """Forget the saved session, e.g. after the site logged us out."""
+        self._cached = None
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def apply(self, context, state=None):
+        """Sign a context in with the saved cookies and localStorage (usable as a BrowserPool context hook)."""
+        state = state or self.state()
+        if state.get('cookies'):
+            context.add_cookies(state['cookies'])
+        origins = {o['origin']: [item for item in o.get('localStorage', [])
+                                 if not item['name'].startswith(APPLIED_FLAG_PREFIX)]
+                   for o in state.get('origins', ())}
+        if origins:
+            flag = APPLIED_FLAG_PREFIX + uuid.uuid4().hex[:8]
+            context.add_init_script(LOCAL_STORAGE_SCRIPT % json.dumps([origins, flag]))
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def get_session():
+    """The process-wide SessionManager."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = SessionManager()
+        return _default
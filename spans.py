@@ -0,0 +1,214 @@
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SPANS_PATH = os.path.join(HERE, 'spans.jsonl')
+FLUSH_EVERY = 256
+
+RUN_ID = os.getenv('EMT_RUN_ID') or uuid.uuid4().hex[:12]
+_local = threading.local()
+
+
+def spans_path():
+    """Where spans go: EMT_SPANS (a path, or 1 for spans.jsonl); None when spans are off."""
+    value = os.getenv('EMT_SPANS', '')
+    if value.lower() in ('', '0', 'off', 'false', 'no'):
+        return None
+    return DEFAULT_SPANS_PATH if value.lower() in ('1', 'on', 'true', 'yes') else value
+
+
+class SpanSink:
+    """Buffers finished spans and appends them to a JSONL file in batches.
+
+    Recording a span is a dict append under a lock; the file is only
+    touched every FLUSH_EVERY spans and at exit, one write per batch, so
+    concurrent processes can share the file without interleaving lines.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._buffer = []
+        atexit.register(self.flush)
+
+    def emit(self, record):
+        with self._lock:
+            self._buffer.append(record)
+            if len(self._buffer) < FLUSH_EVERY:
+                return
+            batch, self._buffer = self._buffer, []
+        self._write(batch)
+
+    def flush(self):
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        self._write(batch)
+
+    def _write(self, batch):
+        if not batch:
+            return
+        data = ''.join(json.dumps(r, ensure_ascii=False, default=str) + '\n' for r in batch)
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(data)
+        except OSError as e:
+            print(f"⚠️ Could not write spans to {self.path}: {e}")
+
+
+_sink = None
+_sink_lock = threading.Lock()
+
+
+def get_sink():
+    """The process-wide sink, or None when EMT_SPANS is off."""
+    global _sink
+    path = spans_path()
+    if path is None:
+        return None
+    with _sink_lock:
+        if _sink is None or _sink.path != path:
+            _sink = SpanSink(path)
+        return _sink
+
+
+def flush():
+    """Write out buffered spans now (e.g. before a worker exits)."""
+    if _sink is not None:
+        _sink.flush()
+
+
+class Span:
+    """One timed step: name, start/end, attempts, winning selector and outcome, plus free-form attrs."""
+
+    __slots__ = ('name', 'parent', 'attrs', 'attempts', 'selector', 'outcome', 'start', '_t0')
+
+    def __init__(self, name, parent=None, **attrs):
+        self.name = name
+        self.parent = parent
+        self.attrs = attrs
+        self.attempts = 0
+        self.selector = None
+        self.outcome = 'ok'
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+        return self
+
+    def attempt(self):
+        self.attempts += 1
+        return self
+
+    def won(self, selector):
+        self.selector = selector
+        return self
+
+    def fail(self, outcome='failed'):
+        self.outcome = outcome
+        return self
+
+
+def _stack():
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def current_span():
+    """Innermost open span on this thread, or None."""
+    stack = _stack()
+    return stack[-1] if stack else None
+
+
+def _context():
+    # Imported lazily so spans.py stays importable on its own.
+    from har_replay import current_scenario
+
+    return current_scenario()
+
+
+def _emit(sink, name, parent, start, ms, attempts, selector, outcome, attrs):
+    record = {'run': RUN_ID, 'scenario': _context(), 'span': name, 'parent': parent, 'start': round(start, 4),
+              'end': round(start + ms / 1000, 4), 'ms': round(ms, 2), 'outcome': outcome}
+    if attempts:
+        record['attempts'] = attempts
+    if selector:
+        record['selector'] = selector
+    if attrs:
+        record['attrs'] = attrs
+    sink.emit(record)
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Time the block as a span; exceptions mark it 'error' and propagate."""
+    parent = current_span()
+    s = Span(name, parent.name if parent else None, **attrs)
+    stack = _stack()
+    stack.append(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.outcome = 'error'
+        s.attrs['error'] = f'{type(e).__name__}: {e}'[:300]
+        raise
+    finally:
+        stack.pop()
+        sink = get_sink()
+        if sink is not None:
+            _emit(sink, s.name, s.parent, s.start, (time.perf_counter() - s._t0) * 1000,
+                  s.attempts, s.selector, s.outcome, s.attrs)
+
+
+def record(name: str, started: float, outcome: str = 'ok', attempts: int = 0, selector: str = None, **attrs):
+    """Emit a span after the fact from a time.perf_counter() start (for code that already times itself)."""
+    sink = get_sink()
+    if sink is None:
+        return
+    ms = (time.perf_counter() - started) * 1000
+    parent = current_span()
+    _emit(sink, name, parent.name if parent else None, time.time() - ms / 1000, ms, attempts, selector, outcome, attrs)
+
+
+def percentile(values, p):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    k = (len(values) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def summarize(path: str, top: int = 25):
+    """Per-span count, p50, p95 and failure count from a JSONL file, slowest p95 first."""
+    durations, failures = defaultdict(list), defaultdict(int)
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                r = json.loads(line)
+            except ValueError:
+                continue
+            durations[r['span']].append(r['ms'])
+            failures[r['span']] += r['outcome'] != 'ok'
+    rows = sorted(((name, len(ms), percentile(ms, 50), percentile(ms, 95), failures[name])
+                   for name, ms in durations.items()), key=lambda row: -row[3])
+    print(f"\n📊 === SPANS ({path}) ===\n")
+    print(f"   {'span':<36} {'n':>6} {'p50 ms':>10} {'p95 ms':>10} {'failed':>7}")
+    for name, n, p50, p95, failed in rows[:top]:
+        print(f"   {name:<36} {n:>6} {p50:>10.0f} {p95:>10.0f} {failed:>7}")
+    return rows
+
+
+if __name__ == '__main__':
+    summarize(sys.argv[1] if len(sys.argv) > 1 else (spans_path() or DEFAULT_SPANS_PATH))
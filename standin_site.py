@@ -0,0 +1,733 @@
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+CITIES = ['Delhi', 'Shimla', 'Manali', 'Jaipur', 'Agra', 'Chandigarh', 'Dehradun', 'Mumbai', 'Pune',
+          'Goa', 'Bengaluru', 'Hyderabad', 'Chennai', 'Kolkata', 'Lucknow', 'Ahmedabad', 'Udaipur',
+          'Amritsar', 'Rishikesh', 'Haridwar', 'Indore', 'Bhopal', 'Nagpur', 'Vijayawada', 'Mysuru']
+OPERATORS = ['Zingbus', 'IntrCity SmartBus', 'HRTC', 'Laxmi Holidays', 'Shatabdi Travels', 'Raj Express',
+             'Orange Tours', 'VRL Travels', 'SRS Travels', 'Kaveri Travels', 'Neeta Tours', 'Hans Travels']
+# (bus type, ac, sleeper, seater)
+BUS_TYPES = [
+    ('Volvo Multi-Axle A/C Sleeper (2+1)', True, True, False),
+    ('Bharat Benz A/C Seater / Sleeper (2+1)', True, True, True),
+    ('A/C Seater (2+2)', True, False, True),
+    ('Scania A/C Multi-Axle Seater (2+2)', True, False, True),
+    ('Non A/C Sleeper (2+1)', False, True, False),
+    ('Non AC Seater (2+2)', False, False, True),
+]
+AMENITIES = ['WiFi', 'Water Bottle', 'Charging Point', 'Blanket', 'Reading Light', 'CCTV', 'Movie', 'Emergency Contact']
+STOP_SUFFIXES = ['ISBT', 'Bus Stand', 'Bypass', 'Railway Station', 'Airport Road', 'City Centre']
+EMT_HOSTS = re.compile(r'^https?://(?:www|bus)\.easemytrip\.com(?=/|$)')
+
+
+def _hhmm(minutes):
+    return f'{minutes // 60 % 24:02d}:{minutes % 60:02d}'
+
+
+def _rng(*parts):
+    return random.Random(zlib.crc32('|'.join(str(p).lower() for p in parts).encode()))
+
+
+def generate_listing(source: str, destination: str, travel_date: str, count: int = 40, seed: int = 0):
+    """The buses the stand-in returns for a search; the same inputs always give the same listing."""
+    rng = _rng(source, destination, travel_date, seed)
+    boarding = [f'{source} {s}' for s in STOP_SUFFIXES]
+    dropping = [f'{destination} {s}' for s in STOP_SUFFIXES]
+    buses = []
+    for i in range(count):
+        bus_type, ac, sleeper, seater = rng.choice(BUS_TYPES)
+        departure = rng.randrange(0, 24 * 60, 15)
+        duration = rng.randrange(4 * 60, 14 * 60, 5)
+        buses.append({
+            'Id': f'B{i + 1:04d}',
+            'Travels': rng.choice(OPERATORS),
+            'BusType': bus_type,
+            'AC': ac,
+            'Sleeper': sleeper,
+            'Seater': seater,
+            'AvailableSeats': rng.randint(1, 36),
+            'Fare': rng.randrange(499, 2499, 10) + (500 if ac else 0),
+            'DepartureTime': _hhmm(departure),
+            'ArrivalTime': _hhmm(departure + duration),
+            'Duration': f'{duration // 60}h {duration % 60:02d}m',
+            'Rating': round(rng.uniform(2.8, 4.9), 1),
+            'GPS': rng.random() < 0.6,
+            'Amenities': rng.sample(AMENITIES, rng.randint(0, 5)),
+            'BoardingPoints': sorted(rng.sample(boarding, rng.randint(1, 4))),
+            'DroppingPoints': sorted(rng.sample(dropping, rng.randint(1, 4))),
+        })
+    return buses
+
+
+def generate_seats(bus: dict, seed: int = 0):
+    """Seat layout for one bus: decks, berth type, availability, ladies-only and price."""
+    rng = _rng(bus['Id'], bus['Travels'], seed)
+    decks = []
+    if bus['Seater']:
+        decks.append(('lower', 'seater', 'S', 10, 4))
+    if bus['Sleeper']:
+        decks += [('lower', 'sleeper', 'L', 6, 3)] if not bus['Seater'] else []
+        decks.append(('upper', 'sleeper', 'U', 6, 3))
+    seats = []
+    for deck, berth, prefix, rows, cols in decks:
+        for r in range(rows):
+            for c in range(cols):
+                seats.append({
+                    'Id': f'{prefix}{r * cols + c + 1}', 'Deck': deck, 'Berth': berth, 'Row': r, 'Col': c,
+                    'Available': False, 'Ladies': rng.random() < 0.08,
+                    'Fare': bus['Fare'] + (150 if berth == 'sleeper' else 0) + (50 if c in (0, cols - 1) else 0),
+                })
+    for seat in rng.sample(seats, min(bus['AvailableSeats'], len(seats))):
+        seat['Available'] = True
+    return seats
+
+
+STANDIN_CSS = r"""
+body { font-family: sans-serif; margin: 0; }
+.auto-sugg-pre { position: absolute; background: #fff; border: 1px solid #ccc; display: none; z-index: 10; }
+.auto-sugg-pre ul { list-style: none; margin: 0; padding: 0; }
+.auto-sugg-pre li { padding: 6px 12px; cursor: pointer; }
+.ui-datepicker { position: absolute; background: #fff; border: 1px solid #ccc; padding: 6px; z-index: 20; }
+.ui-datepicker-calendar td { width: 28px; text-align: center; }
+.ui-state-disabled { opacity: .4; }
+.layout { display: flex; gap: 16px; padding: 12px; }
+.filters { width: 260px; }
+.filters label { display: block; }
+.gen-cards { border: 1px solid #ddd; margin: 8px 0; padding: 8px; }
+.seat-row { display: flex; gap: 4px; margin: 4px 0; }
+.seat { width: 30px; height: 30px; border: 1px solid #888; font-size: 10px; cursor: pointer; }
+.seat.sleeper { width: 64px; height: 26px; }
+.seat.booked { background: #ccc; cursor: not-allowed; }
+.seat.selected { background: #2a2; color: #fff; }
+.seat.ladies { border-color: #e6a; }
+#walletPanel { display: none; }
+.recent_sr, ._GenScrll, .signin-menu, #lgnBox, #shwotp, #emailgnBox { display: none; }
+._GenScrll li { cursor: pointer; }
+._crosslog { position: fixed; top: 40%; left: 40%; background: #fff; border: 1px solid #2a2; padding: 12px; }
+"""
+
+STANDIN_JS = r"""
+const MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August',
+                'September', 'October', 'November', 'December'];
+const pad = n => String(n).padStart(2, '0');
+const esc = s => String(s).replace(/[&<>"']/g, c => `&#${c.charCodeAt(0)};`);
+
+// City autosuggest: .auto-sugg-pre ul li, cleared once a city is picked.
+function autosuggest(input, box) {
+    let timer;
+    input.addEventListener('input', () => {
+        clearTimeout(timer);
+        timer = setTimeout(() => {
+            fetch('/api/cities?q=' + encodeURIComponent(input.value.trim())).then(r => r.json()).then(cities => {
+                box.querySelector('ul').innerHTML = cities.map(c => `<li data-city="${esc(c)}">${esc(c)}</li>`).join('');
+                box.style.display = cities.length ? 'block' : 'none';
+            });
+        }, 30);
+    });
+    box.addEventListener('click', e => {
+        const li = e.target.closest('li');
+        if (!li) return;
+        input.value = li.dataset.city;
+        box.querySelector('ul').innerHTML = '';
+        box.style.display = 'none';
+    });
+}
+
+// Same markup as the jQuery UI datepicker the live site uses.
+function datepicker(input) {
+    const div = document.createElement('div');
+    div.id = 'ui-datepicker-div';
+    div.className = 'ui-datepicker';
+    div.style.display = 'none';
+    document.body.appendChild(div);
+    const today = new Date();
+    today.setHours(0, 0, 0, 0);
+    let shown = new Date(today.getFullYear(), today.getMonth(), 1);
+    const render = () => {
+        const y = shown.getFullYear(), m = shown.getMonth();
+        const first = new Date(y, m, 1).getDay(), days = new Date(y, m + 1, 0).getDate();
+        let rows = '', row = '<td></td>'.repeat(first);
+        for (let d = 1; d <= days; d++) {
+            row += new Date(y, m, d) < today
+                ? `<td class="ui-datepicker-unselectable ui-state-disabled"><span class="ui-state-default">${d}</span></td>`
+                : `<td data-handler="selectDay" data-month="${m}" data-year="${y}"><a class="ui-state-default" href="#">${d}</a></td>`;
+            if ((first + d) % 7 === 0) { rows += `<tr>${row}</tr>`; row = ''; }
+        }
+        if (row) rows += `<tr>${row}</tr>`;
+        const atStart = y === today.getFullYear() && m === today.getMonth();
+        div.innerHTML = `<div class="ui-datepicker-header">
+            <a class="ui-datepicker-prev${atStart ? ' ui-state-disabled' : ''}" data-handler="prev">Prev</a>
+            <a class="ui-datepicker-next" data-handler="next">Next</a>
+            <div class="ui-datepicker-title"><span class="ui-datepicker-month">${MONTHS[m]}</span>
+            <span class="ui-datepicker-year">${y}</span></div></div>
+            <table class="ui-datepicker-calendar"><tbody>${rows}</tbody></table>`;
+    };
+    input.addEventListener('click', () => { render(); div.style.display = 'block'; });
+    div.addEventListener('click', e => {
+        e.preventDefault();
+        const el = e.target.closest('[data-handler]');
+        if (!el || el.classList.contains('ui-state-disabled')) return;
+        if (el.dataset.handler === 'selectDay') {
+            input.value = `${pad(+el.textContent)}/${pad(shown.getMonth() + 1)}/${shown.getFullYear()}`;
+            div.style.display = 'none';
+            return;
+        }
+        shown = new Date(shown.getFullYear(), shown.getMonth() + (el.dataset.handler === 'next' ? 1 : -1), 1);
+        render();
+    });
+}
+
+function listHost() {
+    return location.protocol + '//' + location.host.replace(/^www\./, 'bus.');
+}
+
+// Recent searches: kept in localStorage by the search button, listed under
+// .recent_sr (hidden until there is one) in ._GenScrll.
+function recentSearches(src, des, dateInput) {
+    const saved = () => JSON.parse(localStorage.getItem('emtRecentBus') || '[]');
+    const panel = document.querySelector('.recent_sr'), list = document.querySelector('._GenScrll');
+    if (saved().length) panel.style.display = 'block';
+    panel.querySelector('a').addEventListener('click', e => {
+        e.preventDefault();
+        list.innerHTML = '<ul>' + saved().map((r, i) =>
+            `<li data-i="${i}">${esc(r.org)} → ${esc(r.des)} <span>${esc(r.date)}</span></li>`).join('') + '</ul>';
+        list.style.display = 'block';
+    });
+    list.addEventListener('click', e => {
+        const li = e.target.closest('li');
+        if (!li) return;
+        const r = saved()[+li.dataset.i];
+        [src.value, des.value, dateInput.value] = [r.org, r.des, r.date.replace(/-/g, '/')];
+        list.style.display = 'none';
+    });
+    return r => localStorage.setItem('emtRecentBus', JSON.stringify(
+        [r, ...saved().filter(s => s.org !== r.org || s.des !== r.des)].slice(0, 5)));
+}
+
+// Sign-in panel: #divSignInPnl ._btnclick -> #shwlogn -> email (#lgnBox) ->
+// "login with password" (#shwotp) -> password (#emailgnBox) -> success popup.
+function signIn() {
+    const show = id => { document.getElementById(id).style.display = 'block'; };
+    document.querySelector('#divSignInPnl ._btnclick').addEventListener('click', () => {
+        document.querySelector('.signin-menu').style.display = 'block';
+    });
+    document.getElementById('shwlogn').addEventListener('click', () => show('lgnBox'));
+    const email = document.getElementById('txtEmail');
+    email.addEventListener('keydown', e => {
+        if (e.key === 'Enter' && /\S+@\S+/.test(email.value)) show('shwotp');
+    });
+    document.getElementById('shwotp').addEventListener('click', () => {
+        document.getElementById('lgnBox').style.display = 'none';
+        show('emailgnBox');
+    });
+    document.getElementById('btnLogin').addEventListener('click', () => {
+        if (!document.getElementById('txtEmailPass').value) return;
+        const user = email.value.trim();
+        document.cookie = `emtsid=${Math.random().toString(36).slice(2)}; path=/; max-age=43200`;
+        localStorage.setItem('emtUser', user);
+        document.getElementById('emailgnBox').style.display = 'none';
+        const popup = document.createElement('div');
+        popup.className = '_crosslog _crosslogsuccess';
+        popup.textContent = `Welcome ${user}`;
+        popup.addEventListener('click', () => popup.remove());
+        document.body.appendChild(popup);
+    });
+}
+
+function initHome() {
+    const src = document.getElementById('txtSrcCity'), des = document.getElementById('txtDesCity');
+    autosuggest(src, document.getElementById('srcSugg'));
+    autosuggest(des, document.getElementById('desSugg'));
+    const dateInput = document.getElementById('datepicker');
+    datepicker(dateInput);
+    const remember = recentSearches(src, des, dateInput);
+    signIn();
+    document.getElementById('srcbtn').addEventListener('click', () => {
+        let [d, m, y] = dateInput.value.split('/');
+        if (!y) {
+            const t = new Date(Date.now() + 86400000);
+            [d, m, y] = [pad(t.getDate()), pad(t.getMonth() + 1), t.getFullYear()];
+        }
+        remember({org: src.value, des: des.value, date: `${d}-${m}-${y}`});
+        const q = new URLSearchParams({
+            org: src.value, des: des.value,
+            date: `${d}-${m}-${y}`, searchid: Math.random().toString(36).slice(2, 12), CCode: 'IN', AppCode: 'Emt'});
+        location.href = listHost() + '/home/list?' + q;
+    });
+}
+
+function initList() {
+    const params = new URLSearchParams(location.search);
+    const state = {ac: false, nonac: false, sleeper: false, seater: false, gps: false,
+                   toprated: false, luxury: false, opt: new Set(), brd: new Set(), drp: new Set()};
+    let buses = [];
+    const matches = b => {
+        if ((state.ac || state.nonac) && !((state.ac && b.AC) || (state.nonac && !b.AC))) return false;
+        if ((state.sleeper || state.seater) && !((state.sleeper && b.Sleeper) || (state.seater && b.Seater))) return false;
+        if (state.gps && !b.GPS) return false;
+        if (state.toprated && b.Rating < 4.0) return false;
+        if (state.luxury && !/volvo|scania|mercedes|benz|multi[\s-]*axle|luxury/i.test(b.BusType)) return false;
+        if (state.opt.size && !state.opt.has(b.Travels)) return false;
+        if (state.brd.size && !b.BoardingPoints.some(p => state.brd.has(p))) return false;
+        if (state.drp.size && !b.DroppingPoints.some(p => state.drp.has(p))) return false;
+        return true;
+    };
+    const card = (b, i) => `<div class="gen-cards" data-id="${b.Id}">
+        <div class="trvls">${esc(b.Travels)}</div><div class="bus-type">${esc(b.BusType)}</div>
+        <span class="dep-time">${b.DepartureTime}</span> <span class="duration">${b.Duration}</span>
+        <span class="arr-time">${b.ArrivalTime}</span> <span class="rating">${b.Rating}</span>
+        <span class="fare">₹ ${b.Fare.toLocaleString('en-IN')}</span> <span class="seat-left">${b.AvailableSeats} Seats left</span>
+        ${b.GPS ? '<span class="gps-badge">GPS</span>' : ''}
+        <ul class="ameniti-list">${b.Amenities.map(a => `<li title="${esc(a)}">${esc(a)}</li>`).join('')}</ul>
+        <div class="board-pt">${b.BoardingPoints.map(esc).join(', ')}</div>
+        <div class="drop-pt">${b.DroppingPoints.map(esc).join(', ')}</div>
+        <ul class="card-tabs"><li id="showboard${i}">Boarding &amp; Dropping Points</li><li id="showamen${i}">Amenities</li></ul>
+        <button class="sel-seat-btn" data-id="${b.Id}">Select Seat</button></div>`;
+    const render = () => {
+        document.getElementById('cards').innerHTML = buses.filter(matches).map(card).join('');
+    };
+    const checkboxes = (name, values) => values.map(v =>
+        `<label><input type="checkbox" name="${name}" value="${esc(v)}"> ${esc(v)}</label>`).join('');
+    const uniq = xs => Array.from(new Set(xs)).sort();
+
+    fetch('/api/search?' + params).then(r => {
+        if (!r.ok) throw new Error('search failed: ' + r.status);
+        return r.json();
+    }).then(data => {
+        buses = data.Buses;
+        document.getElementById('optList').innerHTML = checkboxes('checkbox_opt', uniq(buses.map(b => b.Travels)));
+        document.getElementById('brdList').innerHTML = checkboxes('checkbox_brd', uniq(buses.flatMap(b => b.BoardingPoints)));
+        document.getElementById('drpList').innerHTML = checkboxes('checkbox_drp', uniq(buses.flatMap(b => b.DroppingPoints)));
+        render();
+    }).catch(e => {
+        document.getElementById('cards').innerHTML = `<div class="search-error">${esc(e.message)}</div>`;
+    });
+
+    const ids = {disAc: 'ac', disNonAc: 'nonac', disSleeper: 'sleeper', disSeater: 'seater', disGps: 'gps'};
+    document.querySelector('.filters').addEventListener('change', e => {
+        const el = e.target;
+        if (ids[el.id]) state[ids[el.id]] = el.checked;
+        const group = {checkbox_opt: 'opt', checkbox_brd: 'brd', checkbox_drp: 'drp'}[el.name];
+        if (group) el.checked ? state[group].add(el.value) : state[group].delete(el.value);
+        render();
+    });
+    document.querySelectorAll('[ng-click*="toprated"], [ng-click*="luxury"]').forEach(el =>
+        el.addEventListener('click', () => {
+            const key = el.getAttribute('ng-click').includes('toprated') ? 'toprated' : 'luxury';
+            state[key] = !state[key];
+            el.classList.toggle('active', state[key]);
+            render();
+        }));
+    document.querySelector('.reset-filter').addEventListener('click', () => {
+        document.querySelectorAll('.filters input[type="checkbox"]').forEach(el => { el.checked = false; });
+        document.querySelectorAll('.quick-filter').forEach(el => el.classList.remove('active'));
+        Object.assign(state, {ac: false, nonac: false, sleeper: false, seater: false, gps: false,
+                              toprated: false, luxury: false});
+        ['opt', 'brd', 'drp'].forEach(k => state[k].clear());
+        render();
+    });
+    document.getElementById('cards').addEventListener('click', e => {
+        const btn = e.target.closest('.sel-seat-btn');
+        if (btn) openSeats(buses.find(b => b.Id === btn.dataset.id), params);
+    });
+}
+
+function openSeats(bus, params) {
+    const q = new URLSearchParams(params);
+    q.set('id', bus.Id);
+    fetch('/api/seats?' + q).then(r => r.json()).then(seats => {
+        const deck = name => {
+            const rows = {};
+            seats.filter(s => s.Deck === name).forEach(s => { (rows[s.Row] = rows[s.Row] || []).push(s); });
+            return Object.values(rows).map(row => `<div class="seat-row">${row.map(s =>
+                `<div class="seat ${s.Berth} ${s.Available ? 'avail' : 'booked'}${s.Ladies ? ' ladies' : ''}"
+                      ng-click="SelectSeat('${s.Id}')" title="Seat No: ${s.Id} | Fare: ₹ ${s.Fare}">${s.Id}</div>`
+            ).join('')}</div>`).join('');
+        };
+        const labels = (kind, points) => points.map(p =>
+            `<label ng-click="select${kind}('${esc(p)}')"><input type="radio" name="${kind}"> ${esc(p)}</label>`).join('');
+        const layout = document.getElementById('seatLayout');
+        layout.innerHTML = `<div class="seat-layout">
+            <div class="deck lower-deck"><h4>Lower Deck</h4>${deck('lower')}</div>
+            ${seats.some(s => s.Deck === 'upper') ? `<div class="deck upper-deck"><h4>Upper Deck</h4>${deck('upper')}</div>` : ''}
+            <div class="bd-points"><h4>Boarding</h4>${labels('Boarding', bus.BoardingPoints)}
+            <h4>Dropping</h4>${labels('Dropping', bus.DroppingPoints)}</div>
+            <button class="continue-btn">Continue</button></div>`;
+        layout.querySelectorAll('.seat.avail').forEach(el =>
+            el.addEventListener('click', () => el.classList.toggle('selected')));
+        layout.querySelector('.continue-btn').addEventListener('click', () => {
+            const picked = Array.from(layout.querySelectorAll('.seat.selected')).map(el => el.textContent.trim());
+            q.set('seats', picked.join(','));
+            location.href = '/home/passenger?' + q;
+        });
+        layout.scrollIntoView();
+    });
+}
+
+function initPassenger() {
+    document.getElementById('paxContinue').addEventListener('click', () => {
+        const form = document.getElementById('paxForm');
+        const missing = ['firstName', 'email', 'mobile'].filter(n => !form.elements[n].value.trim());
+        if (missing.length) {
+            document.querySelector('.pax-error').textContent = 'Please fill ' + missing.join(', ');
+            return;
+        }
+        location.href = '/home/payment' + location.search;
+    });
+}
+
+function initPayment() {
+    document.querySelector('.pay-modes').addEventListener('click', e => {
+        const li = e.target.closest('li');
+        if (!li) return;
+        document.getElementById('walletPanel').style.display = li.dataset.mode === 'wallet' ? 'block' : 'none';
+    });
+    document.querySelector('a.pp_paybtn').addEventListener('click', e => {
+        e.preventDefault();
+        document.querySelector('.pay-status').textContent = 'Payment simulated';
+    });
+}
+"""
+
+
+def _page(title, body, init=None):
+    script = f'<script src="/static/standin.js"></script><script>{init}();</script>' if init else ''
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<link rel="stylesheet" href="/static/standin.css"></head>
+<body>{body}
+{script}</body></html>"""
+
+
+HOME_HTML = _page('Bus Tickets', """
+<div id="divSignInPnl">
+  <a class="_btnclick">My Account</a>
+  <div class="signin-menu"><a id="shwlogn">Login or Signup</a></div>
+  <div id="lgnBox">
+    <div>
+      <div class="lgn-title">Login or Create an Account</div>
+      <div><div><label>Email ID or Mobile Number <input type="text" id="txtEmail"></label></div></div>
+    </div>
+    <a id="shwotp">Login with Password</a>
+  </div>
+  <div id="emailgnBox">
+    <div>
+      <div class="lgn-title">Enter your password</div>
+      <div><div><label>Password <input type="password" id="txtEmailPass"></label></div></div>
+      <div><a class="forgot">Forgot password?</a></div>
+      <div class="lgn-error"></div>
+      <div><input type="button" id="btnLogin" value="Login"></div>
+    </div>
+  </div>
+</div>
+<div class="search">
+  <input id="txtSrcCity" placeholder="From" autocomplete="off"><div class="auto-sugg-pre" id="srcSugg"><ul></ul></div>
+  <input id="txtDesCity" placeholder="To" autocomplete="off"><div class="auto-sugg-pre" id="desSugg"><ul></ul></div>
+  <input id="datepicker" placeholder="Date" readonly>
+  <button id="srcbtn">Search</button>
+</div>
+<div class="recent_sr"><a href="#">Recent Search</a><div class="_GenScrll"></div></div>
+<div class="exclusive-offers">
+  <a class="_newrofferbx" href="/offers/emtfirst"><b>EMTFIRST</b> Flat 10% off on your first bus booking</a>
+  <a class="_newrofferbx" href="/offers/busdeal"><b>BUSDEAL</b> Up to ₹300 off on AC buses</a>
+</div>
+<div class="popular-routes">
+  <a href="/bengaluru-to-hyderabad-bus-tickets">Bengaluru to Hyderabad Bus</a>
+  <a href="/delhi-to-shimla-bus-tickets">Delhi to Shimla Bus</a>
+  <a href="/mumbai-to-pune-bus-tickets">Mumbai to Pune Bus</a>
+</div>""", 'initHome')
+
+LIST_HTML = _page('Bus List', """
+<div class="layout">
+  <div class="filters">
+    <button class="reset-filter">Reset</button>
+    <a class="quick-filter" ng-click="toprated()">Top Rated</a> <a class="quick-filter" ng-click="luxury()">Luxury</a>
+    <h4>Bus Type</h4>
+    <label><input type="checkbox" id="disAc" value="AC"> AC</label>
+    <label><input type="checkbox" id="disNonAc" value="NonAC"> Non AC</label>
+    <label><input type="checkbox" id="disSleeper" value="Sleeper"> Sleeper</label>
+    <label><input type="checkbox" id="disSeater" value="Seater"> Seater</label>
+    <label><input type="checkbox" id="disGps" value="GPS"> GPS Enabled</label>
+    <h4>Operators</h4><div class="operator-filter" id="optList"></div>
+    <h4>Boarding Points</h4><div id="brdList"></div>
+    <h4>Dropping Points</h4><div id="drpList"></div>
+  </div>
+  <div class="results"><div id="cards"></div><div id="seatLayout"></div></div>
+</div>""", 'initList')
+
+PASSENGER_HTML = _page('Passenger Details', """
+<form id="paxForm" onsubmit="return false">
+  <select name="title" id="title"><option value="">Title</option><option>Mr</option><option>Ms</option><option>Mrs</option></select>
+  <input name="firstName" placeholder="First Name"> <input name="lastName" placeholder="Last Name">
+  <input name="age" placeholder="Age" maxlength="3">
+  <div class="insurance">Travel insurance?
+    <label><input type="radio" name="insurance" value="yes"> Yes</label>
+    <label><input type="radio" name="insurance" value="no"> No</label>
+    <label><input type="checkbox" name="insuranceAccept" id="insuranceAccept"> I accept the insurance terms</label>
+  </div>
+  <input type="email" name="email" placeholder="Email">
+  <input type="text" name="countryCode" maxlength="3" value="+91">
+  <input type="tel" name="mobile" maxlength="10" placeholder="Mobile Number">
+  <div class="pax-error"></div>
+  <button type="button" class="continue-btn" id="paxContinue">Continue</button>
+</form>""", 'initPassenger')
+
+PAYMENT_HTML = _page('Payment', """
+<ul class="pay-modes"><li data-mode="upi">UPI</li><li data-mode="card">Cards</li><li data-mode="wallet">Wallets</li><li data-mode="more">More</li></ul>
+<div id="walletPanel">
+  <input type="radio" name="wallet" id="rdoBajaj Pay" value="Bajaj Pay"><label for="rdoBajaj Pay">Bajaj Pay</label>
+  <input type="radio" name="wallet" id="rdoMobikwik" value="Mobikwik"><label for="rdoMobikwik">Mobikwik</label>
+  <a class="pp_paybtn" href="#">Pay Now</a>
+</div>
+<div class="pay-status"></div>""", 'initPayment')
+
+
+class StandinSite:
+    """Local HTTP server that reproduces the DOM contract the scripts rely on.
+
+    Listing size, response latency (plus jitter) and failure injection for
+    matching paths are configurable, and adjustable while running via
+    GET /__config?latency_ms=...&failure_rate=... (400 on a bad value).
+    Injected failures and jitter come from the site's own RNG seeded with
+    seed, so a run is reproducible. Serves on host:port (port 0 picks a
+    free one); use base_url once started.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, buses=40, latency_ms=0, jitter_ms=0,
+                 failure_rate=0.0, fail_paths=('/api/',), seed=0):
+        self.host, self.port = host, port
+        self.config = {'buses': int(buses), 'latency_ms': float(latency_ms), 'jitter_ms': float(jitter_ms),
+                       'failure_rate': float(failure_rate), 'seed': int(seed)}
+        self.fail_paths = tuple(fail_paths)
+        self._rng = random.Random(self.config['seed'])
+        self.requests = 0
+        self.connections = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f'http://{self.host}:{self._server.server_address[1]}'
+
+    def start(self):
+        site = self
+
+        class Handler(_Handler):
+            pass
+        Handler.site = site
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def configure(self, **changes):
+        """Update config from strings or numbers; ValueError names the first bad key."""
+        parsed = {}
+        for key, value in changes.items():
+            if key not in self.config:
+                raise ValueError(f'unknown setting {key!r}')
+            try:
+                parsed[key] = type(self.config[key])(value)
+            except (TypeError, ValueError):
+                raise ValueError(f'{key} must be a number, got {value!r}') from None
+            if parsed[key] < 0 or (key == 'failure_rate' and parsed[key] > 1):
+                raise ValueError(f'{key} out of range: {value!r}')
+        with self._lock:
+            self.config.update(parsed)
+            if 'seed' in parsed:
+                self._rng.seed(parsed['seed'])
+
+    def _should_fail(self, path):
+        if not self.config['failure_rate'] or not path.startswith(self.fail_paths):
+            return False
+        with self._lock:
+            return self._rng.random() < self.config['failure_rate']
+
+    def _delay(self):
+        with self._lock:
+            jitter = self._rng.uniform(0, self.config['jitter_ms'])
+        latency = self.config['latency_ms'] + jitter
+        if latency > 0:
+            time.sleep(latency / 1000)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, so API clients can reuse connections
+    # Send headers and body in one segment; otherwise Nagle plus delayed ACKs
+    # add ~40 ms to every keep-alive request.
+    wbufsize = 64 * 1024
+    disable_nagle_algorithm = True
+    site = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        with self.site._lock:
+            self.site.connections += 1
+
+    def _send(self, status, body, content_type, headers=None):
+        data = body if isinstance(body, bytes) else body.encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _json(self, payload, status=200):
+        self._send(status, json.dumps(payload), 'application/json')
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        try:
+            extra = json.loads(body) if body else {}
+        except ValueError:
+            extra = {k: v[0] for k, v in parse_qs(body.decode()).items()}
+        self._route({k: str(v) for k, v in extra.items()})
+
+    def do_GET(self):
+        self._route({})
+
+    def _route(self, extra):
+        site = self.site
+        parts = urlsplit(self.path)
+        path = parts.path
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        query.update(extra)
+        with site._lock:
+            site.requests += 1
+        site._delay()
+        if site._should_fail(path):
+            with site._lock:
+                site.failures += 1
+            return self._json({'error': 'injected failure'}, 503)
+
+        if path in ('/', '/bus', '/bus/'):
+            return self._send(200, HOME_HTML, 'text/html; charset=utf-8')
+        if path == '/home/list':
+            return self._send(200, LIST_HTML, 'text/html; charset=utf-8')
+        if path == '/home/passenger':
+            return self._send(200, PASSENGER_HTML, 'text/html; charset=utf-8')
+        if path == '/home/payment':
+            return self._send(200, PAYMENT_HTML, 'text/html; charset=utf-8')
+        if path.startswith('/offers/'):
+            code = path.rsplit('/', 1)[-1].upper()
+            return self._send(200, _page(f'{code} Offer', f'<h1>{code}</h1><p>Offer details and terms.</p>'),
+                              'text/html; charset=utf-8')
+        if path.endswith('-bus-tickets'):
+            title = path.strip('/').replace('-', ' ').title()
+            return self._send(200, _page(title, f'<h1>{title}</h1>'), 'text/html; charset=utf-8')
+        if path in ('/static/standin.js', '/static/standin.css'):
+            body, kind = (STANDIN_JS, 'application/javascript') if path.endswith('.js') else (STANDIN_CSS, 'text/css')
+            etag = f'"{zlib.crc32(body.encode()):08x}"'
+            if self.headers.get('If-None-Match') == etag:
+                return self._send(304, b'', kind, {'ETag': etag})
+            return self._send(200, body, kind, {'ETag': etag, 'Cache-Control': 'public, max-age=3600'})
+        if path == '/api/cities':
+            q = query.get('q', '').lower()
+            return self._json([c for c in CITIES if q and c.lower().startswith(q)] or
+                              [c for c in CITIES if q and q in c.lower()])
+        if path == '/api/search':
+            buses = generate_listing(query.get('org', ''), query.get('des', ''), query.get('date', ''),
+                                     int(query.get('buses', site.config['buses'])), site.config['seed'])
+            return self._json({'SearchId': query.get('searchid') or f'{zlib.crc32(self.path.encode()):08x}',
+                               'Buses': buses})
+        if path == '/api/seats':
+            buses = generate_listing(query.get('org', ''), query.get('des', ''), query.get('date', ''),
+                                     int(query.get('buses', site.config['buses'])), site.config['seed'])
+            bus = next((b for b in buses if b['Id'] == query.get('id')), None)
+            if bus is None:
+                return self._json({'error': 'unknown bus'}, 404)
+            return self._json(generate_seats(bus, site.config['seed']))
+        if path == '/__config':
+            try:
+                site.configure(**query)
+            except ValueError as e:
+                return self._json({'error': str(e)}, 400)
+            return self._json(dict(site.config, requests=site.requests, connections=site.connections,
+                                   failures=site.failures))
+        return self._send(404, 'not found', 'text/plain')
+
+
+class StandinRouter:
+    """Send a context's www./bus.easemytrip.com traffic to a stand-in site instead.
+
+    URLs in the scripts stay as they are; the page still sees the
+    easemytrip.com origin, so redirects and relative XHRs keep working.
+    """
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip('/')
+
+    def rewrite(self, url: str):
+        return EMT_HOSTS.sub(self.base_url, url, count=1)
+
+    def _handle(self, route):
+        route.fulfill(response=route.fetch(url=self.rewrite(route.request.url)))
+
+    async def _handle_async(self, route):
+        await route.fulfill(response=await route.fetch(url=self.rewrite(route.request.url)))
+
+    def attach(self, context):
+        context.route(EMT_HOSTS, self._handle)
+
+    async def attach_async(self, context):
+        await context.route(EMT_HOSTS, self._handle_async)
+
+
+def standin_router():
+    """A router for EMT_STANDIN_URL, or None when no stand-in is configured."""
+    base_url = os.getenv('EMT_STANDIN_URL')
+    return StandinRouter(base_url) if base_url else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve a local stand-in for the EaseMyTrip bus site.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=int(os.getenv('EMT_STANDIN_PORT', '8765')))
+    parser.add_argument('--buses', type=int, default=40, help='buses per search result')
+    parser.add_argument('--latency-ms', type=float, default=0, help='added to every response')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='random extra latency, 0..jitter')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='fraction of /api/ calls answered 503')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    site = StandinSite(args.host, args.port, args.buses, args.latency_ms, args.jitter_ms,
+                       args.failure_rate, seed=args.seed).start()
+    print(f"🧪 Stand-in site on {site.base_url}  (EMT_STANDIN_URL={site.base_url})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        site.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import pytest
+
+from listing_table import ListingTable
+from listing_verify import VALUE_RULES, check
+
+RECORDS = [
+    {'operator': 'Zingbus', 'bus_type': 'AC Sleeper (2+1)', 'ac': True, 'sleeper': True,
+     'boarding': 'Delhi Kashmere Gate', 'dropping': 'Shimla ISBT'},
+    {'operator': 'IntrCity SmartBus', 'bus_type': 'Non AC Seater (2+2)', 'ac': False, 'seater': True,
+     'boarding': 'Delhi Majnu Ka Tilla', 'dropping': 'Shimla Old Bus Stand'},
+]
+
+
+@pytest.fixture
+def table():
+    return ListingTable.from_records(RECORDS)
+
+
+@pytest.mark.parametrize('name', sorted(VALUE_RULES))
+def test_name_filters_need_a_value(table, name):
+    with pytest.raises(ValueError, match=name):
+        check(table, name)
+
+
+@pytest.mark.parametrize('name, value, violations', [
+    ('operator', 'zingbus', [1]),
+    ('boarding', 'Kashmere', [1]),
+    ('dropping', 'ISBT', [1]),
+    ('ac', None, [1]),
+    ('non_ac', None, [0]),
+])
+def test_check_flags_rows_that_break_the_filter(table, name, value, violations):
+    verdict = check(table, name, value)
+    assert verdict.violations == violations
+    assert not verdict.ok
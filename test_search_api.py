@@ -0,0 +1,59 @@
+import pytest
+
+from listing_verify import check
+from search_api import SearchClient, cross_check
+from standin_site import StandinSite, generate_listing
+
+ROUTE = ('Delhi', 'Shimla', '20-11-2026')
+
+
+@pytest.fixture(scope="module")
+def site():
+    with StandinSite(buses=60) as site:
+        yield site
+
+
+@pytest.fixture
+def client(site):
+    with SearchClient(site.base_url, retries=0) as client:
+        yield client
+
+
+def test_search_table_matches_standin_listing(client):
+    table = client.search_table(*ROUTE)
+    buses = generate_listing(*ROUTE, count=60)
+    assert len(table) == 60
+    assert {table.text('route', i) for i in range(len(table))} == {'Delhi → Shimla'}
+    first = table.row(0)
+    assert first['operator'] == buses[0]['Travels']
+    assert first['departure'] == buses[0]['DepartureTime']
+    assert first['ac'] is buses[0]['AC']
+    assert check(table.select(table.has('ac')), 'ac').ok
+
+
+def test_search_reuses_connections(site, client):
+    opened = site.connections
+    client.search(*ROUTE)
+    client.search(*ROUTE)
+    assert client.requests == 2
+    assert site.connections - opened == 1
+
+
+def test_seats_for_a_listed_bus(client):
+    bus = generate_listing(*ROUTE, count=60)[0]
+    seats = client.seats(*ROUTE, bus['Id'])
+    assert seats
+    assert sum(s['Available'] for s in seats) == min(bus['AvailableSeats'], len(seats))
+    with pytest.raises(RuntimeError, match='HTTP 404'):
+        client.seats(*ROUTE, 'B9999')
+
+
+def test_cross_check_reports_each_side(client):
+    api_records = client.search(*ROUTE)
+    ui_records = list(client.search_table(*ROUTE).rows())
+    assert cross_check(ui_records, api_records) == ([], [])
+
+    only_in_ui, only_in_api = cross_check(ui_records[1:], api_records)
+    assert only_in_ui == []
+    assert len(only_in_api) == 1
+    assert only_in_api[0][0] == api_records[0]['operator']
@@ -0,0 +1,81 @@
+import json
+import os
+import time
+
+import pytest
+
+from session_state import SessionManager
+
+
+def _cookie(domain, expires):
+    return {'name': 'sid', 'value': 'x', 'domain': domain, 'path': '/', 'expires': expires}
+
+
+def _no_login(page, waits):
+    raise AssertionError('should have reused the saved state')
+
+
+@pytest.fixture
+def session(tmp_path):
+    return SessionManager(str(tmp_path / 'state.json'), max_age_hours=1)
+
+
+def test_saved_state_without_site_cookies_is_reused(session):
+    state = {'cookies': [_cookie('.analytics.example', time.time() + 3600)],
+             'origins': [{'origin': 'https://www.easemytrip.com', 'localStorage': [{'name': 'u', 'value': '1'}]}]}
+    session.save(state)
+    assert session.state(login=_no_login)['origins'] == state['origins']
+
+
+def test_session_cookies_are_fresh_until_max_age(session):
+    session.save({'cookies': [_cookie('.easemytrip.com', -1)], 'origins': []})
+    assert session._fresh(session._load())
+
+
+def test_expired_site_cookie_is_stale(session):
+    session.save({'cookies': [_cookie('.easemytrip.com', time.time() - 60)], 'origins': []})
+    assert not session._fresh(session._load())
+
+
+def test_age_comes_from_saved_at(session):
+    session.save({'cookies': [], 'origins': []})
+    with open(session.path, encoding='utf-8') as f:
+        state = json.load(f)
+    state['saved_at'] = time.time() - 2 * 3600
+    with open(session.path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    assert not session._fresh(session._load())
+
+    # Older files without saved_at fall back to the file's mtime.
+    del state['saved_at']
+    with open(session.path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    assert session._fresh(session._load())
+    stale = time.time() - 2 * 3600
+    os.utime(session.path, (stale, stale))
+    assert not session._fresh(session._load())
+
+
+class _Context:
+    def __init__(self):
+        self.cookies, self.scripts = [], []
+
+    def add_cookies(self, cookies):
+        self.cookies += cookies
+
+    def add_init_script(self, script):
+        self.scripts.append(script)
+
+
+def test_apply_guards_local_storage_per_call(session):
+    state = {'cookies': [_cookie('.easemytrip.com', -1)],
+             'origins': [{'origin': 'https://www.easemytrip.com',
+                          'localStorage': [{'name': 'token', 'value': 'a'}, {'name': '__emt_state_old', 'value': '1'}]}]}
+    context = _Context()
+    session.apply(context, state)
+    session.apply(context, state)
+    assert len(context.cookies) == 2
+    first, second = context.scripts
+    assert '"token"' in first and '__emt_state_old' not in first
+    flags = [json.loads(s.split('const [origins, flag] = ', 1)[1].split(';\n', 1)[0])[1] for s in (first, second)]
+    assert flags[0] != flags[1] and all(f.startswith('__emt_state_') for f in flags)
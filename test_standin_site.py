@@ -0,0 +1,40 @@
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from standin_site import StandinSite
+
+
+def _get(site, path):
+    try:
+        with urllib.request.urlopen(site.base_url + path, timeout=5) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+@pytest.mark.parametrize('query', ['latency_ms=abc', 'failure_rate=2', 'jitter_ms=-1', 'colour=red'])
+def test_bad_config_is_a_400(query):
+    with StandinSite() as site:
+        status, payload = _get(site, f'/__config?{query}')
+        assert status == 400
+        assert 'error' in payload
+        assert site.config['latency_ms'] == 0 and site.config['failure_rate'] == 0
+
+
+def test_config_updates_settings():
+    with StandinSite() as site:
+        status, payload = _get(site, '/__config?latency_ms=5&buses=12')
+        assert status == 200
+        assert payload['latency_ms'] == 5.0 and payload['buses'] == 12
+
+
+def test_injected_failures_follow_the_seed():
+    def pattern(seed):
+        site = StandinSite(failure_rate=0.5, seed=seed)
+        return [site._should_fail('/api/search') for _ in range(32)]
+
+    assert pattern(7) == pattern(7)
+    assert pattern(7) != pattern(8)
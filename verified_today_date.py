@@ -1,51 +1,51 @@
-from playwright.sync_api import sync_playwright
-import time
+import os
+
+from browser_pool import pooled_page
+from wait_policy import WaitPolicy
 
 def automate_easemytrip():
-    with sync_playwright() as p:
-        # Launch browser
-        browser = p.chromium.launch(headless=False)
-        page = browser.new_page()
+    with pooled_page() as page:
         
         # Set longer timeout
         page.set_default_timeout(60000)  # 60 seconds
+        waits = WaitPolicy(page)
         
         # Navigate to EaseMyTrip bus page
         print("Opening EaseMyTrip Bus page...")
         page.goto("https://www.easemytrip.com/bus/", wait_until="domcontentloaded")
         
-        # Wait for page to load
-        time.sleep(3)
+        # Wait for the search form rather than a fixed 3 s
+        waits.selector('page.load', '#txtSrcCity', sleep_ms=3000)
         print("Page loaded successfully!")
         
         # Select Source City - Delhi
         print("Selecting source city: Delhi...")
         page.fill("#txtSrcCity", "Delhi")
-        time.sleep(2)
-        page.wait_for_selector('.auto-sugg-pre ul li', state='visible', timeout=10000)
+        waits.selector('search.src_suggest', '.auto-sugg-pre ul li', sleep_ms=2000, timeout_ms=10000)
         page.locator('.auto-sugg-pre ul li:has-text("Delhi")').first.click()
-        time.sleep(1)
+        waits.selector('search.src_select', '.auto-sugg-pre ul li', state='hidden', sleep_ms=1000, timeout_ms=1000)
         print("Delhi selected!")
         
         # Select Destination City - Shimla
         print("Selecting destination city: Shimla...")
         page.fill("#txtDesCity", "Shimla")
-        time.sleep(2)
-        page.wait_for_selector('.auto-sugg-pre ul li', state='visible', timeout=10000)
+        waits.selector('search.dest_suggest', '.auto-sugg-pre ul li', sleep_ms=2000, timeout_ms=10000)
         page.locator('.auto-sugg-pre ul li:has-text("Shimla")').first.click()
-        time.sleep(1)
+        waits.selector('search.dest_select', '.auto-sugg-pre ul li', state='hidden', sleep_ms=1000, timeout_ms=1000)
         print("Shimla selected!")
         
         # Click Today button (separate button outside calendar)
         print("Clicking Today button...")
         page.locator('.date-controls-sec:has-text("Today")').first.click(force=True)
-        time.sleep(1)
+        waits.dom('search.date_today', "() => document.querySelector('#datepicker').value",
+                  sleep_ms=1000, timeout_ms=1000)
         print("✅ Today selected!")
-        
-        # Keep browser open to see results
-        time.sleep(10)
-        
-        browser.close()
+        waits.report()
+
+        # Keep the browser open to look at the results when debugging.
+        if os.getenv('EMT_PAUSE_AT_END', '').lower() in {'1', 'true', 'yes'}:
+            print("Keeping browser open for 10 seconds...")
+            page.wait_for_timeout(10_000)
         print("Automation completed successfully!")
 
 if __name__ == "__main__":
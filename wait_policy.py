@@ -0,0 +1,205 @@
+import re
+import time
+from dataclasses import dataclass, field
+
+from playwright.sync_api import Page
+
+import spans
+from attribution import wait_bucket
+
+
+# Installed once per document: counts in-flight XHR/fetch calls and
+# timestamps DOM mutations, so settle() can tell an Angular digest from a
+# server round trip and wait on whichever one the toggle actually caused.
+SETTLE_INSTALL = """() => {
+    if (window.__emtSettle) return;
+    const s = window.__emtSettle = {inflight: 0, requests: 0, mutations: 0, lastChange: 0, urls: [], observer: null};
+    const touch = () => { s.lastChange = performance.now(); };
+    const open = XMLHttpRequest.prototype.open, send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.open = function (method, url) { this.__emtUrl = String(url); return open.apply(this, arguments); };
+    XMLHttpRequest.prototype.send = function () {
+        s.inflight++; s.requests++; s.urls.push(this.__emtUrl); touch();
+        this.addEventListener('loadend', () => { s.inflight--; touch(); });
+        return send.apply(this, arguments);
+    };
+    if (window.fetch) {
+        const fetch = window.fetch;
+        window.fetch = function (input) {
+            s.inflight++; s.requests++; s.urls.push(String(input && input.url || input)); touch();
+            return fetch.apply(this, arguments).finally(() => { s.inflight--; touch(); });
+        };
+    }
+    s.observer = new MutationObserver(records => { s.mutations += records.length; touch(); });
+}"""
+
+# Snapshot the counters and watch the results container (the parent of the
+# first match, or <body>) for this toggle.
+SETTLE_ARM = """(results) => {
+    const s = window.__emtSettle;
+    const el = document.querySelector(results);
+    s.observer.disconnect();
+    s.observer.observe(el && el.parentElement || document.body,
+                       {subtree: true, childList: true, attributes: true, characterData: true});
+    s.mark = {at: performance.now(), requests: s.requests, mutations: s.mutations};
+}"""
+
+# Settled once nothing is in flight and the container has been quiet for
+# quiet ms; if nothing reacts within grace ms the toggle was a no-op.
+SETTLE_DONE = """([quiet, grace]) => {
+    const s = window.__emtSettle, now = performance.now();
+    if (s.inflight > 0) return false;
+    const reacted = s.requests > s.mark.requests || s.mutations > s.mark.mutations;
+    if (!reacted && now - s.mark.at < grace) return false;
+    if (now - Math.max(s.lastChange, s.mark.at) < quiet) return false;
+    return {requests: s.requests - s.mark.requests, mutations: s.mutations - s.mark.mutations,
+            urls: s.urls.slice(s.urls.length - (s.requests - s.mark.requests))};
+}"""
+
+
+@dataclass
+class WaitRecord:
+    """One condition wait and the fixed sleep it replaced."""
+    step: str
+    kind: str
+    waited_ms: float
+    sleep_ms: int
+    met: bool
+
+    @property
+    def saved_ms(self):
+        # Time a fixed sleep would have burned on top of the real wait.
+        return max(self.sleep_ms - self.waited_ms, 0.0)
+
+
+@dataclass
+class WaitPolicy:
+    """Wait on what a step actually needs, never longer than a ceiling.
+
+    Every wait declares its condition (DOM predicate, network response,
+    URL change or element stability), returns as soon as it holds and
+    records how long the old fixed sleep would have cost.
+    """
+    page: Page
+    ceiling_ms: int = 10000
+    records: list = field(default_factory=list)
+    # step -> 'client' or 'server', as last observed by settle()
+    settled: dict = field(default_factory=dict)
+
+    def _record(self, step, kind, started, sleep_ms, met):
+        waited_ms = (time.perf_counter() - started) * 1000
+        self.records.append(WaitRecord(step, kind, waited_ms, sleep_ms, met))
+        spans.record(step, started, 'ok' if met else 'timeout', wait=kind, bucket=wait_bucket(kind), sleep_ms=sleep_ms)
+        return met
+
+    def _timeout(self, timeout_ms):
+        return self.ceiling_ms if timeout_ms is None else timeout_ms
+
+    def dom(self, step: str, predicate: str, arg=None, sleep_ms: int = 0, timeout_ms: int = None):
+        """Wait until a JS predicate evaluated in the page returns truthy."""
+        started = time.perf_counter()
+        try:
+            self.page.wait_for_function(predicate, arg=arg, timeout=self._timeout(timeout_ms))
+            met = True
+        except Exception:
+            met = False
+        return self._record(step, 'dom', started, sleep_ms, met)
+
+    def selector(self, step: str, selector: str, state: str = 'visible', sleep_ms: int = 0, timeout_ms: int = None):
+        """Wait until a selector reaches the given state (visible/hidden/attached/detached)."""
+        started = time.perf_counter()
+        try:
+            self.page.wait_for_selector(selector, state=state, timeout=self._timeout(timeout_ms))
+            met = True
+        except Exception:
+            met = False
+        return self._record(step, 'dom', started, sleep_ms, met)
+
+    def response(self, step: str, url_pattern, action, sleep_ms: int = 0, timeout_ms: int = None):
+        """Run action and wait for the first response whose URL matches url_pattern."""
+        pattern = re.compile(url_pattern) if isinstance(url_pattern, str) else url_pattern
+        started = time.perf_counter()
+        try:
+            with self.page.expect_response(lambda r: bool(pattern.search(r.url)),
+                                           timeout=self._timeout(timeout_ms)):
+                action()
+            met = True
+        except Exception:
+            met = False
+        return self._record(step, 'network', started, sleep_ms, met)
+
+    def url(self, step: str, url_pattern, sleep_ms: int = 0, timeout_ms: int = None):
+        """Wait until the page URL matches url_pattern."""
+        pattern = re.compile(url_pattern) if isinstance(url_pattern, str) else url_pattern
+        started = time.perf_counter()
+        try:
+            self.page.wait_for_url(pattern, timeout=self._timeout(timeout_ms))
+            met = True
+        except Exception:
+            met = False
+        return self._record(step, 'url', started, sleep_ms, met)
+
+    def load(self, step: str, state: str = 'load', sleep_ms: int = 0, timeout_ms: int = None):
+        """Wait for a page load state (load/domcontentloaded/networkidle)."""
+        started = time.perf_counter()
+        try:
+            self.page.wait_for_load_state(state, timeout=self._timeout(timeout_ms))
+            met = True
+        except Exception:
+            met = False
+        return self._record(step, 'network', started, sleep_ms, met)
+
+    def stable(self, step: str, target, sleep_ms: int = 0, timeout_ms: int = None):
+        """Wait until an element is visible and its box stops moving."""
+        locator = self.page.locator(target).first if isinstance(target, str) else target
+        started = time.perf_counter()
+        try:
+            timeout = self._timeout(timeout_ms)
+            locator.wait_for(state='visible', timeout=timeout)
+            locator.element_handle(timeout=timeout).wait_for_element_state('stable', timeout=timeout)
+            met = True
+        except Exception:
+            met = False
+        return self._record(step, 'stable', started, sleep_ms, met)
+
+    def settle(self, step: str, action, results: str = '.gen-cards', quiet_ms: int = 60, grace_ms: int = 300,
+               sleep_ms: int = 0, timeout_ms: int = None):
+        """Run action (e.g. a filter click) and wait until the page has finished reacting to it.
+
+        Server-side toggles are done when their XHR/fetch calls have completed
+        and the results container has re-rendered; client-side ones (an
+        Angular digest) when the container's mutations go quiet. Which of
+        the two the step turned out to be is kept in self.settled.
+        """
+        started = time.perf_counter()
+        try:
+            self.page.evaluate(SETTLE_INSTALL)
+            self.page.evaluate(SETTLE_ARM, results)
+            armed = True
+        except Exception:
+            armed = False
+        action()  # errors here belong to the caller, like a plain click
+        met, kind = False, 'dom'
+        if armed:
+            try:
+                outcome = self.page.wait_for_function(SETTLE_DONE, arg=[quiet_ms, grace_ms],
+                                                      timeout=self._timeout(timeout_ms)).json_value()
+                self.settled[step] = 'server' if outcome['requests'] else 'client'
+                met, kind = True, 'network' if outcome['requests'] else 'dom'
+            except Exception:
+                pass
+        return self._record(step, kind, started, sleep_ms, met)
+
+    def total_saved_ms(self):
+        return sum(r.saved_ms for r in self.records)
+
+    def report(self):
+        """Print a per-step table of condition waits vs the fixed sleeps they replaced."""
+        print('\n⏱️ === WAIT REPORT ===\n')
+        for r in self.records:
+            status = '✅' if r.met else '⚠️'
+            print(f'   {status} {r.step:<32} {r.kind:<8} waited {r.waited_ms:7.0f} ms'
+                  f'  (fixed {r.sleep_ms:5d} ms, saved {r.saved_ms:7.0f} ms)')
+        waited = sum(r.waited_ms for r in self.records)
+        fixed = sum(r.sleep_ms for r in self.records)
+        print(f'\n   Total waited: {waited:.0f} ms, fixed sleeps: {fixed} ms, '
+              f'saved: {self.total_saved_ms():.0f} ms\n')